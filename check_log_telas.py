@@ -3,238 +3,53 @@ import pandas as pd
 import re
 from datetime import datetime, timedelta
 import io
-import plotly.express as px
-import plotly.graph_objects as go
-from openpyxl import Workbook
-from openpyxl.utils.dataframe import dataframe_to_rows
+import gzip
 import tempfile
 import os
-import paramiko
-from io import StringIO
+import hashlib
+import threading
+import time
+import weakref
+import sys
+import sqlite3
+import unicodedata
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import rcs_reader
+from log_parser import (COMPRESSED_EXTENSIONS, content_digest, diff_snapshots, file_flag_for_rows, file_identity_keys,
+                        join_revisions, load_rcs_mirror, merge_source_datasets, open_compressed, parse_log_content,
+                        parse_log_stream, PDR_AUDIT_RULES, audit_pdr_messages, suggest_classification)
 
-@st.cache_data
-def parse_log_content(content):
-    data = []
-    
-    # Dividir o conteúdo em seções de arquivo
-    file_sections = re.split(r'={70,}', content)
-    
-    for section in file_sections:
-        if not section.strip():
-            continue
-            
-        file_data = parse_file_section(section)
-        if file_data:
-            data.extend(file_data)
-    
-    return data
+# plotly, openpyxl e paramiko são importados apenas onde são usados (gráficos, exportação e SSH)
 
-def parse_file_section(section):
-    lines = section.strip().split('\n')
-    
-    # Extrair informações básicas do arquivo
-    rcs_file = None
-    working_file = None
-    revisions = []
-    current_revision = None
-    in_message = False
-    
-    for i, line in enumerate(lines):
-        line = line.strip()
-        
-        if line.startswith("RCS file:"):
-            rcs_file = line.split(":", 1)[1].strip()
-        elif line.startswith("Working file:"):
-            working_file = line.split(":", 1)[1].strip()
-        elif line.startswith("revision "):
-            # Se já estávamos processando uma revisão, finalizá-la
-            if current_revision:
-                # Processar a mensagem coletada
-                current_revision['message'] = clean_message(current_revision['message'])
-                revisions.append(current_revision)
-            
-            # Iniciar nova revisão
-            revision_match = re.match(r'revision\s+([\d.]+)', line)
-            if revision_match:
-                current_revision = {
-                    'revision': revision_match.group(1),
-                    'date': None,
-                    'author': None,
-                    'message': []
-                }
-                in_message = False
-        elif line.startswith("date:") and current_revision:
-            # Extrair data e autor
-            date_match = re.search(r'date:\s*([^;]+);', line)
-            author_match = re.search(r'author:\s*([^;]+);', line)
-            
-            if date_match:
-                current_revision['date'] = date_match.group(1).strip()
-            if author_match:
-                current_revision['author'] = author_match.group(1).strip()
-        elif current_revision and (line.startswith("#") or in_message or (line and not line.startswith("branches:") and not line.startswith("===="))):
-            # Filtrar mensagem do commit
-            if not in_message and line and not line.startswith("----------------------------"):
-                in_message = True
-            
-            if in_message and line and not line.startswith("----------------------------"):
-                current_revision['message'].append(line)
-    
-    # Adicionar a última revisão
-    if current_revision:
-        current_revision['message'] = clean_message(current_revision['message'])
-        revisions.append(current_revision)
-    
-    if rcs_file and working_file and revisions:
-        # Para cada revisão, criar uma entrada no DataFrame
-        result = []
-        for rev in revisions:
-            # Extrair informações PDR da mensagem
-            pdr_info = extract_pdr_info(rev['message'])
-            
-            # Extrair nome do arquivo do caminho (última parte após /)
-            file_name = extract_filename_from_path(rcs_file)
-            
-            # Extrair Centro e Estado do caminho
-            centro, estado = extract_centro_estado(rcs_file)
-            
-            # Separar data e hora
-            data_str, hora_str = parse_date_time(rev['date'])
-            
-            result.append({
-                'rcs_file': clean_path(rcs_file),
-                'working_file': file_name,
-                'revision': rev['revision'],
-                'author': rev['author'],
-                'date': data_str,
-                'time': hora_str,
-                'message': rev['message'],
-                'is_pdr': rev['message'].startswith('#') if rev['message'] else False,
-                'pdr_classification': pdr_info['classification'],
-                'pdr_time': pdr_info['time_minutes'],
-                'pdr_description': pdr_info['description'],
-                'centro': centro,
-                'estado': estado
-            })
-        return result
-    
-    return []
-
-def extract_centro_estado(rcs_file):
-    """Extrai Centro e Estado do caminho do arquivo"""
-    centro = None
-    estado = "GERAL"
-    
-    # Padrão para encontrar /telas/Centro/...
-    pattern = r'/telas/Centro/([^/]+)(?:/([^/]+)(?:/|$))?'
-    match = re.search(pattern, rcs_file)
-    
-    if match:
-        centro = match.group(1)
-        # Se houver um segundo grupo (estado) E houver mais diretórios após o estado, usar ele
-        # Caso contrário, manter "GERAL"
-        if match.group(2):
-            # Verificar se há mais diretórios após o estado
-            # Se o que vem após o centro for imediatamente o nome do arquivo, então é GERAL
-            path_after_centro = rcs_file.split(f"/Centro/{centro}/")[-1]
-            path_parts = path_after_centro.split('/')
-            
-            # Se houver mais de uma parte (diretórios adicionais), então o primeiro é o estado
-            # Se só tiver uma parte (apenas o nome do arquivo), então é GERAL
-            if len(path_parts) > 1:
-                estado = match.group(2)
-            else:
-                estado = "GERAL"
-    
-    return centro, estado
+# Limite de memória do registro de datasets compartilhado entre as sessões
+DATASET_REGISTRY_MAX_MB = 2048
 
-def parse_date_time(date_str):
-    """Separa data e hora, convertendo data para DD/MM/AAAA"""
-    if not date_str:
-        return None, None
-    
-    try:
-        # Tentar diferentes formatos de data
-        for fmt in ['%Y/%m/%d %H:%M:%S', '%Y/%m/%d']:
-            try:
-                dt = datetime.strptime(date_str, fmt)
-                data_formatada = dt.strftime('%d/%m/%Y')
-                hora_formatada = dt.strftime('%H:%M:%S') if fmt == '%Y/%m/%d %H:%M:%S' else "00:00:00"
-                return data_formatada, hora_formatada
-            except ValueError:
-                continue
-    except:
-        pass
-    
-    return None, None
-
-def extract_filename_from_path(path):
-    """Extrai o nome do arquivo do caminho (última parte após /)"""    
-    clean_path = path
-    if clean_path.endswith(',v'):
-        clean_path = clean_path[:-2]    
-    parts = clean_path.split('/')
-    return parts[-1] if parts else clean_path
-
-def extract_pdr_info(message):
-    """Extrai informações PDR da mensagem no formato #Classificacao#Tempo#Descricao"""
-    if not message or not message.startswith('#'):
-        return {'classification': None, 'time_minutes': None, 'description': None}
-    
-    # Padrão: #CLASSIFICACAO#TEMPO#DESCRICAO
-    pattern = r'^#([^#]+)#([^#]*)#(.+)$'
-    match = re.match(pattern, message)
-    
-    if match:
-        classification = match.group(1)
-        time_str = match.group(2)
-        description = match.group(3)
-        
-        # Converter tempo para número, se possível
-        try:
-            time_minutes = float(time_str) if time_str else None
-        except ValueError:
-            time_minutes = None
-            
-        return {
-            'classification': classification,
-            'time_minutes': time_minutes,
-            'description': description
-        }
-    
-    return {'classification': None, 'time_minutes': None, 'description': None}
+# Download do log via SFTP: caminho relativo ao $HOME, tamanho dos blocos, blocos pedidos por vez, tentativas
+# e espera base antes de reconectar (dobra a cada tentativa, até 30 s)
+REMOTE_LOG_PATH = 'Check_log_telas/Check_log.csv'
+SFTP_CHUNK_SIZE = 32768
+SFTP_WINDOW_CHUNKS = 64
+SFTP_MAX_RETRIES = 5
+SFTP_RETRY_BASE_SECONDS = 1
 
-def clean_message(message_lines):
-    # Remover linhas vazias no início e no fim
-    while message_lines and not message_lines[0].strip():
-        message_lines.pop(0)
-    while message_lines and not message_lines[-1].strip():
-        message_lines.pop()
-    
-    # Juntar as linhas
-    message = ' '.join(message_lines).strip()
-    
-    # Remover "*** empty log message ***" se presente
-    if message == "*** empty log message ***":
-        message = ""
-        
-    return message
+# Fonte padrão do log (servidor e repositório CVS) e número de fontes buscadas ao mesmo tempo
+DEFAULT_HOST = 'rbsp01.reger.ons'
+DEFAULT_REPOSITORY = '$HOME/telas/Centro/'
+LOG_SOURCE_WORKERS = 4
 
-def clean_path(path):
-    # Remover o prefixo "/export/cvs" se existir
-    prefixes = ["/export/cvs", "/export/cvs/"]
-    for prefix in prefixes:
-        if path.startswith(prefix):
-            path = path[len(prefix):]
-    
-    # Remover ",v" do final se existir
-    if path.endswith(',v'):
-        path = path[:-2]
-    
-    return path
+# Limite de memória do cache de resultados filtrados (linhas e agregados por estado de filtros)
+RESULT_CACHE_MAX_MB = 256
+
+# Relatórios PDR: threads de geração e quantidade de arquivos mantidos em disco
+PDR_REPORT_WORKERS = 2
+PDR_REPORT_CACHE_SIZE = 8
 
 def create_excel_file(df):
     """Cria um arquivo Excel a partir do DataFrame"""
+    from openpyxl import Workbook
+    
     wb = Workbook()
     ws = wb.active
     ws.title = "Log de Telas"
@@ -263,6 +78,97 @@ def create_excel_file(df):
     
     return wb
 
+# Nomes das colunas na tabela de resultados e nas planilhas exportadas
+DISPLAY_COLUMN_NAMES = {
+    'centro': 'Centro',
+    'estado': 'Estado',
+    'rcs_file': 'Caminho da Tela',
+    'working_file': 'Nome da Tela',
+    'revision': 'Revisão',
+    'author': 'Autor',
+    'date': 'Data',
+    'time': 'Hora',
+    'message': 'Mensagem',
+    'pdr_classification': 'Tipo',
+    'pdr_time': 'Tempo (min)',
+    'pdr_description': 'Comentário'
+}
+
+PDR_REPORT_COLUMNS = ['centro', 'estado', 'rcs_file', 'working_file', 'revision', 'author', 'date', 'time',
+                      'pdr_classification', 'pdr_time', 'pdr_description']
+
+def write_pdr_report(path, filtered_df):
+    """Grava o Relatório PDR (uma aba por agregado e os dados brutos) sem montar a planilha em memória"""
+    from openpyxl import Workbook
+    
+    pdr_stats = compute_pdr_aggregates(filtered_df)
+    wb = Workbook(write_only=True)
+    
+    def add_sheet(title, header, rows):
+        ws = wb.create_sheet(title)
+        ws.append(header)
+        for row in rows:
+            # Células vazias no lugar de NaN
+            ws.append([None if pd.isna(value) else value for value in row])
+    
+    add_sheet("Resumo", ["Indicador", "Valor"], [
+        ("Total de Revisões PDR", pdr_stats['total_revisions']),
+        ("Tempo Total (min)", pdr_stats['total_time']),
+        ("Tempo Médio (min)", pdr_stats['avg_time']),
+        ("Tempo Máximo (min)", pdr_stats['max_time']),
+        ("Arquivos Únicos", pdr_stats['total_files'])
+    ])
+    add_sheet("Por Centro", ["Centro"] + CENTRO_STATS_COLUMNS,
+              pdr_stats['centro_stats'].itertuples(name=None))
+    
+    by_classification = pd.DataFrame({
+        'count': pdr_stats['classification_counts'],
+        'time': pdr_stats['time_by_classification']
+    }).sort_values('time', ascending=False)
+    add_sheet("Por Tipo", ["Tipo", "Total de Revisões", "Tempo Total (min)"],
+              by_classification.itertuples(name=None))
+    
+    add_sheet("Top Arquivos por Tempo", ["Nome da Tela", "Tempo Total (min)"],
+              pdr_stats['time_by_file'].items())
+    add_sheet("Arquivos Mais Modificados", ["Nome da Tela", "Total de Revisões"],
+              pdr_stats['file_counts'].items())
+    
+    by_estado = pd.DataFrame({
+        'count': pdr_stats['count_by_estado'],
+        'time': pdr_stats['time_by_estado']
+    })
+    add_sheet("Por Estado", ["Estado", "Total de Revisões", "Tempo Total (min)"],
+              by_estado.itertuples(name=None))
+    add_sheet("Linhas por Minuto", ["Tipo"] + CHURN_COLUMNS,
+              pdr_stats['churn_by_classification'].itertuples(name=None))
+    
+    # Dados brutos: revisões PDR na mesma ordem da tabela de resultados
+    raw = filtered_df[filtered_df['is_pdr']]
+    add_sheet("Dados", [DISPLAY_COLUMN_NAMES[column] for column in PDR_REPORT_COLUMNS],
+              raw[PDR_REPORT_COLUMNS].itertuples(index=False, name=None))
+    
+    wb.save(path)
+
+PDR_AUDIT_COLUMNS = ['centro', 'working_file', 'revision', 'author', 'date', 'time', 'message']
+
+def write_pdr_audit(output, audit):
+    """Grava a auditoria de formato PDR (resumos e commits fora do formato) em um arquivo ou buffer"""
+    from openpyxl import Workbook
+    
+    wb = Workbook(write_only=True)
+    
+    def add_sheet(title, frame, index_label):
+        ws = wb.create_sheet(title)
+        ws.append([index_label] + list(frame.columns))
+        for row in frame.itertuples(name=None):
+            ws.append([None if pd.isna(value) else value for value in row])
+    
+    add_sheet("Por Regra", audit['by_rule'].to_frame(), "Regra")
+    add_sheet("Por Autor", audit['by_author'], "Autor")
+    add_sheet("Por Centro", audit['by_centro'], "Centro")
+    add_sheet("Fora do Formato", audit['commits'].reset_index(drop=True), "#")
+    wb.save(output)
+
 def normalize_classification(classification, mapping):
     """Normaliza a classificação usando o mapeamento fornecido"""
     if not classification:
@@ -311,18 +217,267 @@ def apply_classification_mapping_to_dataframe(df, mapping):
     
     return df_mapped
 
-def connect_ssh_and_get_log(host, username, password, status_placeholder):
-    """Conecta via SSH e executa o comando para gerar o log"""
-    try:
-        # Criar cliente SSH
-        client = paramiko.SSHClient()
-        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+class DatasetHandle:
+    """Referência de uma sessão a um dataset do registro compartilhado"""
+    def __init__(self, digest):
+        self.digest = digest
+
+class DatasetRegistry:
+    """Registro de datasets compartilhado entre as sessões, com contagem de referências e limite LRU de memória"""
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+    
+    def acquire(self, content, previous=None):
+        """Retorna um handle para o dataset do conteúdo, processando-o apenas se ainda não estiver no registro
         
-        # Conectar ao host
-        client.connect(host, username=username, password=password)
+        As seções inalteradas em relação ao dataset anterior (ou ao mais recente do registro) são reaproveitadas.
+        """
+        def build():
+            base = previous if previous is not None else self.latest_dataset()
+            return parse_log_content(content, base), content
+        return self.acquire_built(content_digest(content), build)
+    
+    def latest_dataset(self):
+        """Retorna o dataset de log usado mais recentemente (ou None)"""
+        with self._lock:
+            for entry in reversed(self._entries.values()):
+                if entry['dataset'].get('sections') is not None:
+                    return entry['dataset']
+        return None
+    
+    def acquire_archive(self, name, data, previous=None):
+        """Como acquire, para um log compactado: o conteúdo é descompactado em fluxo direto para o processamento"""
+        def build():
+            base = previous if previous is not None else self.latest_dataset()
+            return parse_log_stream(lambda: open_compressed(io.BytesIO(data), name), base), None
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        return self.acquire_built(digest, build, archive=(name, data))
+    
+    def acquire_sources(self, results):
+        """Retorna um handle para o dataset que junta as fontes [(nome, digest, dataset)] já processadas"""
+        digest = hashlib.blake2b(digest_size=16)
+        for name, source_digest, _ in results:
+            digest.update(f"{name}:{source_digest}\n".encode('utf-8'))
+        return self.acquire_built(
+            digest.hexdigest(),
+            lambda: (merge_source_datasets([(name, dataset) for name, _, dataset in results]), None)
+        )
+    
+    def acquire_built(self, digest, build, archive=None):
+        """Retorna um handle para o dataset do digest; build() -> (dataset, conteúdo do log ou None) só é chamado se necessário"""
+        with self._lock:
+            entry = self._entries.get(digest)
         
-        # Executar comando para gerar o log
-        command = 'cd "$HOME/telas/Centro/" && mkdir -p "$HOME/Check_log_telas/" && cvs log -N -S > "$HOME/Check_log_telas/Check_log.csv"'
+        parsed_now = False
+        if entry is None:
+            # O processamento ocorre fora do lock para não bloquear as outras sessões
+            dataset, content = build()
+            # Só as tabelas de arquivos e revisões ficam na entrada; os campos do arquivo são juntados
+            # apenas nas linhas exibidas (dataset_rows)
+            nbytes = estimate_nbytes(content) + estimate_nbytes(archive) + estimate_nbytes(dataset)
+            new_entry = {
+                'log_content': content,
+                # Arquivo compactado enviado (nome, bytes), mantido no lugar do texto descompactado
+                'log_archive': archive,
+                'dataset': dataset,
+                'nbytes': int(nbytes),
+                'derived': {},
+                'handles': weakref.WeakSet()
+            }
+            with self._lock:
+                # Outra sessão pode ter carregado o mesmo conteúdo enquanto processávamos
+                entry = self._entries.setdefault(digest, new_entry)
+            parsed_now = entry is new_entry
+        
+        return self.attach(digest), parsed_now
+    
+    def attach(self, digest):
+        """Cria um novo handle para um dataset já registrado (ou None se ele não existir)"""
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            handle = DatasetHandle(digest)
+            entry['handles'].add(handle)
+            self._entries.move_to_end(digest)
+            self._evict()
+            return handle
+    
+    def get(self, handle):
+        """Retorna o dataset referenciado pelo handle (ou None se não existir mais)"""
+        if handle is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(handle.digest)
+            if entry is not None:
+                self._entries.move_to_end(handle.digest)
+            return entry
+    
+    def release(self, handle):
+        """Libera a referência da sessão ao dataset"""
+        if handle is None:
+            return
+        with self._lock:
+            entry = self._entries.get(handle.digest)
+            if entry is not None:
+                entry['handles'].discard(handle)
+            self._evict()
+    
+    def _evict(self):
+        # Remove os datasets menos usados sem sessões ativas até respeitar o limite
+        total = sum(entry['nbytes'] for entry in self._entries.values())
+        for digest in list(self._entries):
+            if total <= self.max_bytes:
+                break
+            entry = self._entries[digest]
+            if len(entry['handles']) == 0:
+                total -= entry['nbytes']
+                del self._entries[digest]
+
+def estimate_nbytes(value):
+    """Estimativa da memória ocupada por um valor guardado nos caches (DataFrames, arrays, textos e objetos compostos)"""
+    if value is None:
+        return 0
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            return int(pd.Series(value.ravel(), dtype=object).memory_usage(deep=True, index=False))
+        return int(value.nbytes)
+    if isinstance(value, (str, bytes, bytearray, int, float)):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_nbytes(item) for item in value.values())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_nbytes(item) for item in value)
+    if hasattr(value, '__dict__'):
+        return estimate_nbytes(vars(value))
+    return sys.getsizeof(value)
+
+def derived_value(entry, key, compute):
+    """Memoriza no registro um valor derivado do dataset (compartilhado entre as sessões)
+    
+    O tamanho do valor é somado ao da entrada (dataset ou resultado) para o limite de memória do cache.
+    """
+    derived = entry['derived']
+    if key not in derived:
+        value = compute()
+        # Se outra sessão calculou o mesmo valor em paralelo, o primeiro é mantido e contado uma única vez
+        if derived.setdefault(key, value) is value:
+            entry['nbytes'] += estimate_nbytes(value)
+    return derived[key]
+
+@st.cache_resource
+def get_dataset_registry():
+    """Retorna o registro de datasets do processo (compartilhado entre as sessões)"""
+    return DatasetRegistry(DATASET_REGISTRY_MAX_MB * 1024 * 1024)
+
+def result_cache_key(digest, filters, mapping):
+    """Chave canônica de um estado de visualização (dataset, filtros e agrupamento de classificações)"""
+    def canonical(value):
+        # A ordem das opções escolhidas nos multiselects não altera o resultado
+        if isinstance(value, (list, tuple, set)):
+            return tuple(sorted(value, key=str))
+        return value
+    
+    return (
+        digest,
+        tuple(sorted((name, canonical(value)) for name, value in filters.items())),
+        tuple(sorted(mapping.items()))
+    )
+
+class ResultCache:
+    """Cache LRU (compartilhado entre as sessões) das linhas filtradas e dos agregados de cada estado de visualização"""
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._results = OrderedDict()
+    
+    def get(self, key):
+        """Retorna o resultado guardado para a chave (ou None)"""
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+            return result
+    
+    def put(self, key, filtered_df, mapped):
+        """Guarda as linhas do resultado filtrado (e as colunas alteradas pelo agrupamento, se houver)"""
+        rows = filtered_df.index.to_numpy()
+        mapped_columns = None
+        if mapped:
+            mapped_columns = {column: filtered_df[column].to_numpy() for column in ('message', 'pdr_classification')}
+        result = {
+            'rows': rows,
+            'mapped': mapped_columns,
+            'derived': {},
+            'nbytes': estimate_nbytes(rows) + estimate_nbytes(mapped_columns)
+        }
+        with self._lock:
+            result = self._results.setdefault(key, result)
+            self._results.move_to_end(key)
+            self._evict()
+        return result
+    
+    def _evict(self):
+        # Remove os resultados menos usados até respeitar o limite (o mais recente sempre fica)
+        total = sum(result['nbytes'] for result in self._results.values())
+        while total > self.max_bytes and len(self._results) > 1:
+            _, result = self._results.popitem(last=False)
+            total -= result['nbytes']
+
+def display_order(entry):
+    """Permutação das linhas do dataset em ordem decrescente de data e hora (calculada uma vez por dataset)"""
+    revisions_df = entry['dataset']['revisions']
+    return derived_value(entry, 'display_order', lambda: revisions_df.sort_values(
+        'timestamp', ascending=False, kind='stable', na_position='last').index.to_numpy())
+
+def ordered_rows(order, rows):
+    """Seleciona as linhas na ordem da permutação com uma máscara (O(n), sem ordenar)"""
+    selected = np.zeros(len(order), dtype=bool)
+    selected[rows] = True
+    return order[selected[order]]
+
+def dataset_rows(dataset, rows):
+    """Revisões das posições pedidas, já com os campos do arquivo (caminho, nome, centro, estado e origem)"""
+    # O índice das revisões é um RangeIndex: rótulos e posições coincidem e são mantidos no resultado
+    return join_revisions(dataset['files'], dataset['revisions'].take(rows))
+
+def result_frame(dataset, result):
+    """Reconstrói o DataFrame filtrado a partir das linhas guardadas no cache"""
+    filtered_df = dataset_rows(dataset, result['rows'])
+    if result['mapped'] is not None:
+        filtered_df = filtered_df.assign(**result['mapped'])
+    return filtered_df
+
+@st.cache_resource
+def get_result_cache():
+    """Retorna o cache de resultados filtrados do processo (compartilhado entre as sessões)"""
+    return ResultCache(RESULT_CACHE_MAX_MB * 1024 * 1024)
+
+def open_ssh_client(host, username, password):
+    """Abre a conexão SSH com o host (no formato host ou host:porta)"""
+    import paramiko
+    
+    hostname, _, port = host.partition(':')
+    client = paramiko.SSHClient()
+    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    client.connect(hostname, port=int(port) if port else 22, username=username, password=password)
+    return client
+
+def fetch_log_via_ssh(host, username, password, on_output=None, on_progress=None,
+                      repository=DEFAULT_REPOSITORY, remote_path=REMOTE_LOG_PATH):
+    """Conecta via SSH, gera o log com cvs log e retorna o conteúdo (exceções são propagadas)"""
+    client = open_ssh_client(host, username, password)
+    
+    try:
+        # Executar comando para gerar o log (remote_path é relativo ao $HOME)
+        remote_dir = os.path.dirname(remote_path)
+        command = f'cd "{repository}" && mkdir -p "$HOME/{remote_dir}/" && cvs log -N -S > "$HOME/{remote_path}"'
         
         # Executar comando e capturar saída em tempo real
         stdin, stdout, stderr = client.exec_command(command, get_pty=True)
@@ -333,79 +488,1909 @@ def connect_ssh_and_get_log(host, username, password, status_placeholder):
             if stdout.channel.recv_ready():
                 line = stdout.channel.recv(1024).decode('latin-1')
                 output_lines.append(line)
-                # Atualizar status com a última linha
-                if line.strip():
-                    status_placeholder.text(f"Executando: {line.strip()}")
+                # Repassar a última linha para quem acompanha o progresso
+                if line.strip() and on_output:
+                    on_output(line.strip())
         
         # Aguardar comando terminar completamente
         stdout.channel.recv_exit_status()
+    
+    finally:
+        # Fechar conexão
+        client.close()
+    
+    # Baixar o arquivo gerado via SFTP (com retomada em caso de queda da conexão)
+    data = download_via_sftp(lambda: open_ssh_client(host, username, password), remote_path, on_progress)
+    
+    # latin-1 aceita qualquer sequência de bytes (mesmo resultado da leitura anterior via cat)
+    return data.decode('latin-1')
+
+def remote_checksum(client, remote_path):
+    """Calcula no servidor o SHA-256 do arquivo (caminho relativo ao $HOME)"""
+    stdin, stdout, stderr = client.exec_command(f'sha256sum "$HOME/{remote_path}"')
+    output = stdout.read().decode('latin-1').split()
+    if not output:
+        raise IOError(f"Não foi possível calcular o checksum de {remote_path} no servidor")
+    return output[0].lower()
+
+_partial_locks = {}
+_partial_locks_guard = threading.Lock()
+
+def _partial_lock(path):
+    # Um lock por arquivo parcial, compartilhado entre as sessões do processo
+    with _partial_locks_guard:
+        return _partial_locks.setdefault(path, threading.Lock())
+
+def download_via_sftp(connect, remote_path, on_progress=None):
+    """Baixa o arquivo via SFTP em blocos lidos em paralelo, retomando do último bloco gravado após falhas
+    
+    O arquivo parcial fica na pasta temporária identificado pelo checksum remoto, então uma nova tentativa
+    (inclusive em outra chamada) continua de onde parou. Se outra sessão já estiver baixando o mesmo arquivo,
+    o download usa um parcial próprio, sem retomada. O resultado é conferido com o checksum antes de retornar.
+    """
+    import paramiko
+    
+    client = connect()
+    try:
+        sftp = client.open_sftp()
+        size = sftp.stat(remote_path).st_size
+        expected = remote_checksum(client, remote_path)
         
-        # Ler o arquivo gerado com diferentes codificações
-        command_cat = 'cat "$HOME/Check_log_telas/Check_log.csv"'
-        stdin, stdout, stderr = client.exec_command(command_cat)
+        partial_path = os.path.join(tempfile.gettempdir(), f"check_log_{expected[:32]}.parcial")
+        partial_lock = _partial_lock(partial_path)
+        if not partial_lock.acquire(blocking=False):
+            partial_lock = None
+            descriptor, partial_path = tempfile.mkstemp(prefix='check_log_', suffix='.parcial')
+            os.close(descriptor)
+    except BaseException:
+        client.close()
+        raise
+    
+    try:
+        try:
+            offset = os.path.getsize(partial_path) if os.path.exists(partial_path) else 0
+            if offset > size:
+                os.remove(partial_path)
+                offset = 0
+            
+            retries = 0
+            with open(partial_path, 'ab') as local:
+                while offset < size:
+                    try:
+                        if sftp is None:
+                            client = connect()
+                            sftp = client.open_sftp()
+                        with sftp.open(remote_path, 'rb') as remote:
+                            while offset < size:
+                                # Uma janela de blocos pedidos de uma vez (leituras em paralelo no mesmo canal)
+                                window_end = min(offset + SFTP_CHUNK_SIZE * SFTP_WINDOW_CHUNKS, size)
+                                chunks = [(start, min(SFTP_CHUNK_SIZE, window_end - start))
+                                          for start in range(offset, window_end, SFTP_CHUNK_SIZE)]
+                                for chunk in remote.readv(chunks):
+                                    local.write(chunk)
+                                    offset += len(chunk)
+                                    # Cada bloco recebido conta como progresso: as tentativas recomeçam
+                                    retries = 0
+                                local.flush()
+                                if on_progress:
+                                    on_progress(offset, size)
+                    except (OSError, EOFError, paramiko.SSHException):
+                        retries += 1
+                        if retries > SFTP_MAX_RETRIES:
+                            raise
+                        # Reabrir a conexão e continuar do último bloco gravado
+                        client.close()
+                        sftp = None
+                        time.sleep(min(SFTP_RETRY_BASE_SECONDS * 2 ** retries, 30))
+        finally:
+            client.close()
         
-        # Tentar diferentes codificações
-        encodings = ['latin-1', 'iso-8859-1', 'utf-8', 'cp1252']
-        log_content = None
+        # Conferir o arquivo completo com o checksum calculado no servidor
+        digest = hashlib.sha256()
+        with open(partial_path, 'rb') as local:
+            for block in iter(lambda: local.read(1024 * 1024), b''):
+                digest.update(block)
+        if digest.hexdigest() != expected:
+            os.remove(partial_path)
+            raise IOError("O log baixado não confere com o checksum do servidor; tente novamente")
         
-        for encoding in encodings:
+        with open(partial_path, 'rb') as local:
+            data = local.read()
+        os.remove(partial_path)
+        return data
+    finally:
+        if partial_lock is not None:
+            partial_lock.release()
+        elif os.path.exists(partial_path):
+            # O parcial próprio não é retomado depois: não deve ficar na pasta temporária
+            os.remove(partial_path)
+
+def connect_ssh_and_get_log(host, username, password, status_placeholder):
+    """Conecta via SSH e executa o comando para gerar o log"""
+    try:
+        return fetch_log_via_ssh(
+            host, username, password,
+            on_output=lambda line: status_placeholder.text(f"Executando: {line}"),
+            on_progress=lambda done, total: status_placeholder.progress(
+                done / total if total else 1.0,
+                text=f"Baixando log: {done / (1024 * 1024):.1f} de {total / (1024 * 1024):.1f} MB"
+            )
+        )
+        
+    except Exception as e:
+        st.error(f"Erro na conexão SSH: {str(e)}")
+        return None
+
+def source_remote_path(name):
+    """Arquivo de log gerado no servidor para a fonte (relativo ao $HOME)"""
+    safe_name = re.sub(r'[^\w.-]', '_', name)
+    return f"Check_log_telas/Check_log_{safe_name}.csv"
+
+def fetch_log_source(source, username, password, previous=None):
+    """Busca e processa o log de uma fonte; executado nos workers, sem acesso à interface"""
+    content = fetch_log_via_ssh(
+        source['host'], source.get('username') or username, source.get('password') or password,
+        repository=source['repository'], remote_path=source_remote_path(source['name'])
+    )
+    return content_digest(content), parse_log_content(content, previous)
+
+def fetch_sources(sources, username, password, previous=None, on_done=None):
+    """Busca as fontes em paralelo e retorna [(nome, digest, dataset)] na ordem da configuração
+    
+    Cada log é processado assim que o seu download termina, então o tempo total fica próximo ao da fonte mais lenta.
+    on_done(nome, concluídas, total) é chamado na thread de quem chamou, nunca nos workers.
+    """
+    results = {}
+    errors = {}
+    with ThreadPoolExecutor(max_workers=min(LOG_SOURCE_WORKERS, len(sources))) as executor:
+        futures = {executor.submit(fetch_log_source, source, username, password, previous): source['name']
+                   for source in sources}
+        for future in as_completed(futures):
+            name = futures[future]
             try:
-                # Reset do buffer de saída
-                stdin, stdout, stderr = client.exec_command(command_cat)
-                log_content = stdout.read().decode(encoding)
-                break
-            except (UnicodeDecodeError, UnicodeError):
+                results[name] = future.result()
+            except Exception as e:
+                errors[name] = str(e)
+            if on_done:
+                on_done(name, len(results) + len(errors), len(sources))
+    
+    if errors:
+        raise IOError("Falha ao buscar " + "; ".join(f"{name}: {error}" for name, error in errors.items()))
+    return [(source['name'],) + results[source['name']] for source in sources]
+
+class LogRefresher:
+    """Atualiza periodicamente o log em segundo plano e troca o snapshot publicado de forma atômica"""
+    def __init__(self, registry, host, username, password, interval_minutes, sources=None):
+        self.registry = registry
+        self.host = host
+        self.username = username
+        self.password = password
+        # Com várias fontes configuradas, todas são buscadas em paralelo e juntadas em um dataset
+        self.sources = sources
+        self.interval_seconds = interval_minutes * 60
+        self.last_error = None
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="log-refresher", daemon=True)
+    
+    def start(self):
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._stop.set()
+    
+    def snapshot(self):
+        """Retorna (handle, data de carga) do snapshot mais recente, ou None"""
+        with self._lock:
+            return self._snapshot
+    
+    def refresh(self):
+        """Busca e processa o log fora do snapshot atual e publica o novo ao final"""
+        if self.sources:
+            results = fetch_sources(self.sources, self.username, self.password, self.registry.latest_dataset())
+            handle, _ = self.registry.acquire_sources(results)
+        else:
+            content = fetch_log_via_ssh(self.host, self.username, self.password)
+            handle, _ = self.registry.acquire(content)
+        with self._lock:
+            # O handle anterior é liberado ao ser substituído
+            self._snapshot = (handle, datetime.now())
+    
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+            self._stop.wait(self.interval_seconds)
+
+def read_secrets_section(name):
+    """Lê uma seção opcional de .streamlit/secrets.toml (None se não existir)"""
+    try:
+        settings = st.secrets.get(name)
+    except Exception:
+        return None
+    return dict(settings) if settings else None
+
+def get_refresher_settings():
+    """Lê a configuração opcional [log_refresher] de .streamlit/secrets.toml"""
+    settings = read_secrets_section("log_refresher")
+    if not settings or not settings.get("username") or not settings.get("password"):
+        return None
+    return settings
+
+def get_log_sources():
+    """Lê a lista opcional [[log_sources]] (nome, host e repositório de cada fonte) de .streamlit/secrets.toml"""
+    try:
+        configured = st.secrets.get("log_sources")
+    except Exception:
+        return []
+    sources = []
+    for settings in configured or []:
+        source = dict(settings)
+        if not source.get("name"):
+            continue
+        source.setdefault("host", DEFAULT_HOST)
+        source.setdefault("repository", DEFAULT_REPOSITORY)
+        sources.append(source)
+    return sources
+
+def get_rcs_mirror_settings():
+    """Lê a configuração opcional [rcs_mirror] (espelho local dos arquivos ,v) de .streamlit/secrets.toml"""
+    settings = read_secrets_section("rcs_mirror")
+    if not settings or not settings.get("path"):
+        return None
+    # Caminho do repositório no servidor CVS, usado para montar o "RCS file:" de cada arquivo
+    settings.setdefault("cvs_root", settings["path"])
+    return settings
+
+@st.cache_resource
+def get_log_refresher():
+    """Inicia o atualizador em segundo plano do processo, se houver credenciais de serviço configuradas"""
+    settings = get_refresher_settings()
+    if settings is None:
+        return None
+    return LogRefresher(
+        get_dataset_registry(),
+        settings.get("host", DEFAULT_HOST),
+        settings["username"],
+        settings["password"],
+        float(settings.get("interval_minutes", 60)),
+        get_log_sources()
+    ).start()
+
+def normalize_text(text):
+    """Normaliza o texto para busca: minúsculas e sem acentos (ex: 'Camaçari' -> 'camacari')"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+class MessageIndex:
+    """Índice invertido de tokens das mensagens de commit (construído uma vez por dataset)"""
+    def __init__(self, messages):
+        self.size = len(messages)
+        messages = pd.Series(messages).fillna('').reset_index(drop=True)
+        
+        # A normalização é feita uma vez por mensagem distinta
+        unique_messages = messages.unique()
+        normalized = {message: normalize_text(message) for message in unique_messages}
+        tokens = messages.map(normalized).str.findall(TOKEN_PATTERN).explode().dropna()
+        
+        postings = pd.DataFrame({'token': tokens.to_numpy(dtype=object), 'row': tokens.index.to_numpy()})
+        postings = postings.drop_duplicates().sort_values(['token', 'row'])
+        
+        # Tokens ordenados permitem buscar prefixos com searchsorted
+        self.tokens, starts = np.unique(postings['token'].to_numpy(dtype=str), return_index=True)
+        self._rows = postings['row'].to_numpy(dtype=np.int64)
+        self._bounds = np.append(starts, len(self._rows))
+    
+    def _term_rows(self, term):
+        # Termos terminados em * buscam todos os tokens com o prefixo
+        if term.endswith('*'):
+            prefix = term[:-1]
+            first = np.searchsorted(self.tokens, prefix, side='left')
+            last = np.searchsorted(self.tokens, prefix + '\uffff', side='left')
+        else:
+            first = np.searchsorted(self.tokens, term, side='left')
+            last = first + 1 if first < len(self.tokens) and self.tokens[first] == term else first
+        if first >= last:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(self._rows[self._bounds[first]:self._bounds[last]])
+    
+    @staticmethod
+    def _query_tokens(term):
+        # O termo é quebrado como as mensagens (ex: "otrs-1234" -> otrs, 1234); o * fica no último token
+        tokens = TOKEN_PATTERN.findall(normalize_text(term))
+        if tokens and term.endswith('*'):
+            tokens[-1] += '*'
+        return tokens
+    
+    def search(self, query):
+        """Retorna as posições das linhas que atendem à consulta
+        
+        Termos separados por espaço são combinados com E; grupos separados por OU/OR
+        são combinados com OU; um * no final do termo busca por prefixo.
+        """
+        result = np.empty(0, dtype=np.int64)
+        for group in re.split(r'\s+(?:OU|OR)\s+', query.strip()):
+            terms = [token for term in group.split() for token in self._query_tokens(term)]
+            if not terms:
                 continue
+            group_rows = self._term_rows(terms[0])
+            for term in terms[1:]:
+                group_rows = np.intersect1d(group_rows, self._term_rows(term), assume_unique=True)
+            result = np.union1d(result, group_rows)
+        return result
+    
+    def search_mask(self, query):
+        """Máscara booleana (por posição de linha) com o resultado da consulta"""
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.search(query)] = True
+        return mask
+
+BRANCH_MODES = {'Todos': 'all', 'Somente trunk': 'trunk', 'Somente branches': 'branch'}
+
+def file_filter_mask(files_df, filters):
+    """Máscara por arquivo dos filtros de Centro, Estado, caminho e nome (levada às linhas pelo file_id)"""
+    file_mask = np.ones(len(files_df), dtype=bool)
+    if filters.get('centros'):
+        file_mask &= files_df['centro'].isin(filters['centros']).to_numpy()
+    if filters.get('estados'):
+        file_mask &= files_df['estado'].isin(filters['estados']).to_numpy()
+    if filters.get('path'):
+        file_mask &= files_df['path'].str.contains(filters['path'], case=False, na=False).to_numpy()
+    if filters.get('filenames'):
+        file_mask &= files_df['name'].isin(filters['filenames']).to_numpy()
+    return file_mask
+
+def apply_filters(df, files_df, filters, message_index=None):
+    """Aplica os filtros da barra lateral ao DataFrame de revisões (os campos do arquivo vêm de files_df pelo file_id)"""
+    filtered_df = df
+    
+    # Busca na mensagem (o índice trabalha com as posições das linhas de df)
+    if filters.get('search') and message_index is not None:
+        filtered_df = filtered_df.loc[message_index.search_mask(filters['search'])]
+    
+    # Filtro PDR
+    if filters['pdr_only']:
+        filtered_df = filtered_df.loc[filtered_df['is_pdr'] == True]
+    
+    # Filtro Ignorar Ana e Dig
+    if filters['ignore_ana_dig']:
+        filtered_df = filtered_df.loc[~file_flag_for_rows(files_df, 'is_ana_dig', filtered_df)]
+    
+    # Filtro Ignorar arquivos temporários (sempre aplicado)
+    if filters['ignore_temp_files']:
+        filtered_df = filtered_df.loc[~file_flag_for_rows(files_df, 'is_temp', filtered_df)]
+    
+    # Filtro excluídos
+    if filters['ignore_excluded']:
+        filtered_df = filtered_df.loc[~file_flag_for_rows(files_df, 'is_attic', filtered_df)]
+    
+    # Filtro revisões "dead" (remoções registradas pelo cvs)
+    if filters.get('ignore_dead'):
+        filtered_df = filtered_df.loc[(filtered_df['state'] != 'dead').to_numpy()]
+    
+    # Filtro trunk/branches (profundidade 0 = trunk)
+    if filters.get('branch_mode') == 'trunk':
+        filtered_df = filtered_df.loc[filtered_df['depth'].to_numpy() == 0]
+    elif filters.get('branch_mode') == 'branch':
+        filtered_df = filtered_df.loc[filtered_df['depth'].to_numpy() > 0]
+    
+    # Filtro por origem (datasets de várias fontes)
+    if filters.get('sources') and 'source' in files_df:
+        source_mask = files_df['source'].isin(filters['sources']).to_numpy()
+        filtered_df = filtered_df.loc[source_mask[filtered_df['file_id'].to_numpy()]]
+    
+    # Filtros por Centro, Estado, caminho e nome do arquivo, calculados uma vez por arquivo
+    file_mask = file_filter_mask(files_df, filters)
+    if not file_mask.all():
+        filtered_df = filtered_df.loc[file_mask[filtered_df['file_id'].to_numpy()]]
+    
+    # Filtro por autor
+    if filters['authors']:
+        filtered_df = filtered_df.loc[filtered_df['author'].isin(filters['authors'])]
+    
+    # Filtro por data
+    try:
+        date_dt = pd.to_datetime(filtered_df['date'], format='%d/%m/%Y', errors='coerce')
+        
+        if filters['start_date']:
+            start_datetime = datetime.combine(filters['start_date'], datetime.min.time())
+            filtered_df = filtered_df.loc[date_dt >= start_datetime]
+            date_dt = date_dt.loc[filtered_df.index]
+        
+        if filters['end_date']:
+            end_datetime = datetime.combine(filters['end_date'], datetime.max.time())
+            filtered_df = filtered_df.loc[date_dt <= end_datetime]
+    except:
+        pass
+    
+    return filtered_df
+
+def get_date_bounds(df):
+    """Retorna as datas mínima e máxima das revisões (NaT se não houver datas válidas)"""
+    date_dt = pd.to_datetime(df['date'], format='%d/%m/%Y', errors='coerce')
+    return date_dt.min(), date_dt.max()
+
+def get_filtered_options(files_df, revisions_df, ignore_ana_dig=True, ignore_temp_files=True):
+    """Retorna opções filtradas para os selectboxes baseado nos filtros aplicados"""
+    # Os filtros básicos dependem apenas do arquivo, então são aplicados na tabela de arquivos
+    file_mask = pd.Series(True, index=files_df.index)
+    if ignore_ana_dig:
+        file_mask &= ~files_df['is_ana_dig']
+    
+    # Filtrar arquivos temporários (sempre True)
+    if ignore_temp_files:
+        file_mask &= ~files_df['is_temp']
+    
+    filtered_files = files_df.loc[file_mask]
+    authors = revisions_df.loc[file_mask.to_numpy()[revisions_df['file_id'].to_numpy()], 'author']
+    
+    # Extrair opções filtradas
+    options = {
+        'filenames': sorted(filtered_files['name'].unique()),
+        'authors': sorted(authors.dropna().unique()),
+        'centros': sorted(filtered_files['centro'].dropna().unique()),
+        'estados': sorted(filtered_files['estado'].dropna().unique()),
+        'sources': list(files_df['source'].cat.categories) if 'source' in files_df else []
+    }
+    
+    return options
+
+CENTRO_STATS_COLUMNS = ['Tempo Total (min)', 'Tempo Médio (min)', 'Tempo Máximo (min)', 'Total de Revisões', 'Arquivos Únicos']
+
+def compute_pdr_aggregates(filtered_df):
+    """Calcula os agregados da análise PDR considerando apenas registros com classificação e tempo"""
+    pdr_df = filtered_df[
+        (filtered_df['pdr_classification'].notna()) & 
+        (filtered_df['pdr_time'].notna())
+    ]
+    
+    centro_analysis = pdr_df[pdr_df['centro'].notna()]
+    estado_analysis = pdr_df[pdr_df['estado'].notna()]
+    
+    centro_stats = centro_analysis.groupby('centro').agg({
+        'pdr_time': ['sum', 'mean', 'max', 'count'],
+        'working_file': 'nunique'
+    }).round(2)
+    centro_stats.columns = CENTRO_STATS_COLUMNS
+    
+    return {
+        'total_revisions': len(pdr_df),
+        'total_time': pdr_df['pdr_time'].sum(),
+        'avg_time': pdr_df['pdr_time'].mean(),
+        'max_time': pdr_df['pdr_time'].max(),
+        'total_files': pdr_df['working_file'].nunique(),
+        'classification_counts': pdr_df['pdr_classification'].value_counts(),
+        'file_counts': pdr_df['working_file'].value_counts().head(5),
+        'time_by_classification': pdr_df.groupby('pdr_classification')['pdr_time'].sum().sort_values(ascending=False),
+        'time_by_file': pdr_df.groupby('working_file')['pdr_time'].sum().sort_values(ascending=False).head(10),
+        'count_by_centro': centro_analysis['centro'].value_counts().sort_values(ascending=False),
+        'time_by_centro': centro_analysis.groupby('centro')['pdr_time'].sum().sort_values(ascending=False),
+        'centro_stats': centro_stats,
+        'count_by_estado': estado_analysis['estado'].value_counts().sort_values(ascending=False).head(10),
+        'time_by_estado': estado_analysis.groupby('estado')['pdr_time'].sum().sort_values(ascending=False).head(10),
+        'churn_by_classification': churn_per_minute(
+            pdr_df.assign(lines_changed=pdr_df['lines_added'] + pdr_df['lines_removed'])
+            .groupby('pdr_classification')[['lines_changed', 'pdr_time']].sum()
+        )
+    }
+
+def compute_pdr_audit(filtered_df, rules):
+    """Agrupa por regra, autor e centro as revisões filtradas fora do formato #CLASSIFICAÇÃO#TEMPO#COMENTÁRIO
+    
+    rules traz uma coluna booleana por regra (audit_pdr_messages) alinhada às linhas de filtered_df.
+    """
+    matrix = rules.to_numpy(dtype=bool)
+    violations = matrix.any(axis=1)
+    counts = rules.loc[violations].rename(columns=PDR_AUDIT_RULES).astype(int)
+    # Apenas as colunas da tabela de commits (que incluem autor e centro) são copiadas
+    violating = filtered_df[PDR_AUDIT_COLUMNS].loc[violations]
+    
+    def grouped(column, missing_label):
+        keys = violating[column].fillna(missing_label).to_numpy()
+        table = counts.groupby(keys).sum()
+        table.insert(0, 'Total', counts.index.to_series().groupby(keys).size())
+        return table.sort_values('Total', ascending=False)
+    
+    # Regras violadas por commit, em um texto só para a tabela e a exportação: montado uma vez por
+    # combinação de regras (bits da linha) e não por commit
+    combinations = matrix[violations] @ (1 << np.arange(matrix.shape[1]))
+    labels = np.array(['; '.join(label for bit, label in enumerate(counts.columns) if code >> bit & 1)
+                       for code in range(1 << matrix.shape[1])], dtype=object)
+    
+    # Classificação válida mais próxima, calculada uma vez por valor desconhecido (lido de cada mensagem distinta)
+    unknown = np.flatnonzero(matrix[violations, list(PDR_AUDIT_RULES).index('classificacao_desconhecida')])
+    message_codes, messages = pd.factorize(violating['message'].take(unknown))
+    value_codes, values = pd.factorize(pd.Series(messages, dtype=object).str.extract(r'^#([^#]*)', expand=False))
+    suggested = np.array([suggest_classification(value) for value in values], dtype=object)
+    suggestions = np.full(len(violating), None, dtype=object)
+    suggestions[unknown] = suggested[value_codes][message_codes]
+    
+    commits = violating.rename(columns=DISPLAY_COLUMN_NAMES)
+    commits['Regras'] = labels[combinations]
+    commits['Sugestão'] = suggestions
+    
+    return {
+        'total': len(filtered_df),
+        'violations': int(violations.sum()),
+        'by_rule': counts.sum().rename('Commits'),
+        'by_author': grouped('author', '(sem autor)'),
+        'by_centro': grouped('centro', '(sem centro)'),
+        'commits': commits
+    }
+
+CHURN_COLUMNS = ['Linhas Alteradas', 'Tempo Total (min)', 'Linhas por Minuto']
+
+def churn_per_minute(totals):
+    """Recebe linhas alteradas e tempo PDR por classificação e calcula as linhas por minuto"""
+    totals = totals.copy()
+    totals.columns = CHURN_COLUMNS[:2]
+    totals.index.name = 'Classificação'
+    minutes = totals['Tempo Total (min)']
+    totals['Linhas por Minuto'] = (totals['Linhas Alteradas'] / minutes.where(minutes > 0)).round(2)
+    return totals.sort_values('Linhas Alteradas', ascending=False)
+
+def compute_churn_by_file(filtered_df, top=10):
+    """Linhas adicionadas e removidas por arquivo (arquivos com maior churn primeiro)"""
+    churn = filtered_df.groupby('working_file').agg(
+        lines_added=('lines_added', 'sum'),
+        lines_removed=('lines_removed', 'sum'),
+        revisions=('revision', 'size')
+    )
+    churn['lines_changed'] = churn['lines_added'] + churn['lines_removed']
+    return churn.sort_values('lines_changed', ascending=False).head(top)
+
+STORE_COLUMNS = ['rcs_file', 'revision', 'working_file', 'author', 'date', 'time', 'message', 'is_pdr',
+                 'pdr_classification', 'pdr_time', 'pdr_description', 'centro', 'estado',
+                 'is_attic', 'is_temp', 'is_ana_dig', 'state', 'lines_added', 'lines_removed', 'depth', 'source']
+# Caminhos iguais em hosts diferentes são revisões distintas; cargas de uma única fonte usam a origem ''
+STORE_KEY_COLUMNS = ['rcs_file', 'revision', 'source']
+STORE_INDEXED_COLUMNS = ['date', 'centro', 'estado', 'author', 'working_file', 'pdr_classification']
+# Cargas mantidas na base (as usadas há mais tempo saem primeiro, com as revisões que só elas tinham)
+STORE_MAX_LOADS = 8
+
+def _revisions_table_sql(name):
+    return f"""
+        CREATE TABLE IF NOT EXISTS {name} (
+            id INTEGER PRIMARY KEY,
+            rcs_file TEXT NOT NULL,
+            revision TEXT NOT NULL,
+            working_file TEXT, author TEXT, date TEXT, time TEXT, message TEXT,
+            is_pdr INTEGER, pdr_classification TEXT, pdr_time REAL, pdr_description TEXT,
+            centro TEXT, estado TEXT, is_attic INTEGER, is_temp INTEGER, is_ana_dig INTEGER,
+            state TEXT, lines_added INTEGER, lines_removed INTEGER, depth INTEGER,
+            source TEXT NOT NULL DEFAULT '',
+            UNIQUE ({', '.join(STORE_KEY_COLUMNS)})
+        )"""
+
+def _sqlite_regexp(pattern, value):
+    # Mesmo comportamento do str.contains(case=False) usado no filtro por caminho
+    if value is None:
+        return False
+    return _compile_path_pattern(pattern).search(value) is not None
+
+_path_patterns = {}
+
+def _compile_path_pattern(pattern):
+    compiled = _path_patterns.get(pattern)
+    if compiled is None:
+        compiled = _path_patterns[pattern] = re.compile(pattern, re.IGNORECASE)
+    return compiled
+
+class RevisionStore:
+    """Base local SQLite com as revisões das cargas recentes, consultada com os filtros em SQL
+    
+    Cada carga (digest do dataset) registra as revisões que contém; as consultas se restringem à carga da sessão.
+    """
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.create_function("REGEXP", 2, _sqlite_regexp, deterministic=True)
+        with self._conn:
+            self._conn.execute(_revisions_table_sql('revisions'))
+            # Bases criadas antes das colunas de estado, linhas alteradas, profundidade e origem
+            existing = {row[1] for row in self._conn.execute("PRAGMA table_info(revisions)")}
+            for column, column_type in [('state', 'TEXT'), ('lines_added', 'INTEGER'), ('lines_removed', 'INTEGER'),
+                                        ('depth', 'INTEGER'), ('source', "TEXT NOT NULL DEFAULT ''")]:
+                if column not in existing:
+                    self._conn.execute(f"ALTER TABLE revisions ADD COLUMN {column} {column_type}")
+            self._migrate_table()
+            for column in STORE_INDEXED_COLUMNS:
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_revisions_{column} ON revisions({column})")
+            # Cargas gravadas (pelo digest) e as revisões de cada uma; bases anteriores não tinham o registro
+            if 'id' not in {row[1] for row in self._conn.execute("PRAGMA table_info(loads)")}:
+                self._conn.execute("DROP TABLE IF EXISTS loads")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS loads (id INTEGER PRIMARY KEY, digest TEXT NOT NULL UNIQUE, used_at TEXT)")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS load_revisions (
+                    load_id INTEGER NOT NULL,
+                    revision_id INTEGER NOT NULL,
+                    PRIMARY KEY (load_id, revision_id)
+                ) WITHOUT ROWID""")
+    
+    def _migrate_table(self):
+        # Bases sem o id das revisões (chave (rcs_file, revision) ou sem a origem na chave) são reconstruídas;
+        # as linhas antigas ficam com a origem ''
+        if 'id' in {row[1] for row in self._conn.execute("PRAGMA table_info(revisions)")}:
+            return
+        columns = ', '.join(STORE_COLUMNS)
+        values = ', '.join("COALESCE(source, '')" if column == 'source' else column for column in STORE_COLUMNS)
+        self._conn.execute("DROP TABLE IF EXISTS revisions_migration")
+        self._conn.execute(_revisions_table_sql('revisions_migration'))
+        self._conn.execute(f"INSERT OR REPLACE INTO revisions_migration ({columns}) SELECT {values} FROM revisions")
+        self._conn.execute("DROP TABLE revisions")
+        self._conn.execute("ALTER TABLE revisions_migration RENAME TO revisions")
+    
+    def ingest(self, digest, dataset):
+        """Grava (upsert por rcs_file, revision e origem) as revisões de um dataset e registra a carga
+        
+        Um digest já registrado não é gravado de novo (apenas marcado como usado agora). Acima de STORE_MAX_LOADS
+        cargas, as usadas há mais tempo são removidas com as revisões que nenhuma outra carga contém.
+        """
+        if self._touch(digest):
+            return False
+        
+        files_df = dataset['files']
+        df = join_revisions(files_df, dataset['revisions'])
+        rows_df = df[['rcs_file', 'revision', 'working_file', 'author', 'date', 'time', 'message', 'is_pdr',
+                      'pdr_classification', 'pdr_time', 'pdr_description', 'centro', 'estado']].copy()
+        rows_df['state'] = df['state'].astype(object)
+        rows_df['lines_added'] = df['lines_added'].astype(int)
+        rows_df['lines_removed'] = df['lines_removed'].astype(int)
+        rows_df['depth'] = df['depth'].astype(int)
+        rows_df['source'] = df['source'].astype(object) if 'source' in df else ''
+        # Datas em ISO para permitir consultas por intervalo no índice
+        rows_df['date'] = pd.to_datetime(rows_df['date'], format='%d/%m/%Y', errors='coerce').dt.strftime('%Y-%m-%d')
+        rows_df['is_pdr'] = rows_df['is_pdr'].astype(int)
+        for flag in ['is_attic', 'is_temp', 'is_ana_dig']:
+            rows_df[flag] = file_flag_for_rows(files_df, flag, df).astype(int)
+        rows_df = rows_df[STORE_COLUMNS]
+        rows_df = rows_df.astype(object).where(rows_df.notna(), None)
+        
+        key = ', '.join(STORE_KEY_COLUMNS)
+        placeholders = ', '.join('?' * len(STORE_COLUMNS))
+        updates = ', '.join(f"{column} = excluded.{column}" for column in STORE_COLUMNS if column not in STORE_KEY_COLUMNS)
+        with self._lock, self._conn:
+            # Outra sessão pode ter gravado o mesmo dataset enquanto as linhas eram preparadas
+            if self._conn.execute("SELECT 1 FROM loads WHERE digest = ?", (digest,)).fetchone():
+                return False
+            self._conn.executemany(
+                f"INSERT INTO revisions ({', '.join(STORE_COLUMNS)}) VALUES ({placeholders}) "
+                f"ON CONFLICT({key}) DO UPDATE SET {updates}",
+                rows_df.itertuples(index=False, name=None)
+            )
+            load_id = self._conn.execute("INSERT INTO loads (digest, used_at) VALUES (?, ?)",
+                                         (digest, datetime.now().isoformat())).lastrowid
+            
+            # Revisões da carga, localizadas pela chave
+            self._conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS loaded_keys ({key}, PRIMARY KEY ({key}))")
+            self._conn.execute("DELETE FROM loaded_keys")
+            self._conn.executemany(f"INSERT OR IGNORE INTO loaded_keys VALUES ({', '.join('?' * len(STORE_KEY_COLUMNS))})",
+                                   rows_df[STORE_KEY_COLUMNS].itertuples(index=False, name=None))
+            self._conn.execute(f"INSERT INTO load_revisions SELECT ?, revisions.id FROM loaded_keys "
+                               f"JOIN revisions USING ({key})", (load_id,))
+            self._conn.execute("DELETE FROM loaded_keys")
+            self._prune(load_id)
+        return True
+    
+    def _touch(self, digest):
+        # Marca a carga como usada agora; False se ela ainda não foi gravada
+        with self._lock, self._conn:
+            return self._conn.execute("UPDATE loads SET used_at = ? WHERE digest = ?",
+                                      (datetime.now().isoformat(), digest)).rowcount > 0
+    
+    def _prune(self, load_id):
+        # Remove as cargas usadas há mais tempo (nunca a que acabou de ser gravada) e as revisões de nenhuma carga
+        stale = [row[0] for row in self._conn.execute(
+            "SELECT id FROM loads WHERE id != ? ORDER BY used_at DESC LIMIT -1 OFFSET ?", (load_id, STORE_MAX_LOADS - 1))]
+        if stale:
+            marks = ', '.join('?' * len(stale))
+            self._conn.execute(f"DELETE FROM load_revisions WHERE load_id IN ({marks})", stale)
+            self._conn.execute(f"DELETE FROM loads WHERE id IN ({marks})", stale)
+        self._conn.execute("DELETE FROM revisions WHERE id NOT IN (SELECT revision_id FROM load_revisions)")
+    
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM revisions").fetchone()[0]
+    
+    def _where(self, digest, filters):
+        # Converte os filtros da barra lateral em cláusula WHERE parametrizada, sempre restrita à carga do digest
+        clauses = ["id IN (SELECT revision_id FROM load_revisions JOIN loads ON loads.id = load_id WHERE digest = ?)"]
+        params = [digest]
+        if filters.get('pdr_only'):
+            clauses.append("is_pdr = 1")
+        if filters.get('ignore_ana_dig'):
+            clauses.append("is_ana_dig = 0")
+        if filters.get('ignore_temp_files'):
+            clauses.append("is_temp = 0")
+        if filters.get('ignore_excluded'):
+            clauses.append("is_attic = 0")
+        if filters.get('ignore_dead'):
+            clauses.append("state IS NOT 'dead'")
+        if filters.get('branch_mode') == 'trunk':
+            clauses.append("COALESCE(depth, 0) = 0")
+        elif filters.get('branch_mode') == 'branch':
+            clauses.append("depth > 0")
+        for key, column in [('centros', 'centro'), ('estados', 'estado'), ('filenames', 'working_file'),
+                            ('authors', 'author'), ('sources', 'source')]:
+            values = filters.get(key)
+            if values:
+                clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        if filters.get('path'):
+            clauses.append("rcs_file REGEXP ?")
+            params.append(filters['path'])
+        if filters.get('start_date'):
+            clauses.append("date >= ?")
+            params.append(filters['start_date'].strftime('%Y-%m-%d'))
+        if filters.get('end_date'):
+            clauses.append("date <= ?")
+            params.append(filters['end_date'].strftime('%Y-%m-%d'))
+        return " WHERE " + " AND ".join(clauses), params
+    
+    def _read(self, sql, params=()):
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, params=params)
+    
+    def query(self, digest, filters):
+        """Carrega apenas as revisões da carga que atendem aos filtros"""
+        where, params = self._where(digest, filters)
+        result = self._read(
+            "SELECT centro, estado, rcs_file, working_file, source, revision, author, "
+            "substr(date, 9, 2) || '/' || substr(date, 6, 2) || '/' || substr(date, 1, 4) AS date, "
+            "time, message, is_pdr, pdr_classification, pdr_time, pdr_description, "
+            "state, COALESCE(lines_added, 0) AS lines_added, COALESCE(lines_removed, 0) AS lines_removed "
+            # Mesma ordem da tabela de resultados (mais recentes primeiro); "date" sozinho seria o alias formatado
+            f"FROM revisions{where} ORDER BY revisions.date DESC, revisions.time DESC",
+            params
+        )
+        result['is_pdr'] = result['is_pdr'].astype(bool)
+        result['pdr_time'] = result['pdr_time'].astype(float)
+        result['state'] = result['state'].astype('category')
+        return result
+    
+    def filter_options(self, digest, ignore_ana_dig=True, ignore_temp_files=True):
+        """Mesmo resultado de get_filtered_options, calculado com SELECT DISTINCT nas revisões da carga"""
+        where, params = self._where(digest, {'ignore_ana_dig': ignore_ana_dig, 'ignore_temp_files': ignore_temp_files})
+        options = {}
+        for key, column in [('filenames', 'working_file'), ('authors', 'author'),
+                            ('centros', 'centro'), ('estados', 'estado'), ('sources', 'source')]:
+            values = self._read(f"SELECT DISTINCT {column} AS value FROM revisions{where}", params)['value']
+            # A origem '' (cargas de uma única fonte) não é uma opção do filtro
+            options[key] = sorted(value for value in values.dropna() if value != '')
+        return options
+    
+    def date_bounds(self, digest):
+        where, params = self._where(digest, {})
+        bounds = self._read(f"SELECT MIN(date) AS min_date, MAX(date) AS max_date FROM revisions{where}", params)
+        return (pd.to_datetime(bounds['min_date'].iloc[0], format='%Y-%m-%d'),
+                pd.to_datetime(bounds['max_date'].iloc[0], format='%Y-%m-%d'))
+    
+    def pdr_aggregates(self, digest, filters, mapping=None):
+        """Mesmo resultado de compute_pdr_aggregates, calculado em SQL sobre as revisões filtradas da carga"""
+        where, params = self._where(digest, filters)
+        
+        # Agrupamentos de classificações são aplicados na própria consulta
+        classification = "pdr_classification"
+        classification_params = []
+        if mapping:
+            cases = " ".join("WHEN ? THEN ?" for _ in mapping)
+            classification = f"CASE pdr_classification {cases} ELSE pdr_classification END"
+            for old, new in mapping.items():
+                classification_params.extend([old, new])
+        
+        valid = "pdr_classification IS NOT NULL AND pdr_time IS NOT NULL"
+        where = f"{where} AND {valid}"
+        source = f"(SELECT {classification} AS classification, * FROM revisions{where})"
+        source_params = classification_params + params
+        
+        def series(sql, name):
+            result = self._read(sql.format(source=source), source_params)
+            return pd.Series(result['value'].to_numpy(), index=pd.Index(result['key'], name=name))
+        
+        totals = self._read(
+            f"SELECT COUNT(*) AS total_revisions, SUM(pdr_time) AS total_time, AVG(pdr_time) AS avg_time, "
+            f"MAX(pdr_time) AS max_time, COUNT(DISTINCT working_file) AS total_files FROM {source}",
+            source_params
+        ).iloc[0]
+        
+        centro_stats = self._read(
+            f"SELECT centro, SUM(pdr_time), AVG(pdr_time), MAX(pdr_time), COUNT(*), COUNT(DISTINCT working_file) "
+            f"FROM {source} WHERE centro IS NOT NULL GROUP BY centro ORDER BY centro",
+            source_params
+        ).set_index('centro').round(2)
+        centro_stats.columns = CENTRO_STATS_COLUMNS
+        
+        return {
+            'total_revisions': int(totals['total_revisions']),
+            'total_time': totals['total_time'],
+            'avg_time': totals['avg_time'],
+            'max_time': totals['max_time'],
+            'total_files': int(totals['total_files']),
+            'classification_counts': series("SELECT classification AS key, COUNT(*) AS value FROM {source} GROUP BY key ORDER BY value DESC", 'pdr_classification'),
+            'file_counts': series("SELECT working_file AS key, COUNT(*) AS value FROM {source} GROUP BY key ORDER BY value DESC LIMIT 5", 'working_file'),
+            'time_by_classification': series("SELECT classification AS key, SUM(pdr_time) AS value FROM {source} GROUP BY key ORDER BY value DESC", 'pdr_classification'),
+            'time_by_file': series("SELECT working_file AS key, SUM(pdr_time) AS value FROM {source} GROUP BY key ORDER BY value DESC LIMIT 10", 'working_file'),
+            'count_by_centro': series("SELECT centro AS key, COUNT(*) AS value FROM {source} WHERE centro IS NOT NULL GROUP BY key ORDER BY value DESC", 'centro'),
+            'time_by_centro': series("SELECT centro AS key, SUM(pdr_time) AS value FROM {source} WHERE centro IS NOT NULL GROUP BY key ORDER BY value DESC", 'centro'),
+            'centro_stats': centro_stats,
+            'count_by_estado': series("SELECT estado AS key, COUNT(*) AS value FROM {source} WHERE estado IS NOT NULL GROUP BY key ORDER BY value DESC LIMIT 10", 'estado'),
+            'time_by_estado': series("SELECT estado AS key, SUM(pdr_time) AS value FROM {source} WHERE estado IS NOT NULL GROUP BY key ORDER BY value DESC LIMIT 10", 'estado'),
+            'churn_by_classification': churn_per_minute(self._read(
+                f"SELECT classification, SUM(COALESCE(lines_added, 0) + COALESCE(lines_removed, 0)), SUM(pdr_time) "
+                f"FROM {source} GROUP BY classification",
+                source_params
+            ).set_index('classification'))
+        }
+
+@st.cache_resource
+def get_revision_store():
+    """Abre a base SQLite opcional configurada em [sqlite_store] path no secrets.toml"""
+    settings = read_secrets_section("sqlite_store")
+    if not settings or not settings.get("path"):
+        return None
+    return RevisionStore(settings["path"])
+
+class PdrReportCache:
+    """Gera os Relatórios PDR em um pool de threads e mantém os arquivos em disco por estado dos filtros (LRU)"""
+    def __init__(self, max_reports, workers):
+        self.max_reports = max_reports
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="relatorio-pdr")
+        self._directory = tempfile.mkdtemp(prefix="relatorio_pdr_")
+        self._lock = threading.Lock()
+        self._reports = OrderedDict()
+    
+    def get(self, key):
+        """Retorna (caminho, future) do relatório do estado de filtros, ou None se ainda não foi pedido"""
+        with self._lock:
+            report = self._reports.get(key)
+            if report is not None:
+                self._reports.move_to_end(key)
+            return report
+    
+    def submit(self, key, filtered_df):
+        """Agenda a geração do relatório (apenas uma vez por estado de filtros) e retorna (caminho, future)"""
+        with self._lock:
+            report = self._reports.get(key)
+            if report is None:
+                name = hashlib.blake2b(repr(key).encode('utf-8'), digest_size=16).hexdigest()
+                path = os.path.join(self._directory, f"{name}.xlsx")
+                report = (path, self._executor.submit(self._generate, path, filtered_df))
+                self._reports[key] = report
+            self._reports.move_to_end(key)
+            self._evict()
+            return report
+    
+    def discard(self, key):
+        """Esquece o relatório do estado de filtros (ex: para gerar de novo após um erro)"""
+        with self._lock:
+            report = self._reports.pop(key, None)
+        if report is not None and report[1].done() and os.path.exists(report[0]):
+            os.remove(report[0])
+    
+    def _generate(self, path, filtered_df):
+        # Gravado em arquivo temporário e renomeado ao final: um relatório pela metade nunca é servido
+        partial_path = path + ".parcial"
+        write_pdr_report(partial_path, filtered_df)
+        os.replace(partial_path, path)
+        return path
+    
+    def _evict(self):
+        # Remove os relatórios concluídos mais antigos além do limite
+        for key in list(self._reports):
+            if len(self._reports) <= self.max_reports:
+                break
+            path, future = self._reports[key]
+            if future.done():
+                del self._reports[key]
+                if os.path.exists(path):
+                    os.remove(path)
+
+@st.cache_resource
+def get_pdr_reports():
+    """Retorna o gerador de Relatórios PDR do processo (compartilhado entre as sessões)"""
+    return PdrReportCache(PDR_REPORT_CACHE_SIZE, PDR_REPORT_WORKERS)
+
+def get_theme_adaptive_colors():
+    """Retorna cores que funcionam bem em ambos os temas claro e escuro"""
+    # Cores que funcionam bem em ambos os temas
+    return {
+        'text_color': "#AAAAAA",
+        'grid_color': '#E0E0E0',
+        'plot_bgcolor': 'rgba(0,0,0,0)',
+        'paper_bgcolor': 'rgba(0,0,0,0)',
+        'color_scale': 'sunsetdark',
+        'qualitative_scale': 'Plotly'
+    }
+
+def load_session_dataset(registry, content):
+    """Associa a sessão ao dataset do conteúdo e retorna True se ele foi processado agora"""
+    # A carga anterior da sessão serve de base para reaproveitar as seções inalteradas
+    current = registry.get(st.session_state.dataset_handle)
+    handle, parsed_now = registry.acquire(content, current['dataset'] if current is not None else None)
+    return set_session_handle(registry, handle) or parsed_now
+
+def load_session_archive(registry, name, data):
+    """Associa a sessão ao dataset de um log compactado e retorna True se ele foi processado agora"""
+    current = registry.get(st.session_state.dataset_handle)
+    handle, parsed_now = registry.acquire_archive(name, data, current['dataset'] if current is not None else None)
+    return set_session_handle(registry, handle) or parsed_now
+
+def load_session_sources(registry, results):
+    """Associa a sessão ao dataset que junta as fontes buscadas e retorna True se ele foi processado agora"""
+    handle, parsed_now = registry.acquire_sources(results)
+    return set_session_handle(registry, handle) or parsed_now
+
+def load_session_mirror(registry, settings):
+    """Associa a sessão ao dataset lido do espelho local e retorna True se ele foi processado agora"""
+    entries = rcs_reader.list_rcs_files(settings["path"], settings["cvs_root"])
+    workers = settings.get("workers")
+    handle, parsed_now = registry.acquire_built(
+        rcs_reader.tree_digest(entries),
+        lambda: (load_rcs_mirror(entries, int(workers) if workers else None), None)
+    )
+    return set_session_handle(registry, handle) or parsed_now
+
+def set_session_handle(registry, handle):
+    """Troca o handle da sessão e retorna True se o dataset mudou"""
+    previous = st.session_state.dataset_handle
+    st.session_state.dataset_handle = handle
+    if previous is not None and previous.digest != handle.digest:
+        # Registrar as novidades em relação à carga anterior antes de liberá-la
+        previous_entry = registry.get(previous)
+        entry = registry.get(handle)
+        if previous_entry is not None and entry is not None:
+            changes = derived_value(entry, ('changes', previous.digest),
+                                    lambda: diff_snapshots(previous_entry['dataset'], entry['dataset']))
+            st.session_state.snapshot_changes = (handle.digest, changes)
+            # O rollup por autor continua o da carga anterior, somando apenas as revisões novas
+            previous_rollup = previous_entry['derived'].get('author_rollup')
+            if previous_rollup is not None:
+                derived_value(entry, 'author_rollup', lambda: previous_rollup.advance(
+                    previous_entry['dataset'], entry['dataset'], changes['revisions']))
+        registry.release(previous)
+    return previous is None or previous.digest != handle.digest
+
+@st.fragment
+def render_results(filtered_df, pdr_only, view_key):
+    """Tabela de resultados e download em Excel (reexecutados isoladamente em interações locais)
+    
+    filtered_df já chega em ordem decrescente de data e hora, sem ordenação a cada execução.
+    """
+    st.subheader(f"Resultados ({len(filtered_df)} registros)")
+
+    # Criar DataFrame para exibição com o novo formato
+    display_columns = ['centro', 'estado', 'rcs_file', 'working_file', 'revision', 'author', 'date', 'time']
+
+    # Adicionar colunas PDR se for análise PDR
+    if pdr_only:
+        display_columns.extend(['pdr_classification', 'pdr_time', 'pdr_description'])
+    else:
+        display_columns.append('message')
+
+    display_df = filtered_df[display_columns]
+
+    # Renomear colunas para exibição
+    display_df = display_df.rename(columns=DISPLAY_COLUMN_NAMES)
+
+    # Configurar a exibição do DataFrame (sem índice e ocultando Caminho da Tela)
+    column_config = {
+        "Centro": st.column_config.TextColumn(width="small"),
+        "Estado": st.column_config.TextColumn(width="small"),
+        "Caminho da Tela": st.column_config.Column(disabled=True),  # Oculta por padrão
+        "Nome da Tela": st.column_config.TextColumn(width="medium"),
+        "Revisão": st.column_config.TextColumn(width="none"),
+        "Autor": st.column_config.TextColumn(width="medium"),
+        "Data": st.column_config.TextColumn(width="none"),
+        "Hora": st.column_config.TextColumn(width="none")
+    }
+
+    # Adicionar configurações para colunas PDR se for análise PDR
+    if pdr_only:
+        column_config.update({
+            "Tipo": st.column_config.TextColumn(width="none"),
+            "Tempo (min)": st.column_config.NumberColumn(width="small"),
+            "Comentário": st.column_config.TextColumn(width="medium")
+        })
+    else:
+        column_config["Mensagem"] = st.column_config.TextColumn(width="large")
+
+    # Ordem das colunas para exibição (sem Caminho da Tela)
+    column_order = ['Centro', 'Estado', 'Nome da Tela', 'Revisão', 'Autor', 'Data', 'Hora']
+    if pdr_only:
+        column_order.extend(['Tipo', 'Tempo (min)', 'Comentário'])
+    else:
+        column_order.append('Mensagem')
+
+    st.dataframe(
+        display_df,
+        use_container_width=True,
+        height=600,
+        hide_index=True,
+        column_config=column_config,
+        column_order=column_order
+    )
+
+    # Botão de popover para Classificação de Commits
+    col_info, col_classif = st.columns([1, 5])
+    with col_info:
+        st.caption("ℹ️ O CrossVC considera o fuso horário GMT+0 (+3h em relação ao horário local).")
+    with col_classif:
+        with st.popover("📋 Classificação de Commits", use_container_width=False):
+            st.markdown("""
+            FORMATO: __**#CLASSIFICAÇÃO#TEMPO#COMENTÁRIO**__  
+            Onde a classificação é uma das listadas abaixo, o tempo (em minutos) é um número inteiro e o comentário é o campo livre para explicação do motivo da revisão.  
+
+            **1. ANOMALIA**  
+            Refere-se a erros ou incoerências identificados externamente, por exemplo, pelas Salas de Operação ou outras gerências (como RSO, PRI), que impactam o funcionamento ou a coerência da tela.  
+            • Correções internamente identificadas devem ser classificadas como MANUTENÇÃO.  
+            • O tempo de execução da anomalia deve considerar todas as etapas envolvidas, como abertura do chamado no sistema OTRS, análise de diagrama envolvido, edição da tela, entre outras.  
+            • Quando houver mais de um tipo de alteração (ex: anomalia e melhoria), devem ser realizados commits separados, salvo quando uma das ações for irrelevante frente à outra.
+
+            **2. MANUT (Manutenção)**  
+            Refere-se a ajustes de rotina, preventivos ou corretivos, realizados pela equipe da PDR sem demanda externa.  
+            **Exemplos:**  
+            • Retirada de sinalização de futuro  
+            • Ajustes de textos de revisões de IO  
+            • Troca de agente operador  
+            • Troca de posicionamento de equipamentos  
+            • Correções de erros identificados internamente, desde que não tenham sido sinalizados por outras áreas
+
+            **3. RECOMP (Recomposição)**  
+            Classificação destinada a alterações em telas relacionadas ao processo de recomposição do sistema, como os corredores de recomposição.  
+            • **Exclusão**: casos em que houver erro identificado externamente (ANOMALIA), mesmo em telas de recomposição, devem ser registrados como ANOMALIA.
+
+            **4. NOVA**  
+            Aplica-se à criação de novas telas no REGER e equipamentos novos em telas já existentes.
+
+            **5. MELHORIA**  
+            Refere-se a alterações não essenciais, que não tratam erros, mas têm o objetivo de otimizar a usabilidade, visualização ou interpretação da tela.  
+            **Exemplos:**  
+            • Mudanças de layout  
+            • Inclusão de novos filtros  
+            • Inserção de elementos visuais ou alarmes  
+            • Ajustes de lógica solicitados pela operação, sem envolvimento de falha
+            """)
+
+    # Botão de download em Excel
+    today = datetime.now().strftime("%d_%m_%Y")
+    filename = f"Check_log_telas-{today}.xlsx"
+
+    # O arquivo Excel só é recriado quando o estado dos filtros muda
+    cached_excel = st.session_state.get('excel_cache')
+    if cached_excel is None or cached_excel[0] != view_key:
+        # Criar arquivo Excel
+        excel_file = create_excel_file(display_df)
+
+        # Salvar em buffer
+        excel_buffer = io.BytesIO()
+        excel_file.save(excel_buffer)
+        cached_excel = (view_key, excel_buffer.getvalue())
+        st.session_state.excel_cache = cached_excel
+
+    st.download_button(
+        label="📥 Baixar em Excel",
+        data=cached_excel[1],
+        file_name=filename,
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+
+ACTIVITY_DIMENSIONS = ['file_id', 'centro', 'estado', 'author', 'pdr_classification',
+                       'is_pdr', 'is_ana_dig', 'is_temp', 'is_attic', 'is_dead', 'is_branch']
+ACTIVITY_FREQUENCIES = {'Dia': 'D', 'Semana': 'W-MON', 'Mês': 'MS'}
+
+def build_daily_activity(df, files_df):
+    """Pré-agrega as revisões por dia e dimensões de filtro (feito uma vez por dataset)"""
+    file_ids = df['file_id'].to_numpy()
+    daily = pd.DataFrame({
+        'day': df['timestamp'].dt.normalize(),
+        'file_id': file_ids,
+        'centro': files_df['centro'].to_numpy()[file_ids],
+        'estado': files_df['estado'].to_numpy()[file_ids],
+        'author': df['author'],
+        'pdr_classification': df['pdr_classification'],
+        'is_pdr': df['is_pdr'],
+        'is_ana_dig': file_flag_for_rows(files_df, 'is_ana_dig', df),
+        'is_temp': file_flag_for_rows(files_df, 'is_temp', df),
+        'is_attic': file_flag_for_rows(files_df, 'is_attic', df),
+        'is_dead': (df['state'] == 'dead').to_numpy(),
+        'is_branch': df['depth'].to_numpy() > 0,
+        'pdr_time': df['pdr_time']
+    })
+    dimensions = ACTIVITY_DIMENSIONS
+    if 'source' in files_df:
+        daily['source'] = files_df['source'].astype(object).to_numpy()[file_ids]
+        dimensions = dimensions + ['source']
+    daily = daily.loc[daily['day'].notna()]
+    return daily.groupby(['day'] + dimensions, dropna=False).agg(
+        revisions=('is_pdr', 'size'),
+        pdr_minutes=('pdr_time', 'sum')
+    ).reset_index()
+
+def filter_daily_activity(daily, files_df, filters):
+    """Aplica à pré-agregação diária os filtros da barra lateral (os filtros por arquivo vêm de files_df pelo file_id)"""
+    mask = pd.Series(file_filter_mask(files_df, filters)[daily['file_id'].to_numpy()], index=daily.index)
+    if filters['pdr_only']:
+        mask &= daily['is_pdr']
+    if filters['ignore_ana_dig']:
+        mask &= ~daily['is_ana_dig']
+    if filters['ignore_temp_files']:
+        mask &= ~daily['is_temp']
+    if filters['ignore_excluded']:
+        mask &= ~daily['is_attic']
+    if filters.get('ignore_dead'):
+        mask &= ~daily['is_dead']
+    if filters.get('branch_mode') == 'trunk':
+        mask &= ~daily['is_branch']
+    elif filters.get('branch_mode') == 'branch':
+        mask &= daily['is_branch']
+    if filters['authors']:
+        mask &= daily['author'].isin(filters['authors'])
+    if filters.get('sources') and 'source' in daily:
+        mask &= daily['source'].isin(filters['sources'])
+    if filters['start_date']:
+        mask &= daily['day'] >= pd.Timestamp(filters['start_date'])
+    if filters['end_date']:
+        mask &= daily['day'] <= pd.Timestamp(filters['end_date'])
+    return daily.loc[mask]
+
+def resample_activity(daily, value_column, freq, split_column=None):
+    """Reagrupa a pré-agregação diária na granularidade pedida (tabela período x série)"""
+    # Períodos fechados à esquerda e rotulados pelo início: semanas de segunda a domingo
+    keys = [pd.Grouper(key='day', freq=freq, closed='left', label='left')]
+    if split_column:
+        daily = daily.assign(**{split_column: daily[split_column].fillna('(sem valor)')})
+        keys.append(split_column)
+    series = daily.groupby(keys, dropna=False)[value_column].sum()
+    if split_column:
+        return series.unstack(split_column, fill_value=0)
+    return series.to_frame(value_column)
+
+def walk_revision_tree(file_revisions):
+    """Percorre a árvore de revisões de um arquivo em profundidade (cada branch logo após o seu ponto de ramificação)"""
+    children = {}
+    roots = []
+    present = set(file_revisions.index)
+    for row, parent in zip(file_revisions.index, file_revisions['parent']):
+        if parent in present:
+            children.setdefault(parent, []).append(row)
+        else:
+            roots.append(row)
+    
+    # Branches que saem da revisão vêm antes da continuação no mesmo ramo
+    order_key = lambda row: (-file_revisions.at[row, 'depth'], file_revisions.at[row, 'revision_order'])
+    ordered = []
+    stack = sorted(roots, key=order_key, reverse=True)
+    while stack:
+        row = stack.pop()
+        ordered.append(row)
+        stack.extend(sorted(children.get(row, []), key=order_key, reverse=True))
+    return ordered
+
+def result_file_ids(files_df, filtered_df):
+    """Arquivos (file_id) presentes nos resultados filtrados"""
+    if 'file_id' in filtered_df:
+        return pd.unique(filtered_df['file_id'].to_numpy())
+    # Resultados da base local: o arquivo é localizado pelo caminho e pela origem
+    sources = files_df['source'].astype(object) if 'source' in files_df else pd.Series('', index=files_df.index)
+    keys = pd.MultiIndex.from_arrays([files_df['path'], sources])
+    found = keys.get_indexer(pd.MultiIndex.from_arrays([filtered_df['rcs_file'], filtered_df['source']]).unique())
+    return found[found >= 0]
+
+@st.fragment
+def render_file_history(dataset, filtered_df):
+    """Histórico de um arquivo percorrendo a árvore de revisões (trunk e branches)"""
+    with st.expander("🌳 Histórico por Arquivo"):
+        files_df = dataset['files']
+        # O mesmo caminho em duas origens são arquivos distintos: a seleção é pelo file_id
+        labels = files_df['path'].to_numpy()
+        if 'source' in files_df:
+            labels = labels + ' (' + files_df['source'].astype(object).to_numpy() + ')'
+        file_ids = sorted(map(int, result_file_ids(files_df, filtered_df)), key=lambda file_id: labels[file_id])
+        if not file_ids:
+            st.info("Nenhum arquivo nos resultados filtrados.")
+            return
+        
+        selected_file = st.selectbox("Arquivo", file_ids, format_func=lambda file_id: labels[file_id], key="history_file")
+        revisions_df = dataset['revisions']
+        file_revisions = revisions_df.loc[revisions_df['file_id'].to_numpy() == selected_file]
+        ordered = walk_revision_tree(file_revisions)
+        
+        history = file_revisions.loc[ordered]
+        parents = history['parent'].map(lambda row: revisions_df.at[row, 'revision'] if row >= 0 else '')
+        history_df = pd.DataFrame({
+            'Revisão': ['    ' * depth + ('└ ' if depth else '') + revision
+                        for depth, revision in zip(history['depth'], history['revision'])],
+            'Pai': parents,
+            'Branch': history['branch'],
+            'Autor': history['author'],
+            'Data': history['date'],
+            'Hora': history['time'],
+            'Estado': history['state'],
+            'Mensagem': history['message']
+        })
+        st.dataframe(history_df, use_container_width=True, hide_index=True)
+
+def render_snapshot_changes(dataset, changes):
+    """Novidades desde a última carga: revisões novas, arquivos novos e arquivos excluídos"""
+    new_rows, new_files, deleted_files = changes['revisions'], changes['files'], changes['deleted']
+    has_changes = len(new_rows) > 0 or len(new_files) > 0 or len(deleted_files) > 0
+    
+    with st.expander("🆕 Novidades desde a última carga", expanded=has_changes):
+        if not has_changes:
+            st.info("Nenhuma novidade desde a última carga.")
+            return
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Revisões Novas", len(new_rows))
+        with col2:
+            st.metric("Arquivos Novos", len(new_files))
+        with col3:
+            st.metric("Arquivos Excluídos", len(deleted_files))
+        
+        if len(new_rows) > 0:
+            st.markdown("**Revisões novas**")
+            new_revisions = dataset_rows(dataset, new_rows)[['rcs_file', 'working_file', 'revision', 'author', 'date', 'time', 'message']]
+            st.dataframe(new_revisions.rename(columns={
+                'rcs_file': 'Caminho da Tela',
+                'working_file': 'Nome da Tela',
+                'revision': 'Revisão',
+                'author': 'Autor',
+                'date': 'Data',
+                'time': 'Hora',
+                'message': 'Mensagem'
+            }), use_container_width=True, hide_index=True)
+        
+        for title, file_ids in (("Arquivos novos", new_files), ("Arquivos excluídos", deleted_files)):
+            if len(file_ids) > 0:
+                st.markdown(f"**{title}**")
+                st.dataframe(dataset['files'].iloc[file_ids][['path', 'name']].rename(columns={
+                    'path': 'Caminho da Tela',
+                    'name': 'Nome da Tela'
+                }), use_container_width=True, hide_index=True)
+
+def render_churn(filtered_df, result):
+    """Churn (linhas adicionadas e removidas) dos arquivos filtrados"""
+    import plotly.express as px
+    
+    churn_by_file = derived_value(result, 'churn_by_file', lambda: compute_churn_by_file(filtered_df))
+    if churn_by_file.empty or churn_by_file['lines_changed'].sum() == 0:
+        return
+    
+    st.subheader("📐 Arquivos com Mais Linhas Alteradas")
+    colors = get_theme_adaptive_colors()
+    fig_churn = px.bar(
+        churn_by_file,
+        x=['lines_added', 'lines_removed'],
+        y=churn_by_file.index,
+        orientation='h',
+        title="Top 10 Arquivos por Linhas Alteradas",
+        labels={'value': 'Linhas', 'working_file': 'Arquivo', 'variable': ''},
+        color_discrete_map={'lines_added': '#2ca02c', 'lines_removed': '#d62728'}
+    )
+    fig_churn.for_each_trace(lambda trace: trace.update(name={'lines_added': 'Adicionadas', 'lines_removed': 'Removidas'}[trace.name]))
+    fig_churn.update_layout(
+        paper_bgcolor=colors['paper_bgcolor'],
+        plot_bgcolor=colors['plot_bgcolor'],
+        font=dict(color=colors['text_color']),
+        barmode='stack',
+        yaxis=dict(autorange='reversed')
+    )
+    st.plotly_chart(fig_churn, use_container_width=True)
+
+@st.fragment
+def render_activity(entry, filters, result):
+    """Atividade ao longo do tempo, calculada a partir da pré-agregação diária do dataset"""
+    import plotly.express as px
+    
+    st.subheader("📅 Atividade ao Longo do Tempo")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        granularity = st.radio("Granularidade", list(ACTIVITY_FREQUENCIES), horizontal=True, key="activity_granularity")
+    with col2:
+        split_by = st.radio("Separar por", ["Nenhum", "Centro", "Autor"], horizontal=True, key="activity_split")
+    
+    # Pré-agregação por dia, construída uma única vez por dataset
+    revisions_df, files_df = entry['dataset']['revisions'], entry['dataset']['files']
+    if filters.get('search'):
+        # A busca na mensagem não é uma dimensão da pré-agregação: as revisões encontradas são agregadas
+        # à parte, uma vez por estado de filtros
+        message_index = derived_value(entry, 'message_index', lambda: MessageIndex(revisions_df['message']))
+        daily = derived_value(result, 'daily_activity', lambda: build_daily_activity(
+            revisions_df.loc[message_index.search_mask(filters['search'])], files_df))
+    else:
+        daily = derived_value(entry, 'daily_activity', lambda: build_daily_activity(revisions_df, files_df))
+    daily = filter_daily_activity(daily, files_df, filters)
+    
+    if daily.empty:
+        st.info("Nenhuma revisão no período selecionado.")
+        return
+    
+    freq = ACTIVITY_FREQUENCIES[granularity]
+    split_column = {'Nenhum': None, 'Centro': 'centro', 'Autor': 'author'}[split_by]
+    colors = get_theme_adaptive_colors()
+    
+    # Revisões por período
+    revisions = resample_activity(daily, 'revisions', freq, split_column)
+    fig_revisions = px.line(
+        revisions,
+        x=revisions.index,
+        y=list(revisions.columns),
+        title=f"Revisões por {granularity.lower()}",
+        labels={'x': 'Período', 'value': 'Revisões', 'variable': split_by if split_column else ''},
+        markers=True
+    )
+    fig_revisions.update_layout(
+        paper_bgcolor=colors['paper_bgcolor'],
+        plot_bgcolor=colors['plot_bgcolor'],
+        font=dict(color=colors['text_color']),
+        showlegend=split_column is not None
+    )
+    st.plotly_chart(fig_revisions, use_container_width=True)
+    
+    # Tempo PDR por classificação (com os agrupamentos de classificação aplicados)
+    pdr_daily = daily.loc[daily['pdr_classification'].notna() & daily['is_pdr']]
+    if st.session_state.classification_mapping:
+        pdr_daily = pdr_daily.assign(pdr_classification=pdr_daily['pdr_classification'].replace(st.session_state.classification_mapping))
+    
+    if not pdr_daily.empty:
+        minutes = resample_activity(pdr_daily, 'pdr_minutes', freq, 'pdr_classification')
+        fig_minutes = px.bar(
+            minutes,
+            x=minutes.index,
+            y=list(minutes.columns),
+            title=f"Tempo PDR por classificação e {granularity.lower()} (minutos)",
+            labels={'x': 'Período', 'value': 'Tempo (min)', 'variable': 'Classificação'},
+            color_discrete_sequence=px.colors.qualitative.Set3
+        )
+        fig_minutes.update_layout(
+            paper_bgcolor=colors['paper_bgcolor'],
+            plot_bgcolor=colors['plot_bgcolor'],
+            font=dict(color=colors['text_color']),
+            barmode='stack'
+        )
+        st.plotly_chart(fig_minutes, use_container_width=True)
+
+# Dimensões das células do rollup por autor (o arquivo é guardado pelo file_id do dataset atual)
+AUTHOR_ROLLUP_DIMENSIONS = ['file_id', 'author', 'day', 'pdr_classification', 'is_pdr', 'is_dead', 'is_branch']
+
+class AuthorRollup:
+    """Totais por autor ligados à linhagem do dataset: cada nova carga soma apenas as revisões inéditas
+    
+    As células (arquivo, autor, dia, classificação...) são imutáveis e compartilhadas entre as cargas; os campos
+    do arquivo (centro, estado, Attic, origem) vêm sempre do dataset atual, então os filtros refletem a carga aberta.
+    """
+    def __init__(self, cells):
+        self.cells = cells
+    
+    @staticmethod
+    def _aggregate(df):
+        cells = pd.DataFrame({
+            'file_id': df['file_id'].to_numpy(),
+            'author': df['author'].to_numpy(),
+            'day': df['timestamp'].dt.normalize().to_numpy(),
+            'pdr_classification': df['pdr_classification'].to_numpy(),
+            'is_pdr': df['is_pdr'].to_numpy(),
+            'is_dead': (df['state'] == 'dead').to_numpy(),
+            'is_branch': df['depth'].to_numpy() > 0,
+            'pdr_time': df['pdr_time'].to_numpy()
+        })
+        cells = cells.loc[cells['author'].notna().to_numpy()]
+        return cells.groupby(AUTHOR_ROLLUP_DIMENSIONS, dropna=False).agg(
+            revisions=('is_pdr', 'size'),
+            pdr_minutes=('pdr_time', 'sum')
+        ).reset_index()
+    
+    @classmethod
+    def build(cls, df):
+        """Rollup completo de um dataset sem carga anterior conhecida"""
+        return cls(cls._aggregate(df))
+    
+    def advance(self, previous_dataset, dataset, new_rows):
+        """Novo rollup para o dataset seguinte da linhagem: células anteriores mais as revisões novas (diff_snapshots)"""
+        # As células anteriores passam a apontar para o arquivo equivalente no dataset novo (mesma identidade,
+        # inclusive após a mudança para o Attic); arquivos que saíram do log são descartados
+        previous_keys = file_identity_keys(previous_dataset['files']).to_numpy()
+        current_keys = file_identity_keys(dataset['files'])
+        current_ids = pd.Series(np.arange(len(current_keys)), index=current_keys.to_numpy())
+        current_ids = current_ids[~current_ids.index.duplicated()]
+        file_ids = current_ids.reindex(previous_keys[self.cells['file_id'].to_numpy()]).to_numpy()
+        kept = ~np.isnan(file_ids)
         
-        if log_content is None:
-            # Última tentativa com errors='ignore'
-            stdin, stdout, stderr = client.exec_command(command_cat)
-            log_content = stdout.read().decode('latin-1', errors='ignore')
+        previous_cells = self.cells.loc[kept].assign(file_id=file_ids[kept].astype('int64'))
+        new_cells = self._aggregate(dataset['revisions'].take(new_rows))
+        return AuthorRollup(pd.concat([previous_cells, new_cells], ignore_index=True))
+    
+    def summary(self, files_df, filters, mapping=None):
+        """Tabela por autor com revisões, arquivos, dias ativos e minutos PDR por classificação, com os filtros"""
+        file_ids = self.cells['file_id'].to_numpy()
+        cells = self.cells.assign(**{
+            column: files_df[column].to_numpy()[file_ids]
+            for column in ['is_attic', 'is_temp', 'is_ana_dig']
+        })
+        if 'source' in files_df:
+            cells['source'] = files_df['source'].astype(object).to_numpy()[file_ids]
+        cells = filter_daily_activity(cells, files_df, filters)
         
-        # Fechar conexão
-        client.close()
+        # Arquivos distintos pela identidade, para que o mesmo arquivo no Attic não conte duas vezes
+        identity = pd.factorize(file_identity_keys(files_df))[0]
+        authors = cells['author']
+        table = pd.DataFrame({
+            'Revisões': cells.groupby('author')['revisions'].sum(),
+            'Arquivos Tocados': pd.Series(identity[cells['file_id'].to_numpy()], index=cells.index).groupby(authors).nunique(),
+            'Dias Ativos': cells.groupby('author')['day'].nunique()
+        })
         
-        return log_content
+        pdr_cells = cells.loc[cells['pdr_classification'].notna().to_numpy()]
+        classification = pdr_cells['pdr_classification']
+        if mapping:
+            classification = classification.map(lambda value: mapping.get(value, value))
+        minutes = pdr_cells['pdr_minutes'].groupby([pdr_cells['author'], classification]).sum().unstack(fill_value=0)
         
-    except Exception as e:
-        st.error(f"Erro na conexão SSH: {str(e)}")
-        return None
+        table = table.join(minutes, how='left').fillna(0)
+        table.insert(3, 'Tempo PDR (min)', minutes.sum(axis=1).reindex(table.index).fillna(0))
+        table.index.name = 'Autor'
+        return table.sort_values('Revisões', ascending=False)
 
-def get_filtered_options(df, ignore_ana_dig=True, ignore_temp_files=True):
-    """Retorna opções filtradas para os selectboxes baseado nos filtros aplicados"""
-    filtered_df = df.copy()
+@st.fragment
+def render_author_analysis(rollup, files_df, filters, result):
+    """Análise por autor a partir do rollup incremental do dataset"""
+    import plotly.express as px
     
-    # Aplicar filtros básicos que afetam as opções
-    if ignore_ana_dig:
-        filtered_df = filtered_df.loc[~filtered_df['working_file'].str.startswith('Ana', na=False)]
-        filtered_df = filtered_df.loc[~filtered_df['working_file'].str.startswith('Dig', na=False)]
+    st.subheader("👤 Análise por Autor")
+    st.caption("Revisões do log carregado com os filtros da barra lateral (exceto a busca na mensagem).")
     
-    # Filtrar arquivos temporários (sempre True)
-    if ignore_temp_files:
-        filtered_df = filtered_df.loc[~filtered_df['working_file'].str.startswith('.#', na=False)]
-        filtered_df = filtered_df.loc[~filtered_df['working_file'].str.startswith('.nfs', na=False)]
+    summary = derived_value(result, 'author_summary',
+                            lambda: rollup.summary(files_df, filters, st.session_state.classification_mapping))
     
-    # Extrair opções filtradas
-    options = {
-        'filenames': sorted(filtered_df['working_file'].unique()),
-        'authors': sorted(filtered_df['author'].dropna().unique()),
-        'centros': sorted(filtered_df['centro'].dropna().unique()) if 'centro' in filtered_df.columns else [],
-        'estados': sorted(filtered_df['estado'].dropna().unique()) if 'estado' in filtered_df.columns else []
-    }
+    if summary.empty:
+        st.info("Nenhuma revisão com autor encontrada.")
+        return
     
-    return options
+    st.dataframe(summary.round(1), use_container_width=True)
+    
+    classification_columns = list(summary.columns[4:])
+    top_authors = summary.sort_values('Tempo PDR (min)', ascending=False).head(15)
+    if classification_columns and top_authors['Tempo PDR (min)'].sum() > 0:
+        colors = get_theme_adaptive_colors()
+        fig_authors = px.bar(
+            top_authors,
+            x=top_authors.index,
+            y=classification_columns,
+            title="Tempo PDR por Autor e Classificação (minutos)",
+            labels={'x': 'Autor', 'value': 'Tempo (min)', 'variable': 'Classificação'},
+            color_discrete_sequence=px.colors.qualitative.Set3
+        )
+        fig_authors.update_layout(
+            paper_bgcolor=colors['paper_bgcolor'],
+            plot_bgcolor=colors['plot_bgcolor'],
+            font=dict(color=colors['text_color']),
+            barmode='stack'
+        )
+        st.plotly_chart(fig_authors, use_container_width=True)
 
-def get_theme_adaptive_colors():
-    """Retorna cores que funcionam bem em ambos os temas claro e escuro"""
-    # Cores que funcionam bem em ambos os temas
-    return {
-        'text_color': "#AAAAAA",
-        'grid_color': '#E0E0E0',
-        'plot_bgcolor': 'rgba(0,0,0,0)',
-        'paper_bgcolor': 'rgba(0,0,0,0)',
-        'color_scale': 'sunsetdark',
-        'qualitative_scale': 'Plotly'
-    }
+@st.fragment
+def render_pdr_report(filtered_df, view_key):
+    """Relatório PDR em xlsx, gerado em segundo plano sem bloquear a página"""
+    st.subheader("📑 Relatório PDR")
+    reports = get_pdr_reports()
+    report = reports.get(view_key)
+    
+    if report is None:
+        st.caption("Planilha com uma aba por agregado da análise PDR e os dados brutos dos filtros atuais.")
+        if st.button("Gerar Relatório PDR"):
+            report = reports.submit(view_key, filtered_df)
+    
+    if report is not None:
+        path, future = report
+        if not future.done():
+            col_status, col_check = st.columns([3, 1])
+            with col_status:
+                st.info("⏳ Gerando o relatório em segundo plano. A página pode ser usada normalmente.")
+            with col_check:
+                st.button("🔄 Verificar", key="check_pdr_report")
+        elif future.exception() is not None:
+            st.error(f"Erro ao gerar o relatório: {future.exception()}")
+            if st.button("Tentar Novamente", key="retry_pdr_report"):
+                reports.discard(view_key)
+                st.rerun(scope="fragment")
+        else:
+            today = datetime.now().strftime("%d_%m_%Y")
+            with open(path, 'rb') as report_file:
+                st.download_button(
+                    label="📥 Baixar Relatório PDR",
+                    data=report_file,
+                    file_name=f"Relatorio_PDR-{today}.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                )
+
+@st.fragment
+def render_pdr_audit(filtered_df, rules, result, view_key):
+    """Auditoria do formato das mensagens PDR dos filtros atuais, com exportação dos commits fora do formato"""
+    audit = derived_value(result, 'pdr_audit', lambda: compute_pdr_audit(filtered_df, rules))
+    
+    st.subheader("🧾 Conformidade do Formato PDR")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Revisões Verificadas", audit['total'])
+    with col2:
+        st.metric("Fora do Formato", audit['violations'])
+    with col3:
+        share = audit['violations'] / audit['total'] * 100 if audit['total'] else 0
+        st.metric("Percentual Fora do Formato", f"{share:.1f}%")
+    
+    if audit['violations'] == 0:
+        st.success("Todas as mensagens seguem o formato #CLASSIFICAÇÃO#TEMPO#COMENTÁRIO.")
+        return
+    
+    col_rule, col_author, col_centro = st.columns([2, 3, 3])
+    with col_rule:
+        st.write("**Por regra:**")
+        st.dataframe(audit['by_rule'], use_container_width=True)
+    with col_author:
+        st.write("**Por autor:**")
+        st.dataframe(audit['by_author'], use_container_width=True, height=250)
+    with col_centro:
+        st.write("**Por centro:**")
+        st.dataframe(audit['by_centro'], use_container_width=True, height=250)
+    
+    # Tabela dos commits fora do formato, opcionalmente restrita a uma regra
+    rule = st.selectbox("Commits fora do formato", ["Todas as regras"] + list(PDR_AUDIT_RULES.values()),
+                        key="pdr_audit_rule")
+    commits = audit['commits']
+    if rule != "Todas as regras":
+        commits = commits.loc[commits['Regras'].str.contains(rule, regex=False).to_numpy()]
+    st.dataframe(commits, use_container_width=True, hide_index=True)
+    
+    # A planilha só é montada quando pedida, e uma única vez por estado dos filtros
+    cached_audit = st.session_state.get('pdr_audit_excel_cache')
+    if cached_audit is None or cached_audit[0] != view_key:
+        if not st.button("Preparar Planilha da Auditoria"):
+            return
+        with st.spinner("Montando a planilha..."):
+            audit_buffer = io.BytesIO()
+            write_pdr_audit(audit_buffer, audit)
+        cached_audit = (view_key, audit_buffer.getvalue())
+        st.session_state.pdr_audit_excel_cache = cached_audit
+    
+    today = datetime.now().strftime("%d_%m_%Y")
+    st.download_button(
+        label="📥 Baixar Auditoria PDR",
+        data=cached_audit[1],
+        file_name=f"Auditoria_PDR-{today}.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+
+@st.fragment
+def render_pdr_analysis(filtered_df, filters, store, result):
+    """Análise PDR detalhada (reexecutada isoladamente ao interagir com seus próprios widgets)"""
+    import plotly.express as px
+    
+    if filters['pdr_only'] and len(filtered_df) > 0:
+        st.subheader("📈 Análise PDR Detalhada")
+
+        # Agregados calculados apenas com registros PDR válidos (com classificação e tempo)
+        if store is not None and not filters['search']:
+            pdr_stats = store.pdr_aggregates(st.session_state.dataset_handle.digest, filters,
+                                             st.session_state.classification_mapping)
+        else:
+            pdr_stats = derived_value(result, 'pdr_aggregates', lambda: compute_pdr_aggregates(filtered_df))
+
+        if pdr_stats['total_revisions'] > 0:
+            # Obter classificações únicas
+            classification_counts = pdr_stats['classification_counts']
+
+            col1, col2 = st.columns(2)
+
+            with col1:
+                st.write("**Classificações quantificadas:**")
+                # Formatar: MANUT: 10 | NOVA: 71 | MELHORIA: 25
+                classifications_text = " | ".join([f"{cls}: {count}" for cls, count in classification_counts.items()])
+                st.write(classifications_text)
+
+                # Botão para agrupar classificações
+                if st.button("Agrupar Classificações"):
+                    st.session_state.show_classification_grouping = not st.session_state.show_classification_grouping
+
+            with col2:
+                # Arquivos mais modificados
+                file_counts = pdr_stats['file_counts']
+                st.write("**Arquivos Mais Modificados:**")
+                # Formatar: arquivo1: 19 | arquivo2: 20 | arquivo3: 8
+                files_text = " | ".join([f"{file}: {count}" for file, count in file_counts.items()])
+                st.write(files_text)
+
+            # Seção de agrupamento de classificações (apenas se o botão foi clicado)
+            if st.session_state.show_classification_grouping:
+                st.subheader("🔄 Agrupamento de Classificações")
+
+                # Obter classificações únicas atualizadas
+                current_unique = sorted(classification_counts.index)
+
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    # Lista de seleção única para classificação original (destino)
+                    target_classification = st.selectbox(
+                        "Classificação original:",
+                        options=current_unique,
+                        key="target_classification"
+                    )
+
+                with col2:
+                    # Lista de seleção múltipla para classificações a agrupar
+                    # Remover a classificação destino das opções
+                    source_options = [cls for cls in current_unique if cls != target_classification]
+                    source_classifications = st.multiselect(
+                        "Agrupar com:",
+                        options=source_options,
+                        key="source_classifications"
+                    )
+
+                # Botões lado a lado
+                col_btn1, col_btn2 = st.columns(2)
+
+                with col_btn1:
+                    # Botão para confirmar agrupamento
+                    if st.button("Confirmar Agrupamento"):
+                        if target_classification and source_classifications:
+                            # Adicionar mapeamento ao session state
+                            for source in source_classifications:
+                                st.session_state.classification_mapping[source] = target_classification
+
+                            st.success(f"Classificações {source_classifications} agrupadas em {target_classification}")
+
+                            # Forçar rerun para atualizar as listas
+                            st.rerun()
+
+                with col_btn2:
+                    # Botão para limpar agrupamentos (ao lado do confirmar)
+                    if st.session_state.classification_mapping:
+                        if st.button("🗑️ Limpar Agrupamentos"):
+                            st.session_state.classification_mapping = {}
+                            st.success("Agrupamentos limpos!")
+                            st.rerun()
+
+            # Análise de tempo por classificação
+            st.subheader("⏱️ Análise de Tempo")
+
+            # Tempo total por classificação
+            time_by_classification = pdr_stats['time_by_classification']
+
+            col1, col2 = st.columns(2)
+
+            with col1:
+                # Gráfico de pizza - Tempo por classificação
+                if len(time_by_classification) > 0:
+                    colors = get_theme_adaptive_colors()
+                    fig_pie = px.pie(
+                        values=time_by_classification.values,
+                        names=time_by_classification.index,
+                        title="Distribuição de Tempo por Classificação",
+                        color_discrete_sequence=px.colors.qualitative.Set3
+                    )
+                    fig_pie.update_layout(
+                        paper_bgcolor=colors['paper_bgcolor'],
+                        plot_bgcolor=colors['plot_bgcolor'],
+                        font=dict(color=colors['text_color'])
+                    )
+                    fig_pie.update_traces(textposition='inside', textinfo='percent+label')
+                    st.plotly_chart(fig_pie, use_container_width=True)
+
+            with col2:
+                # Gráfico de barras - Tempo por classificação com tempo nas anotações
+                if len(time_by_classification) > 0:
+                    colors = get_theme_adaptive_colors()
+                    fig_bar = px.bar(
+                        x=time_by_classification.index,
+                        y=time_by_classification.values,
+                        title="Tempo Total por Classificação (minutos)",
+                        labels={'x': 'Classificação', 'y': 'Tempo Total (min)'},
+                        color=time_by_classification.values,
+                        color_continuous_scale=colors['color_scale']
+                    )
+
+                    fig_bar.update_layout(
+                        paper_bgcolor=colors['paper_bgcolor'],
+                        plot_bgcolor=colors['plot_bgcolor'],
+                        font=dict(color=colors['text_color']),
+                        xaxis=dict(gridcolor=colors['grid_color']),
+                        yaxis=dict(gridcolor=colors['grid_color'])
+                    )
+
+                    # Adicionar anotações com o tempo
+                    for i, (classification, time_val) in enumerate(zip(time_by_classification.index, time_by_classification.values)):
+                        fig_bar.add_annotation(
+                            x=classification,
+                            y=time_val,
+                            text=f"{time_val:.0f} min",
+                            showarrow=False,
+                            yshift=10,
+                            font=dict(color=colors['text_color'], size=12)
+                        )
+
+                    st.plotly_chart(fig_bar, use_container_width=True)
+
+            # Top arquivos por tempo gasto
+            st.subheader("📋 Arquivos que Demandaram Mais Tempo")
+
+            time_by_file = pdr_stats['time_by_file']
+
+            if len(time_by_file) > 0:
+                colors = get_theme_adaptive_colors()
+                fig_files = px.bar(
+                    x=time_by_file.values,
+                    y=time_by_file.index,
+                    orientation='h',
+                    title="Top 10 Arquivos por Tempo Gasto (minutos)",
+                    labels={'x': 'Tempo Total (min)', 'y': 'Arquivo'},
+                    color=time_by_file.values,
+                    color_continuous_scale=colors['color_scale']
+                )
+                fig_files.update_layout(
+                    paper_bgcolor=colors['paper_bgcolor'],
+                    plot_bgcolor=colors['plot_bgcolor'],
+                    font=dict(color=colors['text_color'])
+                )
+                st.plotly_chart(fig_files, use_container_width=True)
+
+            # Análise por centro
+            st.subheader("🏢 Análise por Centro")
+
+            # Análise por centro (já extraído)
+            if len(pdr_stats['count_by_centro']) > 0:
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    # Quantidade por centro - ordenar decrescente
+                    count_by_centro = pdr_stats['count_by_centro']
+                    colors = get_theme_adaptive_colors()
+                    fig_count = px.bar(
+                        x=count_by_centro.index,
+                        y=count_by_centro.values,
+                        title="Quantidade de Arquivos por Centro",
+                        labels={'x': 'Centro', 'y': 'Quantidade de Arquivos'},
+                        color=count_by_centro.values,
+                        color_continuous_scale='teal'
+                    )
+                    fig_count.update_layout(
+                        paper_bgcolor=colors['paper_bgcolor'],
+                        plot_bgcolor=colors['plot_bgcolor'],
+                        font=dict(color=colors['text_color'])
+                    )
+                    st.plotly_chart(fig_count, use_container_width=True)
+
+                with col2:
+                    # Tempo por centro - ordenar decrescente
+                    time_by_centro = pdr_stats['time_by_centro']
+                    colors = get_theme_adaptive_colors()
+                    fig_time = px.bar(
+                        x=time_by_centro.index,
+                        y=time_by_centro.values,
+                        title="Tempo Total por Centro (minutos)",
+                        labels={'x': 'Centro', 'y': 'Tempo Total (min)'},
+                        color=time_by_centro.values,
+                        color_continuous_scale='algae'
+                    )
+
+                    fig_time.update_layout(
+                        paper_bgcolor=colors['paper_bgcolor'],
+                        plot_bgcolor=colors['plot_bgcolor'],
+                        font=dict(color=colors['text_color'])
+                    )
+
+                    # Adicionar anotações com o tempo
+                    for i, (centro, time_val) in enumerate(zip(time_by_centro.index, time_by_centro.values)):
+                        fig_time.add_annotation(
+                            x=centro,
+                            y=time_val,
+                            text=f"{time_val:.0f} min",
+                            showarrow=False,
+                            yshift=10,
+                            font=dict(color=colors['text_color'], size=12)
+                        )
+
+                    st.plotly_chart(fig_time, use_container_width=True)
+
+                # Métricas por centro
+                st.write("**Métricas Detalhadas por Centro:**")
+
+                st.dataframe(pdr_stats['centro_stats'], use_container_width=True)
+
+            # Análise por estado
+            st.subheader("🗺️ Análise por Estado")
+
+            if len(pdr_stats['count_by_estado']) > 0:
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    # Quantidade por estado - ordenar decrescente
+                    count_by_estado = pdr_stats['count_by_estado']
+                    colors = get_theme_adaptive_colors()
+                    fig_count_estado = px.bar(
+                        x=count_by_estado.index,
+                        y=count_by_estado.values,
+                        title="Top 10 Estados por Quantidade de Arquivos",
+                        labels={'x': 'Estado', 'y': 'Quantidade de Arquivos'},
+                        color=count_by_estado.values,
+                        color_continuous_scale='purp'
+                    )
+                    fig_count_estado.update_layout(
+                        paper_bgcolor=colors['paper_bgcolor'],
+                        plot_bgcolor=colors['plot_bgcolor'],
+                        font=dict(color=colors['text_color'])
+                    )
+                    st.plotly_chart(fig_count_estado, use_container_width=True)
+
+                with col2:
+                    # Tempo por estado - ordenar decrescente
+                    time_by_estado = pdr_stats['time_by_estado']
+                    colors = get_theme_adaptive_colors()
+                    fig_time_estado = px.bar(
+                        x=time_by_estado.index,
+                        y=time_by_estado.values,
+                        title="Top 10 Estados por Tempo Total (minutos)",
+                        labels={'x': 'Estado', 'y': 'Tempo Total (min)'},
+                        color=time_by_estado.values,
+                        color_continuous_scale='sunsetdark'
+                    )
+
+                    fig_time_estado.update_layout(
+                        paper_bgcolor=colors['paper_bgcolor'],
+                        plot_bgcolor=colors['plot_bgcolor'],
+                        font=dict(color=colors['text_color'])
+                    )
+
+                    # Adicionar anotações com o tempo
+                    for i, (estado, time_val) in enumerate(zip(time_by_estado.index, time_by_estado.values)):
+                        fig_time_estado.add_annotation(
+                            x=estado,
+                            y=time_val,
+                            text=f"{time_val:.0f} min",
+                            showarrow=False,
+                            yshift=10,
+                            font=dict(color=colors['text_color'], size=12)
+                        )
+
+                    st.plotly_chart(fig_time_estado, use_container_width=True)
+
+            # Linhas alteradas por minuto PDR
+            st.subheader("📐 Linhas Alteradas por Minuto PDR")
+            st.dataframe(pdr_stats['churn_by_classification'], use_container_width=True)
+
+            # Estatísticas gerais
+            st.subheader("📊 Estatísticas Gerais PDR")
+
+            total_time = pdr_stats['total_time']
+            total_time_hours = total_time / 60
+            avg_time = pdr_stats['avg_time']
+            max_time = pdr_stats['max_time']
+            total_files = pdr_stats['total_files']
+            total_revisions = pdr_stats['total_revisions']
+
+            col1, col2, col3, col4, col5 = st.columns(5)
+
+            with col1:
+                st.metric("Tempo Total", f"{total_time:.0f} min ({total_time_hours:.1f} h)")
+            with col2:
+                st.metric("Tempo Médio por Revisão", f"{avg_time:.1f} min")
+            with col3:
+                st.metric("Tempo Máximo por Revisão", f"{max_time:.1f} min")
+            with col4:
+                st.metric("Arquivos Únicos", total_files)
+            with col5:
+                st.metric("Total de Revisões", total_revisions)
+
+        else:
+            st.info("Nenhum registro PDR com informações de classificação e tempo encontrado.")
 
 def main():
     st.set_page_config(page_title="Check Log de Telas", page_icon="📊", layout="wide")
@@ -414,25 +2399,31 @@ def main():
     st.markdown("---")
     
     # Inicializar session state para armazenar dados
-    if 'processed_data' not in st.session_state:
-        st.session_state.processed_data = None
-    if 'log_content' not in st.session_state:
-        st.session_state.log_content = None
-    if 'df' not in st.session_state:
-        st.session_state.df = None
-    if 'current_file_hash' not in st.session_state:
-        st.session_state.current_file_hash = None
+    # Os dados ficam no registro compartilhado; a sessão guarda apenas o handle
+    if 'dataset_handle' not in st.session_state:
+        st.session_state.dataset_handle = None
+    if 'uploaded_file_id' not in st.session_state:
+        st.session_state.uploaded_file_id = None
     if 'classification_mapping' not in st.session_state:
         st.session_state.classification_mapping = {}
     if 'show_classification_grouping' not in st.session_state:
         st.session_state.show_classification_grouping = False
+    if 'snapshot_changes' not in st.session_state:
+        st.session_state.snapshot_changes = None
+    
+    registry = get_dataset_registry()
     
     # Opção de carregamento do arquivo
     st.subheader("Carregamento do Arquivo de Log")
     
+    load_options = ["Gerar e carregar arquivo de log automaticamente", "Carregar arquivo de log manualmente"]
+    mirror_settings = get_rcs_mirror_settings()
+    if mirror_settings:
+        load_options.append("Ler espelho local do repositório")
+    
     option = st.radio(
         "Selecione o método de carregamento:",
-        ["Gerar e carregar arquivo de log automaticamente", "Carregar arquivo de log manualmente"],
+        load_options,
         horizontal=True
     )
     
@@ -441,10 +2432,16 @@ def main():
     new_file_detected = False
     
     if option == "Gerar e carregar arquivo de log automaticamente":
+        log_sources = get_log_sources()
+        if len(log_sources) > 1:
+            st.caption("Fontes configuradas (buscadas em paralelo): " + ", ".join(
+                f"**{source['name']}** ({source['host']}:{source['repository']})" for source in log_sources))
+        
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            host = st.text_input("Host", value="rbsp01.reger.ons", disabled=True)
+            host = st.text_input("Host", value=", ".join(dict.fromkeys(source['host'] for source in log_sources)) or DEFAULT_HOST,
+                                 disabled=True)
         with col2:
             user_id = st.text_input("User ID", placeholder="ex: REGER+ives.magalhaes")
         with col3:
@@ -453,20 +2450,65 @@ def main():
         if st.button("Gerar e Carregar Log", help="O arquivo é gerado utilizando o comando _**cvs log**_ via CEUS e processado automaticamente"):
             if not user_id or not password:
                 st.warning("Por favor, preencha User ID e Senha")
+            elif log_sources:
+                status_placeholder = st.empty()
+                current = registry.get(st.session_state.dataset_handle)
+                try:
+                    with st.spinner(f"Conectando via SSH e gerando o log de {len(log_sources)} fontes..."):
+                        results = fetch_sources(
+                            log_sources, user_id, password, current['dataset'] if current is not None else None,
+                            on_done=lambda name, done, total: status_placeholder.progress(
+                                done / total, text=f"Fonte {name} concluída ({done} de {total})"
+                            )
+                        )
+                        new_file_detected = load_session_sources(registry, results)
+                    st.success("Logs gerados e carregados com sucesso!")
+                except Exception as e:
+                    st.error(f"Erro na conexão SSH: {str(e)}")
+                finally:
+                    status_placeholder.empty()
             else:
                 status_placeholder = st.empty()
                 with st.spinner("Conectando via SSH e gerando arquivo de log..."):
                     content = connect_ssh_and_get_log(host, user_id, password, status_placeholder)
                     status_placeholder.empty()  # Limpa o placeholder após conclusão
                     if content:
-                        # Verificar se é um novo arquivo
-                        content_hash = hash(content)
-                        if st.session_state.current_file_hash != content_hash:
-                            st.session_state.current_file_hash = content_hash
-                            new_file_detected = True
-                            
-                        st.session_state.log_content = content
+                        new_file_detected = load_session_dataset(registry, content)
                         st.success("Log gerado e carregado com sucesso!")
+        
+        # Snapshot mantido pelo atualizador em segundo plano (se configurado)
+        refresher = get_log_refresher()
+        snapshot = refresher.snapshot() if refresher else None
+        if refresher and refresher.last_error:
+            st.warning(f"Falha na última atualização automática: {refresher.last_error}")
+        if snapshot:
+            snapshot_handle, loaded_at = snapshot
+            age_minutes = int((datetime.now() - loaded_at).total_seconds() // 60)
+            current = st.session_state.dataset_handle
+            is_current = current is not None and current.digest == snapshot_handle.digest
+            
+            col_age, col_open = st.columns([3, 1])
+            with col_age:
+                st.caption(f"🕒 Snapshot automático de {loaded_at.strftime('%d/%m/%Y %H:%M')} (há {age_minutes} min)")
+            with col_open:
+                open_snapshot = st.button("Abrir snapshot mais recente", disabled=is_current)
+            
+            # Sessões sem dados abrem o snapshot mais recente imediatamente
+            if open_snapshot or current is None:
+                handle = registry.attach(snapshot_handle.digest)
+                if handle is not None:
+                    new_file_detected = set_session_handle(registry, handle)
+    
+    elif option == "Ler espelho local do repositório":
+        st.write(f"Os arquivos ,v são lidos diretamente de `{mirror_settings['path']}`, sem executar o cvs log no CEUS.")
+        
+        if st.button("Ler Espelho Local", help="Lê apenas os metadados das revisões (data, autor, estado e mensagem)"):
+            try:
+                with st.spinner('Lendo arquivos ,v do espelho local...'):
+                    new_file_detected = load_session_mirror(registry, mirror_settings)
+                st.success("Espelho local carregado com sucesso!")
+            except (OSError, rcs_reader.RcsFormatError) as e:
+                st.error(f"Erro ao ler o espelho local: {str(e)}")
     
     else:  # Carregar arquivo de log manualmente
         # Comando para o usuário copiar
@@ -475,20 +2517,32 @@ def main():
         st.write("Copie o código abaixo e cole (Shift+Insert) no terminal do CEUS rbsp01.reger.ons")
         st.code(command, language="bash")
         
-        uploaded_file = st.file_uploader("Carregar arquivo de log", type=['csv', 'txt'], key="file_uploader")
+        compressed = [extension.lstrip('.') for extension in COMPRESSED_EXTENSIONS]
+        uploaded_file = st.file_uploader("Carregar arquivo de log", type=['csv', 'txt'] + compressed, key="file_uploader",
+                                         help=f"O log pode ser enviado compactado (.{', .'.join(compressed[:-1])} ou .{compressed[-1]})")
         
         # Botão para carregar novo arquivo (apenas no modo manual)
-        if st.session_state.df is not None:
+        if st.session_state.dataset_handle is not None:
             if st.button("🔄 Carregar Novo Arquivo"):
-                st.session_state.df = None
-                st.session_state.log_content = None
-                st.session_state.current_file_hash = None
-                st.session_state.processed_data = None
+                registry.release(st.session_state.dataset_handle)
+                st.session_state.dataset_handle = None
+                st.session_state.uploaded_file_id = None
                 st.session_state.classification_mapping = {}
                 st.session_state.show_classification_grouping = False
+                st.session_state.snapshot_changes = None
                 st.rerun()
         
-        if uploaded_file is not None:
+        # O arquivo enviado só é lido novamente quando muda
+        if (uploaded_file is not None and uploaded_file.file_id != st.session_state.uploaded_file_id
+                and uploaded_file.name.lower().endswith(COMPRESSED_EXTENSIONS)):
+            # Log compactado: descompactado em fluxo durante o processamento
+            try:
+                with st.spinner('Descompactando e processando arquivo...'):
+                    new_file_detected = load_session_archive(registry, uploaded_file.name, uploaded_file.getvalue())
+                st.session_state.uploaded_file_id = uploaded_file.file_id
+            except Exception as e:
+                st.error(f"Erro ao descompactar o arquivo: {str(e)}")
+        elif uploaded_file is not None and uploaded_file.file_id != st.session_state.uploaded_file_id:
             # Tentar diferentes codificações
             encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
             
@@ -497,74 +2551,127 @@ def main():
                     content = uploaded_file.read().decode(encoding)
                     uploaded_file.seek(0)  # Reset file pointer
                     
-                    # Verificar se é um novo arquivo
-                    content_hash = hash(content)
-                    if st.session_state.current_file_hash != content_hash:
-                        st.session_state.current_file_hash = content_hash
-                        new_file_detected = True
-                        
-                    st.session_state.log_content = content
+                    with st.spinner('Processando arquivo...'):
+                        new_file_detected = load_session_dataset(registry, content)
+                    st.session_state.uploaded_file_id = uploaded_file.file_id
                     break
                 except UnicodeDecodeError:
                     uploaded_file.seek(0)
                     continue
     
-    # Usar dados da session state se disponíveis
-    if st.session_state.log_content is not None:
-        content = st.session_state.log_content
+    # Usar o dataset referenciado pela sessão se disponível
+    entry = registry.get(st.session_state.dataset_handle)
     
     # Processar conteúdo se disponível
-    if content is not None:
-        # Verificar se precisa reprocessar (novo arquivo ou dados não processados)
-        if st.session_state.df is None or new_file_detected:
-            with st.spinner('Processando arquivo...'):
-                data = parse_log_content(content)
-                df = pd.DataFrame(data)
-                
-                st.session_state.df = df
-                st.session_state.processed_data = {
-                    'data': data,
-                    'df': df
-                }
-                st.success(f"Processados {len(df)} registros de revisão.")
+    if entry is not None:
+        dataset = entry['dataset']
+        files_df = dataset['files']
+        revisions_df = dataset['revisions']
+        content = entry['log_content']
+        
+        # Rollup por autor do dataset (criado a partir da carga anterior da sessão em set_session_handle)
+        author_rollup = derived_value(entry, 'author_rollup', lambda: AuthorRollup.build(revisions_df))
+        
+        # Base SQLite opcional: grava o dataset e passa a responder às consultas filtradas
+        store = get_revision_store()
+        if store is not None:
+            with st.spinner('Gravando revisões na base local...'):
+                store.ingest(st.session_state.dataset_handle.digest, dataset)
+            st.caption(f"🗄️ Consultas na base local SQLite ({store.count()} revisões armazenadas)")
+        
+        if new_file_detected:
+            st.success(f"Processados {len(revisions_df)} registros de revisão.")
         else:
-            df = st.session_state.df
-            st.info(f"Dados já processados anteriormente ({len(df)} registros)")
+            st.info(f"Dados já processados anteriormente ({len(revisions_df)} registros)")
         
-        # Botão para baixar o arquivo original
-        if st.session_state.log_content:
+        # Novidades em relação à carga anterior da sessão
+        snapshot_changes = st.session_state.snapshot_changes
+        if snapshot_changes is not None and snapshot_changes[0] == st.session_state.dataset_handle.digest:
+            render_snapshot_changes(dataset, snapshot_changes[1])
+        
+        # Botões para baixar o arquivo original (texto e compactado)
+        archive = entry.get('log_archive')
+        if content:
+            col_plain, col_compressed = st.columns(2)
+            with col_plain:
+                st.download_button(
+                    label="📥 Baixar Arquivo de Log Original",
+                    data=content,
+                    file_name=f"Log_telas_{datetime.now().strftime('%d_%m_%Y')}.csv",
+                    mime="text/csv"
+                )
+            with col_compressed:
+                # Compactação rápida, feita uma única vez por dataset e compartilhada entre as sessões
+                st.download_button(
+                    label="📦 Baixar Arquivo de Log Compactado (.gz)",
+                    data=derived_value(entry, 'log_gzip',
+                                       lambda: gzip.compress(content.encode('utf-8', errors='surrogatepass'), compresslevel=1)),
+                    file_name=f"Log_telas_{datetime.now().strftime('%d_%m_%Y')}.csv.gz",
+                    mime="application/gzip"
+                )
+        elif archive:
+            archive_name, archive_data = archive
             st.download_button(
-                label="📥 Baixar Arquivo de Log Original",
-                data=st.session_state.log_content,
-                file_name=f"Log_telas_{datetime.now().strftime('%d_%m_%Y')}.csv",
-                mime="text/csv"
+                label="📦 Baixar Arquivo de Log Original (compactado)",
+                data=archive_data,
+                file_name=archive_name,
+                mime="application/octet-stream"
             )
         
         # Filtros
         st.sidebar.header("Filtros")
         
+        # Os filtros ficam em um formulário: a página só é reexecutada ao clicar em Aplicar
+        filters_form = st.sidebar.form("filters_form")
+        
         # Filtro Análise PDR
-        pdr_only = st.sidebar.checkbox("Análise PDR", value=False, 
-                                      help="Filtrar resultados com mensagem iniciando por '#' e realizar análise detalhada")
+        pdr_only = filters_form.checkbox("Análise PDR", value=False, 
+                                         help="Filtrar resultados com mensagem iniciando por '#' e realizar análise detalhada")
         
         # Filtro Ignorar Ana e Dig
-        ignore_ana_dig = st.sidebar.checkbox("Ignorar Ana e Dig", value=True,
-                                           help="Ignorar arquivos que começam com 'Ana' e 'Dig'")
+        ignore_ana_dig = filters_form.checkbox("Ignorar Ana e Dig", value=True,
+                                               help="Ignorar arquivos que começam com 'Ana' e 'Dig'")
         
         # Filtro Ignorar excluídos
-        ignore_excluded = st.sidebar.checkbox("Ignorar excluídos", value=True,
-                                            help="Ignorar arquivos excluídos (ficam registrados no diretório /Attic/)")
+        ignore_excluded = filters_form.checkbox("Ignorar excluídos", value=True,
+                                                help="Ignorar arquivos excluídos (ficam registrados no diretório /Attic/)")
+        
+        # Filtro Ignorar revisões dead
+        ignore_dead = filters_form.checkbox("Ignorar revisões 'dead'", value=False,
+                                            help="Ignorar as revisões que registram a remoção do arquivo (state: dead)")
+        
+        # Filtro trunk/branches
+        branch_mode_label = filters_form.selectbox("Tipo de Commit", list(BRANCH_MODES), index=0,
+                                                   help="Commits no trunk (ex: 1.5) ou em branches (ex: 1.2.2.1)")
         
         # Ignorar temporários (fixo - sempre True)
         ignore_temp_files = True
                
         # Obter opções filtradas
-        if not df.empty:
-            filtered_options = get_filtered_options(df, ignore_ana_dig, ignore_temp_files)
+        if not revisions_df.empty:
+            if store is not None:
+                filtered_options = store.filter_options(st.session_state.dataset_handle.digest, ignore_ana_dig, ignore_temp_files)
+            else:
+                filtered_options = derived_value(
+                    entry, ('filter_options', ignore_ana_dig, ignore_temp_files),
+                    lambda: get_filtered_options(files_df, revisions_df, ignore_ana_dig, ignore_temp_files)
+                )
+            
+            # Filtro por origem (apenas quando o dataset junta várias fontes)
+            if len(filtered_options.get('sources', [])) > 1:
+                selected_sources = filters_form.multiselect(
+                    "Origem",
+                    options=filtered_options['sources'],
+                    default=[],
+                    placeholder="Selecione uma ou mais fontes",
+                    help="Filtra pela fonte (host e repositório) de onde o log foi buscado"
+                )
+            else:
+                selected_sources = []
             
             # Filtro por Centro
             if filtered_options['centros']:
-                selected_centros = st.sidebar.multiselect(
+                selected_centros = filters_form.multiselect(
                     "Centro",
                     options=filtered_options['centros'],
                     default=[],
@@ -576,7 +2683,7 @@ def main():
             
             # Filtro por Estado
             if filtered_options['estados']:
-                selected_estados = st.sidebar.multiselect(
+                selected_estados = filters_form.multiselect(
                     "Estado",
                     options=filtered_options['estados'],
                     default=[],
@@ -588,7 +2695,7 @@ def main():
             
             # Filtro por nome do arquivo (multiseleção)
             if filtered_options['filenames']:
-                selected_filenames = st.sidebar.multiselect(
+                selected_filenames = filters_form.multiselect(
                     "Nome da Tela",
                     options=filtered_options['filenames'],
                     default=[],
@@ -600,7 +2707,7 @@ def main():
             
             # Filtro por autor (multiseleção)
             if filtered_options['authors']:
-                selected_authors = st.sidebar.multiselect(
+                selected_authors = filters_form.multiselect(
                     "Autor",
                     options=filtered_options['authors'],
                     default=[],
@@ -611,18 +2718,23 @@ def main():
                 selected_authors = []
             
             # Filtro por caminho
-            path_filter = st.sidebar.text_input("Caminho da Tela", placeholder="Ex: /DRILL/", help="Filtrar pelo caminho do arquivo")
+            path_filter = filters_form.text_input("Caminho da Tela", placeholder="Ex: /DRILL/", help="Filtrar pelo caminho do arquivo")
+            
+            # Busca textual nas mensagens de commit
+            search_query = filters_form.text_input(
+                "Buscar na mensagem",
+                placeholder="Ex: camacari otrs*",
+                help="Ignora acentos e maiúsculas. Termos separados por espaço devem aparecer todos (E); "
+                     "use OU para alternativas e * no final para buscar por prefixo."
+            )
 
             # Filtro por data
-            col1, col2 = st.sidebar.columns(2)
+            col1, col2 = filters_form.columns(2)
             with col1:
-                if 'date' in df.columns and not df.empty:
+                if 'date' in revisions_df.columns and not revisions_df.empty:
                     # Converter datas para datetime para filtro
                     try:
-                        df_date_filter = df.copy()
-                        df_date_filter['date_dt'] = pd.to_datetime(df_date_filter['date'], format='%d/%m/%Y', errors='coerce')
-                        min_date = df_date_filter['date_dt'].min()
-                        max_date = df_date_filter['date_dt'].max()
+                        min_date, max_date = store.date_bounds(st.session_state.dataset_handle.digest) if store is not None else derived_value(entry, 'date_bounds', lambda: get_date_bounds(revisions_df))
                         
                         if pd.notna(min_date) and pd.notna(max_date):
                             default_end_date = max_date.date()
@@ -644,7 +2756,7 @@ def main():
                     start_date = st.date_input("Data Início",format="DD/MM/YYYY")
             
             with col2:
-                if 'date' in df.columns and not df.empty:
+                if 'date' in revisions_df.columns and not revisions_df.empty:
                     try:
                         if pd.notna(min_date) and pd.notna(max_date):
                             end_date = st.date_input(
@@ -661,554 +2773,86 @@ def main():
                 else:
                     end_date = st.date_input("Data Fim",format="DD/MM/YYYY")
         
-        # Aplicar filtros
-        filtered_df = df.copy()
+        filters_form.form_submit_button("Aplicar filtros", type="primary", use_container_width=True)
         
-        if not df.empty:
-            # Filtro PDR
-            if pdr_only:
-                filtered_df = filtered_df.loc[filtered_df['is_pdr'] == True]
-            
-            # Filtro Ignorar Ana e Dig
-            if ignore_ana_dig:
-                mask_ana = ~filtered_df['working_file'].str.startswith('Ana', na=False)
-                mask_dig = ~filtered_df['working_file'].str.startswith('Dig', na=False)
-                filtered_df = filtered_df.loc[mask_ana & mask_dig]
-            
-            # Filtro Ignorar arquivos temporários (sempre aplicado)
-            if ignore_temp_files:
-                mask_temp1 = ~filtered_df['working_file'].str.startswith('.#', na=False)
-                mask_temp2 = ~filtered_df['working_file'].str.startswith('.nfs', na=False)
-                filtered_df = filtered_df.loc[mask_temp1 & mask_temp2]
-            
-            # Filtro excluídos
-            if ignore_excluded:
-                mask_excluded = ~filtered_df['rcs_file'].str.contains('/Attic/', na=False)
-                filtered_df = filtered_df.loc[mask_excluded]
-            
-            # Filtro por Centro
-            if 'centro' in filtered_df.columns and selected_centros:
-                filtered_df = filtered_df.loc[filtered_df['centro'].isin(selected_centros)]
-            
-            # Filtro por Estado
-            if 'estado' in filtered_df.columns and selected_estados:
-                filtered_df = filtered_df.loc[filtered_df['estado'].isin(selected_estados)]
-            
-            # Filtro por caminho
-            if path_filter:
-                mask_path = filtered_df['rcs_file'].str.contains(path_filter, case=False, na=False)
-                filtered_df = filtered_df.loc[mask_path]
-            
-            # Filtro por nome do arquivo
-            if selected_filenames:
-                filtered_df = filtered_df.loc[filtered_df['working_file'].isin(selected_filenames)]
-            
-            # Filtro por autor
-            if selected_authors:
-                filtered_df = filtered_df.loc[filtered_df['author'].isin(selected_authors)]
-            
-            # Filtro por data
-            if 'date' in filtered_df.columns:
-                try:
-                    filtered_df_date = filtered_df.copy()
-                    filtered_df_date['date_dt'] = pd.to_datetime(filtered_df_date['date'], format='%d/%m/%Y', errors='coerce')
-                    
-                    if start_date:
-                        start_datetime = datetime.combine(start_date, datetime.min.time())
-                        mask_start = filtered_df_date['date_dt'] >= start_datetime
-                        filtered_df = filtered_df.loc[mask_start]
-                    
-                    if end_date:
-                        end_datetime = datetime.combine(end_date, datetime.max.time())
-                        mask_end = filtered_df_date['date_dt'] <= end_datetime
-                        filtered_df = filtered_df.loc[mask_end]
-                except:
-                    pass
-            
-            # Aplicar mapeamento de classificações se existir
-            if st.session_state.classification_mapping:
-                filtered_df = apply_classification_mapping_to_dataframe(filtered_df, st.session_state.classification_mapping)
-            
-            # Exibir resultados
-            st.subheader(f"Resultados ({len(filtered_df)} registros)")
-
-            # CORREÇÃO DA ORDENAÇÃO - FORMA MAIS ROBUSTA
-            # Criar uma cópia para não modificar o original
-            filtered_df_sorted = filtered_df.copy()
-            
-            # Converter a coluna 'date' para datetime
-            filtered_df_sorted['date_dt'] = pd.to_datetime(
-                filtered_df_sorted['date'], 
-                format='%d/%m/%Y', 
-                errors='coerce'
-            )
-            
-            # Ordenar pela data convertida
-            filtered_df_sorted = filtered_df_sorted.sort_values(by=['date_dt','time'], ascending=[False,False])
-            
-            # Remover a coluna temporária
-            filtered_df_sorted = filtered_df_sorted.drop('date_dt', axis=1)
-            
-            # Criar DataFrame para exibição com o novo formato
-            display_columns = ['centro', 'estado', 'rcs_file', 'working_file', 'revision', 'author', 'date', 'time']
-            
-            # Adicionar colunas PDR se for análise PDR
-            if pdr_only:
-                display_columns.extend(['pdr_classification', 'pdr_time', 'pdr_description'])
-            else:
-                display_columns.append('message')
-            
-            display_df = filtered_df_sorted[display_columns].copy()
-            
-            # Renomear colunas para exibição
-            column_rename_map = {
-                'centro': 'Centro',
-                'estado': 'Estado', 
-                'rcs_file': 'Caminho da Tela',
-                'working_file': 'Nome da Tela',
-                'revision': 'Revisão',
-                'author': 'Autor',
-                'date': 'Data',
-                'time': 'Hora',
-                'message': 'Mensagem',
-                'pdr_classification': 'Tipo',
-                'pdr_time': 'Tempo (min)',
-                'pdr_description': 'Comentário'
-            }
-            
-            display_df = display_df.rename(columns=column_rename_map)
-            
-            # Configurar a exibição do DataFrame (sem índice e ocultando Caminho da Tela)
-            column_config = {
-                "Centro": st.column_config.TextColumn(width="small"),
-                "Estado": st.column_config.TextColumn(width="small"),
-                "Caminho da Tela": st.column_config.Column(disabled=True),  # Oculta por padrão
-                "Nome da Tela": st.column_config.TextColumn(width="medium"),
-                "Revisão": st.column_config.TextColumn(width="none"),
-                "Autor": st.column_config.TextColumn(width="medium"),
-                "Data": st.column_config.TextColumn(width="none"),
-                "Hora": st.column_config.TextColumn(width="none")
+        if not revisions_df.empty:
+            # Aplicar filtros
+            filters = {
+                'pdr_only': pdr_only,
+                'ignore_ana_dig': ignore_ana_dig,
+                'ignore_temp_files': ignore_temp_files,
+                'ignore_excluded': ignore_excluded,
+                'ignore_dead': ignore_dead,
+                'branch_mode': BRANCH_MODES[branch_mode_label],
+                'sources': selected_sources,
+                'centros': selected_centros,
+                'estados': selected_estados,
+                'filenames': selected_filenames,
+                'authors': selected_authors,
+                'path': path_filter,
+                'search': search_query.strip(),
+                'start_date': start_date,
+                'end_date': end_date
             }
+            mapping = st.session_state.classification_mapping
+            view_key = result_cache_key(st.session_state.dataset_handle.digest, filters, mapping)
             
-            # Adicionar configurações para colunas PDR se for análise PDR
-            if pdr_only:
-                column_config.update({
-                    "Tipo": st.column_config.TextColumn(width="none"),
-                    "Tempo (min)": st.column_config.NumberColumn(width="small"),
-                    "Comentário": st.column_config.TextColumn(width="medium")
-                })
+            if store is not None:
+                filtered_df = store.query(st.session_state.dataset_handle.digest, filters)
+                if filters['search']:
+                    # As linhas da consulta não são posições do dataset, então o índice é montado sobre o resultado
+                    filtered_df = filtered_df.loc[MessageIndex(filtered_df['message']).search_mask(filters['search'])]
+                if mapping:
+                    filtered_df = apply_classification_mapping_to_dataframe(filtered_df, mapping)
+                # Os resultados da base não são linhas do dataset em memória: agregados só desta execução
+                result = {'derived': {}, 'nbytes': 0}
             else:
-                column_config["Mensagem"] = st.column_config.TextColumn(width="large")
+                # Estados de filtros já vistos (por qualquer sessão) são apenas consultados no cache
+                result_cache = get_result_cache()
+                result = result_cache.get(view_key)
+                if result is not None:
+                    filtered_df = result_frame(dataset, result)
+                else:
+                    message_index = None
+                    if filters['search']:
+                        message_index = derived_value(entry, 'message_index', lambda: MessageIndex(revisions_df['message']))
+                    filtered_rows = apply_filters(revisions_df, files_df, filters, message_index).index.to_numpy()
+                    # As linhas filtradas seguem a ordem de exibição pré-calculada do dataset
+                    filtered_df = dataset_rows(dataset, ordered_rows(display_order(entry), filtered_rows))
+                    
+                    # Aplicar mapeamento de classificações se existir
+                    if mapping:
+                        filtered_df = apply_classification_mapping_to_dataframe(filtered_df, mapping)
+                    result = result_cache.put(view_key, filtered_df, bool(mapping))
             
-            # Ordem das colunas para exibição (sem Caminho da Tela)
-            column_order = ['Centro', 'Estado', 'Nome da Tela', 'Revisão', 'Autor', 'Data', 'Hora']
-            if pdr_only:
-                column_order.extend(['Tipo', 'Tempo (min)', 'Comentário'])
-            else:
-                column_order.append('Mensagem')
+            # Exibir resultados
+            render_results(filtered_df, pdr_only, view_key)
             
-            st.dataframe(
-                display_df,
-                use_container_width=True,
-                height=600,
-                hide_index=True,
-                column_config=column_config,
-                column_order=column_order
-            )
-           
-            # Botão de popover para Classificação de Commits
-            col_info, col_classif = st.columns([1, 5])
-            with col_info:
-                st.caption("ℹ️ O CrossVC considera o fuso horário GMT+0 (+3h em relação ao horário local).")
-            with col_classif:
-                with st.popover("📋 Classificação de Commits", use_container_width=False):
-                    st.markdown("""
-                    FORMATO: __**#CLASSIFICAÇÃO#TEMPO#COMENTÁRIO**__  
-                    Onde a classificação é uma das listadas abaixo, o tempo (em minutos) é um número inteiro e o comentário é o campo livre para explicação do motivo da revisão.  
-                      
-                    **1. ANOMALIA**  
-                    Refere-se a erros ou incoerências identificados externamente, por exemplo, pelas Salas de Operação ou outras gerências (como RSO, PRI), que impactam o funcionamento ou a coerência da tela.  
-                    • Correções internamente identificadas devem ser classificadas como MANUTENÇÃO.  
-                    • O tempo de execução da anomalia deve considerar todas as etapas envolvidas, como abertura do chamado no sistema OTRS, análise de diagrama envolvido, edição da tela, entre outras.  
-                    • Quando houver mais de um tipo de alteração (ex: anomalia e melhoria), devem ser realizados commits separados, salvo quando uma das ações for irrelevante frente à outra.
-
-                    **2. MANUT (Manutenção)**  
-                    Refere-se a ajustes de rotina, preventivos ou corretivos, realizados pela equipe da PDR sem demanda externa.  
-                    **Exemplos:**  
-                    • Retirada de sinalização de futuro  
-                    • Ajustes de textos de revisões de IO  
-                    • Troca de agente operador  
-                    • Troca de posicionamento de equipamentos  
-                    • Correções de erros identificados internamente, desde que não tenham sido sinalizados por outras áreas
-
-                    **3. RECOMP (Recomposição)**  
-                    Classificação destinada a alterações em telas relacionadas ao processo de recomposição do sistema, como os corredores de recomposição.  
-                    • **Exclusão**: casos em que houver erro identificado externamente (ANOMALIA), mesmo em telas de recomposição, devem ser registrados como ANOMALIA.
-
-                    **4. NOVA**  
-                    Aplica-se à criação de novas telas no REGER e equipamentos novos em telas já existentes.
-
-                    **5. MELHORIA**  
-                    Refere-se a alterações não essenciais, que não tratam erros, mas têm o objetivo de otimizar a usabilidade, visualização ou interpretação da tela.  
-                    **Exemplos:**  
-                    • Mudanças de layout  
-                    • Inclusão de novos filtros  
-                    • Inserção de elementos visuais ou alarmes  
-                    • Ajustes de lógica solicitados pela operação, sem envolvimento de falha
-                    """)
-
-            # Botão de download em Excel
-            today = datetime.now().strftime("%d_%m_%Y")
-            filename = f"Check_log_telas-{today}.xlsx"
-
+            # Análise PDR - Estatísticas detalhadas
+            render_pdr_analysis(filtered_df, filters, store, result)
+            if pdr_only and len(filtered_df) > 0:
+                render_pdr_report(filtered_df, view_key)
             
-            # Botão de download em Excel
-            today = datetime.now().strftime("%d_%m_%Y")
-            filename = f"Check_log_telas-{today}.xlsx"
+            # Auditoria do formato das mensagens (verificada uma vez por dataset e recortada pelos filtros)
+            if len(filtered_df) > 0:
+                if store is not None:
+                    rules = audit_pdr_messages(filtered_df['message'])
+                else:
+                    rules = derived_value(entry, 'pdr_audit_rules', lambda: audit_pdr_messages(revisions_df['message']))
+                    rules = rules.take(filtered_df.index.to_numpy())
+                render_pdr_audit(filtered_df, rules, result, view_key)
             
-            # Criar arquivo Excel
-            excel_file = create_excel_file(display_df)
+            # Atividade ao longo do tempo
+            render_activity(entry, filters, result)
             
-            # Salvar em buffer
-            from io import BytesIO
-            excel_buffer = BytesIO()
-            excel_file.save(excel_buffer)
-            excel_buffer.seek(0)
+            # Churn por arquivo
+            render_churn(filtered_df, result)
             
-            st.download_button(
-                label="📥 Baixar em Excel",
-                data=excel_buffer,
-                file_name=filename,
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-
-            # Botão de download em Excel
-            today = datetime.now().strftime("%d_%m_%Y")
-            filename = f"Check_log_telas-{today}.xlsx"
+            # Histórico de um arquivo (árvore de revisões)
+            render_file_history(dataset, filtered_df)
             
-            # Análise PDR - Estatísticas detalhadas
-            if pdr_only and len(filtered_df) > 0:
-                st.subheader("📈 Análise PDR Detalhada")
-                
-                # Criar DataFrame apenas com registros PDR válidos (com classificação e tempo)
-                pdr_df = filtered_df[
-                    (filtered_df['pdr_classification'].notna()) & 
-                    (filtered_df['pdr_time'].notna())
-                ].copy()
-                
-                if len(pdr_df) > 0:
-                    # Obter classificações únicas
-                    classification_counts = pdr_df['pdr_classification'].value_counts()
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.write("**Classificações quantificadas:**")
-                        # Formatar: MANUT: 10 | NOVA: 71 | MELHORIA: 25
-                        classifications_text = " | ".join([f"{cls}: {count}" for cls, count in classification_counts.items()])
-                        st.write(classifications_text)
-                        
-                        # Botão para agrupar classificações
-                        if st.button("Agrupar Classificações"):
-                            st.session_state.show_classification_grouping = not st.session_state.show_classification_grouping
-                    
-                    with col2:
-                        # Arquivos mais modificados
-                        file_counts = pdr_df['working_file'].value_counts().head(5)
-                        st.write("**Arquivos Mais Modificados:**")
-                        # Formatar: arquivo1: 19 | arquivo2: 20 | arquivo3: 8
-                        files_text = " | ".join([f"{file}: {count}" for file, count in file_counts.items()])
-                        st.write(files_text)
-                    
-                    # Seção de agrupamento de classificações (apenas se o botão foi clicado)
-                    if st.session_state.show_classification_grouping:
-                        st.subheader("🔄 Agrupamento de Classificações")
-                        
-                        # Obter classificações únicas atualizadas
-                        current_unique = sorted(pdr_df['pdr_classification'].unique())
-                        
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            # Lista de seleção única para classificação original (destino)
-                            target_classification = st.selectbox(
-                                "Classificação original:",
-                                options=current_unique,
-                                key="target_classification"
-                            )
-                        
-                        with col2:
-                            # Lista de seleção múltipla para classificações a agrupar
-                            # Remover a classificação destino das opções
-                            source_options = [cls for cls in current_unique if cls != target_classification]
-                            source_classifications = st.multiselect(
-                                "Agrupar com:",
-                                options=source_options,
-                                key="source_classifications"
-                            )
-                        
-                        # Botões lado a lado
-                        col_btn1, col_btn2 = st.columns(2)
-                        
-                        with col_btn1:
-                            # Botão para confirmar agrupamento
-                            if st.button("Confirmar Agrupamento"):
-                                if target_classification and source_classifications:
-                                    # Adicionar mapeamento ao session state
-                                    for source in source_classifications:
-                                        st.session_state.classification_mapping[source] = target_classification
-                                    
-                                    st.success(f"Classificações {source_classifications} agrupadas em {target_classification}")
-                                    
-                                    # Forçar rerun para atualizar as listas
-                                    st.rerun()
-                        
-                        with col_btn2:
-                            # Botão para limpar agrupamentos (ao lado do confirmar)
-                            if st.session_state.classification_mapping:
-                                if st.button("🗑️ Limpar Agrupamentos"):
-                                    st.session_state.classification_mapping = {}
-                                    st.success("Agrupamentos limpos!")
-                                    st.rerun()
-                    
-                    # Análise de tempo por classificação
-                    st.subheader("⏱️ Análise de Tempo")
-                    
-                    # Tempo total por classificação
-                    time_by_classification = pdr_df.groupby('pdr_classification')['pdr_time'].sum().sort_values(ascending=False)
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        # Gráfico de pizza - Tempo por classificação
-                        if len(time_by_classification) > 0:
-                            colors = get_theme_adaptive_colors()
-                            fig_pie = px.pie(
-                                values=time_by_classification.values,
-                                names=time_by_classification.index,
-                                title="Distribuição de Tempo por Classificação",
-                                color_discrete_sequence=px.colors.qualitative.Set3
-                            )
-                            fig_pie.update_layout(
-                                paper_bgcolor=colors['paper_bgcolor'],
-                                plot_bgcolor=colors['plot_bgcolor'],
-                                font=dict(color=colors['text_color'])
-                            )
-                            fig_pie.update_traces(textposition='inside', textinfo='percent+label')
-                            st.plotly_chart(fig_pie, use_container_width=True)
-                    
-                    with col2:
-                        # Gráfico de barras - Tempo por classificação com tempo nas anotações
-                        if len(time_by_classification) > 0:
-                            colors = get_theme_adaptive_colors()
-                            fig_bar = px.bar(
-                                x=time_by_classification.index,
-                                y=time_by_classification.values,
-                                title="Tempo Total por Classificação (minutos)",
-                                labels={'x': 'Classificação', 'y': 'Tempo Total (min)'},
-                                color=time_by_classification.values,
-                                color_continuous_scale=colors['color_scale']
-                            )
-                            
-                            fig_bar.update_layout(
-                                paper_bgcolor=colors['paper_bgcolor'],
-                                plot_bgcolor=colors['plot_bgcolor'],
-                                font=dict(color=colors['text_color']),
-                                xaxis=dict(gridcolor=colors['grid_color']),
-                                yaxis=dict(gridcolor=colors['grid_color'])
-                            )
-                            
-                            # Adicionar anotações com o tempo
-                            for i, (classification, time_val) in enumerate(zip(time_by_classification.index, time_by_classification.values)):
-                                fig_bar.add_annotation(
-                                    x=classification,
-                                    y=time_val,
-                                    text=f"{time_val:.0f} min",
-                                    showarrow=False,
-                                    yshift=10,
-                                    font=dict(color=colors['text_color'], size=12)
-                                )
-                            
-                            st.plotly_chart(fig_bar, use_container_width=True)
-                    
-                    # Top arquivos por tempo gasto
-                    st.subheader("📋 Arquivos que Demandaram Mais Tempo")
-                    
-                    time_by_file = pdr_df.groupby('working_file')['pdr_time'].sum().sort_values(ascending=False).head(10)
-                    
-                    if len(time_by_file) > 0:
-                        colors = get_theme_adaptive_colors()
-                        fig_files = px.bar(
-                            x=time_by_file.values,
-                            y=time_by_file.index,
-                            orientation='h',
-                            title="Top 10 Arquivos por Tempo Gasto (minutos)",
-                            labels={'x': 'Tempo Total (min)', 'y': 'Arquivo'},
-                            color=time_by_file.values,
-                            color_continuous_scale=colors['color_scale']
-                        )
-                        fig_files.update_layout(
-                            paper_bgcolor=colors['paper_bgcolor'],
-                            plot_bgcolor=colors['plot_bgcolor'],
-                            font=dict(color=colors['text_color'])
-                        )
-                        st.plotly_chart(fig_files, use_container_width=True)
-                    
-                    # Análise por centro
-                    st.subheader("🏢 Análise por Centro")
-                    
-                    # Análise por centro (já extraído)
-                    centro_analysis = pdr_df[pdr_df['centro'].notna()]
-                    
-                    if len(centro_analysis) > 0:
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            # Quantidade por centro - ordenar decrescente
-                            count_by_centro = centro_analysis['centro'].value_counts().sort_values(ascending=False)
-                            colors = get_theme_adaptive_colors()
-                            fig_count = px.bar(
-                                x=count_by_centro.index,
-                                y=count_by_centro.values,
-                                title="Quantidade de Arquivos por Centro",
-                                labels={'x': 'Centro', 'y': 'Quantidade de Arquivos'},
-                                color=count_by_centro.values,
-                                color_continuous_scale='teal'
-                            )
-                            fig_count.update_layout(
-                                paper_bgcolor=colors['paper_bgcolor'],
-                                plot_bgcolor=colors['plot_bgcolor'],
-                                font=dict(color=colors['text_color'])
-                            )
-                            st.plotly_chart(fig_count, use_container_width=True)
-                        
-                        with col2:
-                            # Tempo por centro - ordenar decrescente
-                            time_by_centro = centro_analysis.groupby('centro')['pdr_time'].sum().sort_values(ascending=False)
-                            colors = get_theme_adaptive_colors()
-                            fig_time = px.bar(
-                                x=time_by_centro.index,
-                                y=time_by_centro.values,
-                                title="Tempo Total por Centro (minutos)",
-                                labels={'x': 'Centro', 'y': 'Tempo Total (min)'},
-                                color=time_by_centro.values,
-                                color_continuous_scale='algae'
-                            )
-                            
-                            fig_time.update_layout(
-                                paper_bgcolor=colors['paper_bgcolor'],
-                                plot_bgcolor=colors['plot_bgcolor'],
-                                font=dict(color=colors['text_color'])
-                            )
-                            
-                            # Adicionar anotações com o tempo
-                            for i, (centro, time_val) in enumerate(zip(time_by_centro.index, time_by_centro.values)):
-                                fig_time.add_annotation(
-                                    x=centro,
-                                    y=time_val,
-                                    text=f"{time_val:.0f} min",
-                                    showarrow=False,
-                                    yshift=10,
-                                    font=dict(color=colors['text_color'], size=12)
-                                )
-                            
-                            st.plotly_chart(fig_time, use_container_width=True)
-                        
-                        # Métricas por centro
-                        st.write("**Métricas Detalhadas por Centro:**")
-                        
-                        centro_stats = centro_analysis.groupby('centro').agg({
-                            'pdr_time': ['sum', 'mean', 'max', 'count'],
-                            'working_file': 'nunique'
-                        }).round(2)
-                        
-                        centro_stats.columns = ['Tempo Total (min)', 'Tempo Médio (min)', 'Tempo Máximo (min)', 'Total de Revisões', 'Arquivos Únicos']
-                        st.dataframe(centro_stats, use_container_width=True)
-                    
-                    # Análise por estado
-                    st.subheader("🗺️ Análise por Estado")
-                    
-                    estado_analysis = pdr_df[pdr_df['estado'].notna()]
-                    
-                    if len(estado_analysis) > 0:
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            # Quantidade por estado - ordenar decrescente
-                            count_by_estado = estado_analysis['estado'].value_counts().sort_values(ascending=False).head(10)
-                            colors = get_theme_adaptive_colors()
-                            fig_count_estado = px.bar(
-                                x=count_by_estado.index,
-                                y=count_by_estado.values,
-                                title="Top 10 Estados por Quantidade de Arquivos",
-                                labels={'x': 'Estado', 'y': 'Quantidade de Arquivos'},
-                                color=count_by_estado.values,
-                                color_continuous_scale='purp'
-                            )
-                            fig_count_estado.update_layout(
-                                paper_bgcolor=colors['paper_bgcolor'],
-                                plot_bgcolor=colors['plot_bgcolor'],
-                                font=dict(color=colors['text_color'])
-                            )
-                            st.plotly_chart(fig_count_estado, use_container_width=True)
-                        
-                        with col2:
-                            # Tempo por estado - ordenar decrescente
-                            time_by_estado = estado_analysis.groupby('estado')['pdr_time'].sum().sort_values(ascending=False).head(10)
-                            colors = get_theme_adaptive_colors()
-                            fig_time_estado = px.bar(
-                                x=time_by_estado.index,
-                                y=time_by_estado.values,
-                                title="Top 10 Estados por Tempo Total (minutos)",
-                                labels={'x': 'Estado', 'y': 'Tempo Total (min)'},
-                                color=time_by_estado.values,
-                                color_continuous_scale='sunsetdark'
-                            )
-                            
-                            fig_time_estado.update_layout(
-                                paper_bgcolor=colors['paper_bgcolor'],
-                                plot_bgcolor=colors['plot_bgcolor'],
-                                font=dict(color=colors['text_color'])
-                            )
-                            
-                            # Adicionar anotações com o tempo
-                            for i, (estado, time_val) in enumerate(zip(time_by_estado.index, time_by_estado.values)):
-                                fig_time_estado.add_annotation(
-                                    x=estado,
-                                    y=time_val,
-                                    text=f"{time_val:.0f} min",
-                                    showarrow=False,
-                                    yshift=10,
-                                    font=dict(color=colors['text_color'], size=12)
-                                )
-                            
-                            st.plotly_chart(fig_time_estado, use_container_width=True)
-                    
-                    # Estatísticas gerais
-                    st.subheader("📊 Estatísticas Gerais PDR")
-                    
-                    total_time = pdr_df['pdr_time'].sum()
-                    total_time_hours = total_time / 60
-                    avg_time = pdr_df['pdr_time'].mean()
-                    max_time = pdr_df['pdr_time'].max()
-                    total_files = pdr_df['working_file'].nunique()
-                    total_revisions = len(pdr_df)
-                    
-                    col1, col2, col3, col4, col5 = st.columns(5)
-                    
-                    with col1:
-                        st.metric("Tempo Total", f"{total_time:.0f} min ({total_time_hours:.1f} h)")
-                    with col2:
-                        st.metric("Tempo Médio por Revisão", f"{avg_time:.1f} min")
-                    with col3:
-                        st.metric("Tempo Máximo por Revisão", f"{max_time:.1f} min")
-                    with col4:
-                        st.metric("Arquivos Únicos", total_files)
-                    with col5:
-                        st.metric("Total de Revisões", total_revisions)
-                
-                else:
-                    st.info("Nenhum registro PDR com informações de classificação e tempo encontrado.")
+            # Análise por autor (rollup incremental)
+            render_author_analysis(author_rollup, files_df, filters, result)
         else:
             st.info("Nenhum dado para exibir após aplicar os filtros.")
     
@@ -0,0 +1,564 @@
+import re
+import io
+import gzip
+import zipfile
+import bisect
+import hashlib
+import difflib
+import importlib.util
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import rcs_reader
+
+# Processamento do cvs log e montagem do dataset normalizado (arquivos e revisões).
+# Módulo sem dependências da interface nem do SSH, para uso fora do streamlit.
+
+# Linha separadora das seções de arquivo no cvs log
+SECTION_SEPARATOR = re.compile(r'={70,}')
+
+def zstd_available():
+    """Indica se há um descompactador zstd (módulo padrão do Python 3.14+ ou o pacote zstandard), sem importá-lo"""
+    for module in ('compression.zstd', 'zstandard'):
+        try:
+            if importlib.util.find_spec(module) is not None:
+                return True
+        except ModuleNotFoundError:
+            pass
+    return False
+
+# Extensões de log compactado aceitas no carregamento manual (.zst apenas se puder ser descompactado)
+COMPRESSED_EXTENSIONS = ('.gz',) + (('.zst',) if zstd_available() else ()) + ('.zip',)
+
+def content_digest(content):
+    """Calcula o digest usado para identificar um conteúdo de log"""
+    return hashlib.blake2b(content.encode('utf-8', errors='surrogatepass'), digest_size=16).hexdigest()
+
+def iter_log_sections(lines):
+    """Divide um fluxo de linhas do log nas seções de arquivo (mesmo resultado do split no conteúdo completo)"""
+    current = []
+    for line in lines:
+        parts = SECTION_SEPARATOR.split(line)
+        current.append(parts[0])
+        for part in parts[1:]:
+            yield ''.join(current)
+            current = [part]
+    yield ''.join(current)
+
+def open_compressed(fileobj, name):
+    """Abre um log compactado (.gz, .zst ou .zip) como fluxo binário descompactado"""
+    lower_name = name.lower()
+    if lower_name.endswith('.gz'):
+        return gzip.GzipFile(fileobj=fileobj, mode='rb')
+    if lower_name.endswith('.zst'):
+        try:
+            # Python 3.14+
+            from compression import zstd
+            return zstd.ZstdFile(fileobj, mode='rb')
+        except ImportError:
+            # Dependência opcional nas versões anteriores
+            import zstandard
+            return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(fileobj))
+    if lower_name.endswith('.zip'):
+        archive = zipfile.ZipFile(fileobj)
+        members = [info for info in archive.infolist() if not info.is_dir()]
+        if not members:
+            raise ValueError("o arquivo .zip não contém nenhum log")
+        # O log é o maior arquivo do pacote
+        return archive.open(max(members, key=lambda info: info.file_size))
+    raise ValueError(f"formato de compactação não suportado: {name}")
+
+def parse_log_stream(open_binary, previous=None):
+    """Processa um log lido como fluxo, sem montar o texto completo em memória
+    
+    open_binary() deve abrir o fluxo desde o início; se o conteúdo não for UTF-8 a leitura é refeita em latin-1.
+    """
+    for encoding in ('utf-8', 'latin-1'):
+        try:
+            with io.TextIOWrapper(open_binary(), encoding=encoding, newline='') as text:
+                return parse_log_sections(iter_log_sections(text), previous)
+        except UnicodeDecodeError:
+            continue
+
+def parse_log_content(content, previous=None):
+    """Processa o log e retorna as tabelas normalizadas de arquivos e revisões"""
+    # Dividir o conteúdo em seções de arquivo
+    return parse_log_sections(SECTION_SEPARATOR.split(content), previous)
+
+def parse_log_sections(file_sections, previous=None):
+    """Processa as seções de arquivo do log e monta o dataset
+    
+    Com um dataset anterior, as seções cujo hash não mudou são reaproveitadas sem novo processamento.
+    """
+    previous_ids = {}
+    if previous is not None and previous.get('sections') is not None:
+        previous_ids = {digest: file_id for file_id, digest in enumerate(previous['sections'])}
+    
+    # Ordem final dos arquivos: (file_id no dataset anterior, None) ou (None, posição entre os novos)
+    order = []
+    sections = []
+    parsed_sections = []
+    for section in file_sections:
+        if not section.strip():
+            continue
+        digest = content_digest(section)
+        if digest in previous_ids:
+            order.append((previous_ids[digest], None))
+        else:
+            parsed = parse_file_section(section)
+            if not parsed:
+                continue
+            order.append((None, len(parsed_sections)))
+            parsed_sections.append(parsed)
+        sections.append(digest)
+    
+    dataset = assemble_dataset(parsed_sections)
+    if any(previous_id is not None for previous_id, _ in order):
+        dataset = merge_datasets(previous, dataset, order)
+    dataset['sections'] = sections
+    return dataset
+
+def merge_datasets(previous, dataset, order):
+    """Monta o dataset final com os arquivos reaproveitados do anterior e os processados agora, na ordem do log"""
+    n_previous_files = len(previous['files'])
+    n_previous_revisions = len(previous['revisions'])
+    
+    # A origem (datasets de várias fontes) não pertence ao log processado aqui
+    files_all = pd.concat([previous['files'].drop(columns='source', errors='ignore'), dataset['files']],
+                          ignore_index=True)
+    new_revisions = dataset['revisions'].copy()
+    new_revisions['file_id'] += n_previous_files
+    new_revisions['parent'] = new_revisions['parent'].where(new_revisions['parent'] < 0,
+                                                            new_revisions['parent'] + n_previous_revisions)
+    revisions_all = pd.concat([previous['revisions'], new_revisions], ignore_index=True)
+    revisions_all['state'] = revisions_all['state'].astype('category')
+    
+    # Posição final de cada arquivo (-1 para os arquivos anteriores que saíram do log)
+    file_order = np.array([previous_id if previous_id is not None else n_previous_files + new_id
+                           for previous_id, new_id in order], dtype=np.int64)
+    rank = np.full(len(files_all), -1, dtype=np.int64)
+    rank[file_order] = np.arange(len(file_order))
+    
+    # As revisões ficam agrupadas por arquivo, mantendo a ordem do log dentro de cada um
+    revision_rank = rank[revisions_all['file_id'].to_numpy()]
+    kept = np.flatnonzero(revision_rank >= 0)
+    selected = kept[np.argsort(revision_rank[kept], kind='stable')]
+    new_row = np.full(len(revisions_all), -1, dtype=np.int64)
+    new_row[selected] = np.arange(len(selected))
+    
+    revisions_df = revisions_all.take(selected).reset_index(drop=True)
+    revisions_df['file_id'] = revision_rank[selected].astype('int32')
+    parents = revisions_df['parent'].to_numpy()
+    revisions_df['parent'] = np.where(parents >= 0, new_row[np.maximum(parents, 0)], -1).astype('int32')
+    
+    return {'files': files_all.take(file_order).reset_index(drop=True), 'revisions': revisions_df}
+
+def merge_source_datasets(named_datasets):
+    """Junta os datasets de várias fontes [(nome, dataset)] em um só, com a coluna categórica source nos arquivos"""
+    files = []
+    revisions = []
+    sections = []
+    sources = []
+    file_offset = 0
+    revision_offset = 0
+    
+    for name, dataset in named_datasets:
+        files.append(dataset['files'].drop(columns='source', errors='ignore'))
+        # file_id e pais passam a apontar para as linhas do dataset combinado
+        source_revisions = dataset['revisions'].copy()
+        source_revisions['file_id'] = (source_revisions['file_id'] + file_offset).astype('int32')
+        source_revisions['parent'] = source_revisions['parent'].where(
+            source_revisions['parent'] < 0, source_revisions['parent'] + revision_offset).astype('int32')
+        revisions.append(source_revisions)
+        sections.extend(dataset.get('sections') or [None] * len(dataset['files']))
+        sources.extend([name] * len(dataset['files']))
+        file_offset += len(dataset['files'])
+        revision_offset += len(dataset['revisions'])
+    
+    files_df = pd.concat(files, ignore_index=True)
+    files_df['source'] = pd.Categorical(sources, categories=[name for name, _ in named_datasets])
+    revisions_df = pd.concat(revisions, ignore_index=True)
+    revisions_df['state'] = revisions_df['state'].astype('category')
+    
+    return {'files': files_df, 'revisions': revisions_df, 'sections': sections}
+
+def file_identity_keys(files_df):
+    """Identidade de cada arquivo entre cargas: caminho sem o Attic, precedido da origem em datasets de várias fontes"""
+    # A exclusão move o arquivo para o Attic, então os dois caminhos representam o mesmo arquivo
+    keys = files_df['path'].str.replace('/Attic/', '/', regex=False)
+    if 'source' in files_df:
+        keys = files_df['source'].astype(str) + '\x00' + keys
+    return keys
+
+def diff_snapshots(previous, dataset):
+    """Compara com o dataset anterior e retorna as revisões novas, os arquivos novos e os arquivos excluídos"""
+    files_df = dataset['files']
+    revisions_df = dataset['revisions']
+    previous_files = previous['files']
+    previous_revisions = previous['revisions']
+    
+    # Só os arquivos cuja seção mudou precisam ser comparados
+    if dataset.get('sections') is not None and previous.get('sections') is not None:
+        changed = ~pd.Series(dataset['sections']).isin(set(previous['sections'])).to_numpy()
+    else:
+        changed = np.ones(len(files_df), dtype=bool)
+    
+    # Os arquivos são comparados pela identidade (caminho sem o Attic e origem)
+    keys = file_identity_keys(files_df)
+    previous_keys = file_identity_keys(previous_files)
+    known = keys.isin(set(previous_keys)).to_numpy()
+    previously_active = keys.isin(set(previous_keys[~previous_files['is_attic']])).to_numpy()
+    
+    new_files = np.flatnonzero(changed & ~known)
+    deleted_files = np.flatnonzero(changed & files_df['is_attic'].to_numpy() & previously_active)
+    
+    # Revisões dos arquivos alterados que não existiam no dataset anterior
+    candidate_rows = np.flatnonzero(changed[revisions_df['file_id'].to_numpy()])
+    candidates = pd.DataFrame({
+        'key': keys.to_numpy()[revisions_df['file_id'].to_numpy()[candidate_rows]],
+        'revision': revisions_df['revision'].to_numpy()[candidate_rows]
+    })
+    previous_pairs = pd.DataFrame({
+        'key': previous_keys.to_numpy()[previous_revisions['file_id'].to_numpy()],
+        'revision': previous_revisions['revision'].to_numpy()
+    })
+    previous_pairs = previous_pairs[previous_pairs['key'].isin(set(candidates['key']))].drop_duplicates()
+    merged = candidates.merge(previous_pairs, on=['key', 'revision'], how='left', indicator=True)
+    new_rows = candidate_rows[(merged['_merge'] == 'left_only').to_numpy()]
+    
+    return {'revisions': new_rows, 'files': new_files, 'deleted': deleted_files}
+
+def assemble_dataset(parsed_sections):
+    """Junta as seções (dados do arquivo, revisões) processadas em um único dataset"""
+    files = []
+    revisions = []
+    
+    for file_info, file_revisions in parsed_sections:
+        file_id = len(files)
+        files.append(file_info)
+        # Os pais apontam para a posição na seção; converter para a linha global
+        offset = len(revisions)
+        for rev in file_revisions:
+            rev['file_id'] = file_id
+            if rev['parent'] >= 0:
+                rev['parent'] += offset
+        revisions.extend(file_revisions)
+    
+    return build_dataset(files, revisions)
+
+def load_rcs_mirror(entries, workers=None):
+    """Processa os arquivos ,v do espelho local e retorna o mesmo dataset que o cvs log geraria"""
+    sections = []
+    for file_info, file_revisions in rcs_reader.read_rcs_tree(entries, workers):
+        # Como no "cvs log -S", arquivos sem revisões não aparecem
+        if file_revisions:
+            build_revision_tree(file_revisions)
+            sections.append((file_info, file_revisions))
+    
+    return assemble_dataset(sections)
+
+# Linha "date:" completa do cvs log (estado e linhas alteradas são opcionais)
+DATE_LINE_PATTERN = re.compile(
+    r'date:\s*(?P<date>[^;]+);\s*author:\s*(?P<author>[^;]+);'
+    r'(?:\s*state:\s*(?P<state>[^;]+);)?'
+    r'(?:\s*lines:\s*\+(?P<added>\d+)\s+-(?P<removed>\d+))?'
+)
+
+def parse_file_section(section):
+    """Retorna os dados do arquivo (calculados uma única vez) e a lista de revisões da seção"""
+    lines = section.strip().split('\n')
+    
+    # Extrair informações básicas do arquivo
+    rcs_file = None
+    working_file = None
+    revisions = []
+    current_revision = None
+    in_message = False
+    
+    for i, line in enumerate(lines):
+        line = line.strip()
+        
+        if line.startswith("RCS file:"):
+            rcs_file = line.split(":", 1)[1].strip()
+        elif line.startswith("Working file:"):
+            working_file = line.split(":", 1)[1].strip()
+        elif line.startswith("revision "):
+            # Se já estávamos processando uma revisão, finalizá-la
+            if current_revision:
+                # Processar a mensagem coletada
+                current_revision['message'] = clean_message(current_revision['message'])
+                revisions.append(current_revision)
+            
+            # Iniciar nova revisão
+            revision_match = re.match(r'revision\s+([\d.]+)', line)
+            if revision_match:
+                current_revision = {
+                    'revision': revision_match.group(1),
+                    'date': None,
+                    'author': None,
+                    'state': None,
+                    'lines_added': None,
+                    'lines_removed': None,
+                    'branch_count': 0,
+                    'message': []
+                }
+                in_message = False
+        elif line.startswith("date:") and current_revision:
+            # Extrair data, autor, estado e linhas alteradas em uma única passada
+            date_line = DATE_LINE_PATTERN.match(line)
+            if date_line:
+                current_revision['date'] = date_line.group('date').strip()
+                current_revision['author'] = date_line.group('author').strip()
+                if date_line.group('state'):
+                    current_revision['state'] = date_line.group('state').strip()
+                if date_line.group('added'):
+                    current_revision['lines_added'] = int(date_line.group('added'))
+                    current_revision['lines_removed'] = int(date_line.group('removed'))
+            else:
+                date_match = re.search(r'date:\s*([^;]+);', line)
+                author_match = re.search(r'author:\s*([^;]+);', line)
+                
+                if date_match:
+                    current_revision['date'] = date_match.group(1).strip()
+                if author_match:
+                    current_revision['author'] = author_match.group(1).strip()
+        elif line.startswith("branches:") and current_revision and not in_message:
+            # Branches criados a partir desta revisão (ex: "branches:  1.2.2;  1.2.4;")
+            current_revision['branch_count'] = len(re.findall(r'[\d.]+;', line))
+        elif current_revision and (line.startswith("#") or in_message or (line and not line.startswith("branches:") and not line.startswith("===="))):
+            # Filtrar mensagem do commit
+            if not in_message and line and not line.startswith("----------------------------"):
+                in_message = True
+            
+            if in_message and line and not line.startswith("----------------------------"):
+                current_revision['message'].append(line)
+    
+    # Adicionar a última revisão
+    if current_revision:
+        current_revision['message'] = clean_message(current_revision['message'])
+        revisions.append(current_revision)
+    
+    if rcs_file and working_file and revisions:
+        build_revision_tree(revisions)
+        # Apenas os campos brutos; os derivados são calculados em lote por build_dataset
+        return {'rcs_file': rcs_file}, revisions
+    
+    return None
+
+def revision_number(revision):
+    """Converte o número da revisão em tupla de inteiros (ex: '1.2.2.1' -> (1, 2, 2, 1))"""
+    return tuple(int(part) for part in revision.split('.') if part)
+
+def build_revision_tree(revisions):
+    """Preenche pai (posição na seção), ordem numérica, número do branch e profundidade de cada revisão do arquivo"""
+    numbers = [revision_number(rev['revision']) for rev in revisions]
+    positions = {number: i for i, number in enumerate(numbers)}
+    trunk = sorted(number for number in numbers if len(number) == 2)
+    # As tuplas só existem durante a montagem: no dataset fica a posição da revisão na ordem numérica do arquivo
+    order = {number: rank for rank, number in enumerate(sorted(numbers))}
+    
+    def previous(number):
+        # Revisão imediatamente anterior na história (sem verificar se está no log)
+        if len(number) < 2:
+            return None
+        if number[-1] > 1:
+            return number[:-1] + (number[-1] - 1,)
+        if len(number) > 2:
+            # Primeira revisão do branch: o pai é o ponto de ramificação
+            return number[:-2]
+        # Primeira revisão de um novo número principal no trunk (ex: 2.1 -> último 1.x)
+        index = bisect.bisect_left(trunk, number)
+        return trunk[index - 1] if index > 0 else None
+    
+    for rev, number in zip(revisions, numbers):
+        # O log pode omitir revisões: subir até o ancestral mais próximo presente
+        parent = previous(number)
+        while parent is not None and parent not in positions:
+            parent = previous(parent)
+        
+        rev['revision_order'] = order[number]
+        rev['parent'] = positions[parent] if parent is not None else -1
+        rev['branch'] = number[-2] if len(number) > 2 else 0
+        rev['depth'] = max(len(number) - 2, 0) // 2
+    
+    return revisions
+
+FILE_COLUMNS = ['path', 'name', 'centro', 'estado', 'is_attic', 'is_temp', 'is_ana_dig']
+REVISION_COLUMNS = ['file_id', 'revision', 'author', 'date', 'time', 'timestamp', 'message', 'is_pdr',
+                    'pdr_classification', 'pdr_time', 'pdr_description', 'state', 'lines_added', 'lines_removed',
+                    'revision_order', 'parent', 'branch', 'depth', 'branch_count']
+
+# Padrões usados na extração vetorizada dos campos derivados
+CENTRO_ESTADO_PATTERN = r'/telas/Centro/(?P<centro>[^/]+)(?:/(?P<estado>[^/]+)/)?'
+PDR_PATTERN = r'^#(?P<classification>[^#]+)#(?P<time>[^#]*)#(?P<description>.+)$'
+
+def derive_file_columns(raw_paths):
+    """Calcula os campos derivados do caminho RCS com operações de coluna"""
+    raw_paths = pd.Series(raw_paths, dtype=object)
+    
+    # Caminho sem o prefixo /export/cvs e sem o ,v; o nome é a última parte do caminho
+    paths = raw_paths.str.replace(r'^/export/cvs', '', regex=True).str.replace(r',v$', '', regex=True)
+    names = raw_paths.str.replace(r',v$', '', regex=True).str.rsplit('/', n=1).str[-1]
+    
+    # O estado só existe se houver diretórios após ele (arquivos direto na pasta do centro são GERAL)
+    centro_estado = raw_paths.str.extract(CENTRO_ESTADO_PATTERN)
+    
+    return pd.DataFrame({
+        'path': paths,
+        'name': names,
+        'centro': centro_estado['centro'].astype(object).where(centro_estado['centro'].notna(), None),
+        'estado': centro_estado['estado'].fillna('GERAL').astype(object),
+        'is_attic': paths.str.contains('/Attic/', regex=False),
+        'is_temp': names.str.startswith('.#') | names.str.startswith('.nfs'),
+        'is_ana_dig': names.str.startswith('Ana') | names.str.startswith('Dig')
+    }, columns=FILE_COLUMNS)
+
+def derive_revision_columns(raw_revisions):
+    """Calcula data, hora e campos PDR das revisões com operações de coluna"""
+    revisions_df = pd.DataFrame(raw_revisions, columns=['file_id', 'revision', 'date', 'author', 'message',
+                                                        'state', 'lines_added', 'lines_removed',
+                                                        'revision_order', 'parent', 'branch', 'depth', 'branch_count'])
+    
+    # Formato fixo do cvs log, com fallback para datas sem hora (hora 00:00:00)
+    raw_dates = revisions_df['date']
+    date_dt = pd.to_datetime(raw_dates, format='%Y/%m/%d %H:%M:%S', errors='coerce')
+    missing = date_dt.isna() & raw_dates.notna()
+    if missing.any():
+        date_dt[missing] = pd.to_datetime(raw_dates[missing], format='%Y/%m/%d', errors='coerce')
+    valid_dates = date_dt.notna()
+    
+    messages = revisions_df['message']
+    pdr = messages.str.extract(PDR_PATTERN)
+    # Mesmo resultado de float(): tempo vazio ou não numérico vira None
+    pdr_time = pd.to_numeric(pdr['time'].str.strip(), errors='coerce')
+    
+    result = pd.DataFrame({
+        'file_id': revisions_df['file_id'].astype('int32'),
+        'revision': revisions_df['revision'],
+        'author': revisions_df['author'],
+        'date': date_dt.dt.strftime('%d/%m/%Y').where(valid_dates, None).astype(object),
+        'time': date_dt.dt.strftime('%H:%M:%S').where(valid_dates, None).astype(object),
+        # Timestamp nativo, usado nas agregações por período
+        'timestamp': date_dt,
+        'message': messages,
+        'is_pdr': messages.str.startswith('#').fillna(False).astype(bool),
+        'pdr_classification': pdr['classification'].astype(object).where(pdr['classification'].notna(), None),
+        'pdr_time': pdr_time.astype(float),
+        'pdr_description': pdr['description'].astype(object).where(pdr['description'].notna(), None),
+        # Estado (Exp/dead) como categoria e linhas alteradas como inteiros (0 quando o cvs não informa)
+        'state': revisions_df['state'].astype('category'),
+        'lines_added': revisions_df['lines_added'].fillna(0).astype('int32'),
+        'lines_removed': revisions_df['lines_removed'].fillna(0).astype('int32'),
+        # Árvore de revisões: ordem numérica da revisão no arquivo (1.9 antes de 1.10) e pai como linha global
+        'revision_order': revisions_df['revision_order'].astype('int32'),
+        'parent': revisions_df['parent'].astype('int32'),
+        'branch': revisions_df['branch'].astype('int16'),
+        'depth': revisions_df['depth'].astype('int8'),
+        'branch_count': revisions_df['branch_count'].astype('int8')
+    }, columns=REVISION_COLUMNS)
+    return result
+
+# Auditoria do formato #CLASSIFICAÇÃO#TEMPO#COMENTÁRIO (regras do popover "Classificação de Commits")
+PDR_CLASSIFICATIONS = ['ANOMALIA', 'MANUT', 'RECOMP', 'NOVA', 'MELHORIA']
+PDR_AUDIT_RULES = {
+    'sem_cerquilha': "Mensagem sem # (fora do formato)",
+    'campos_faltando': "Campos faltando",
+    'classificacao_desconhecida': "Classificação desconhecida",
+    'tempo_vazio': "Tempo vazio",
+    'tempo_nao_numerico': "Tempo não numérico"
+}
+# Como PDR_PATTERN, mas aceitando campos ausentes para identificar qual deles falta (o separador do tempo é
+# capturado porque o RE2 devolve '' e não nulo para um grupo opcional ausente)
+PDR_FIELDS_PATTERN = r'^#(?P<classification>[^#]*)(?:(?P<time_separator>#)(?P<time>[^#]*)(?:#(?P<description>.*))?)?$'
+
+def audit_pdr_messages(messages):
+    """Retorna, para cada mensagem, uma coluna booleana por regra de PDR_AUDIT_RULES violada"""
+    messages = pd.Series(messages)
+    # Um mesmo commit aparece em vários arquivos: cada mensagem distinta é verificada uma única vez
+    codes, unique = pd.factorize(messages.fillna(''))
+    # Texto em Arrow: extract e strip rodam no pyarrow (RE2) em vez de um laço Python por mensagem.
+    # No RE2 o $ não aceita um \n final, como o do re; as mensagens nunca terminam em \n, mas é retirado
+    text = pd.Series(unique, dtype=pd.ArrowDtype(pa.string())).str.removesuffix('\n')
+    has_hash = text.str.startswith('#').to_numpy(dtype=bool)
+    
+    # Só as mensagens com # são divididas nos campos
+    fields = text[has_hash].str.extract(PDR_FIELDS_PATTERN)
+    classification = fields['classification'].str.strip().fillna('')
+    time = fields['time'].str.strip().fillna('')
+    has_time = fields['time_separator'].eq('#').fillna(False).to_numpy(dtype=bool)
+    no_classification = classification.eq('').to_numpy(dtype=bool)
+    no_time = time.eq('').to_numpy(dtype=bool)
+    no_description = fields['description'].str.strip().fillna('').eq('').to_numpy(dtype=bool)
+    
+    # Poucos valores distintos de tempo: a conversão numérica é feita uma vez por valor
+    time_codes, time_values = pd.factorize(time)
+    numeric_time = pd.to_numeric(pd.Series(time_values, dtype=object), errors='coerce').notna().to_numpy()
+    
+    rules = np.zeros((len(unique), len(PDR_AUDIT_RULES)), dtype=bool)
+    rules[:, list(PDR_AUDIT_RULES).index('sem_cerquilha')] = ~has_hash
+    for rule, violated in [
+        ('campos_faltando', no_classification | ~has_time | no_description),
+        ('classificacao_desconhecida', ~no_classification & ~classification.isin(PDR_CLASSIFICATIONS).to_numpy(dtype=bool)),
+        ('tempo_vazio', has_time & no_time),
+        ('tempo_nao_numerico', ~no_time & ~numeric_time[time_codes])
+    ]:
+        rules[has_hash, list(PDR_AUDIT_RULES).index(rule)] = violated
+    return pd.DataFrame(rules[codes], columns=list(PDR_AUDIT_RULES), index=messages.index)
+
+def suggest_classification(value):
+    """Classificação válida mais próxima de um valor desconhecido (ex: 'Manutençao' -> 'MANUT'), ou None"""
+    normalized = (value or '').strip().upper()
+    for classification in PDR_CLASSIFICATIONS:
+        if normalized.startswith(classification):
+            return classification
+    matches = difflib.get_close_matches(normalized, PDR_CLASSIFICATIONS, n=1, cutoff=0.6)
+    return matches[0] if matches else None
+
+def build_dataset(files, revisions):
+    """Monta as tabelas de arquivos e revisões (ligadas pelo file_id inteiro)"""
+    files_df = derive_file_columns([file_info['rcs_file'] for file_info in files])
+    revisions_df = derive_revision_columns(revisions)
+    return {'files': files_df, 'revisions': revisions_df}
+
+def file_flag_for_rows(files_df, column, rows_df):
+    """Expande uma flag calculada por arquivo para as linhas de revisão"""
+    return files_df[column].to_numpy()[rows_df['file_id'].to_numpy()]
+
+def join_revisions(files_df, revisions_df):
+    """Monta o DataFrame de exibição juntando os campos do arquivo a cada revisão"""
+    file_ids = revisions_df['file_id'].to_numpy()
+    joined = pd.DataFrame({
+        'file_id': revisions_df['file_id'],
+        # Os valores do arquivo são apenas referenciados (sem cópia das strings)
+        'rcs_file': files_df['path'].to_numpy()[file_ids],
+        'working_file': files_df['name'].to_numpy()[file_ids]
+    }, index=revisions_df.index)
+    
+    for column in REVISION_COLUMNS[1:]:
+        joined[column] = revisions_df[column]
+    
+    joined['centro'] = files_df['centro'].to_numpy()[file_ids]
+    joined['estado'] = files_df['estado'].to_numpy()[file_ids]
+    
+    # Datasets de várias fontes: a origem continua categórica nas linhas de revisão
+    if 'source' in files_df:
+        source = files_df['source'].cat
+        joined['source'] = pd.Categorical.from_codes(source.codes.to_numpy()[file_ids], source.categories)
+    
+    return joined
+
+def clean_message(message_lines):
+    # Remover linhas vazias no início e no fim
+    while message_lines and not message_lines[0].strip():
+        message_lines.pop(0)
+    while message_lines and not message_lines[-1].strip():
+        message_lines.pop()
+    
+    # Juntar as linhas
+    message = ' '.join(message_lines).strip()
+    
+    # Remover "*** empty log message ***" se presente
+    if message == "*** empty log message ***":
+        message = ""
+        
+    return message
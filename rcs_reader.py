@@ -0,0 +1,242 @@
+import os
+import re
+import mmap
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+# Leitura direta dos arquivos ,v de um espelho local do repositório (sem executar o cvs log).
+# Apenas a seção administrativa, os nós de delta e o texto de log são interpretados; do conteúdo das
+# revisões (text @...@) são lidos apenas os comandos a/d, para contar as linhas alteradas sem decodificá-lo.
+# Módulo sem dependências da interface para poder ser importado pelos processos do pool.
+
+# Um token RCS: início de string (@), separador (; ou :) ou palavra
+RCS_TOKEN_PATTERN = re.compile(rb'\s*(?:(@)|([;:])|([^\s;:@]+))')
+REVISION_NUMBER_PATTERN = re.compile(rb'\d+(?:\.\d+)+$')
+
+class RcsFormatError(ValueError):
+    """Arquivo ,v com estrutura inválida"""
+
+def _string_end(buf, start):
+    """Retorna a posição após a string @...@ iniciada em start (@@ representa um @)"""
+    pos = start + 1
+    while True:
+        end = buf.find(b'@', pos)
+        if end < 0:
+            raise RcsFormatError("string RCS sem terminação")
+        if buf[end + 1:end + 2] == b'@':
+            pos = end + 2
+            continue
+        return end + 1
+
+class _Tokens:
+    """Percorre os tokens de um arquivo ,v; strings são devolvidas como intervalos (início, fim)"""
+    def __init__(self, buf):
+        self.buf = buf
+        self.pos = 0
+    
+    def next(self):
+        match = RCS_TOKEN_PATTERN.match(self.buf, self.pos)
+        if match is None or match.end() == match.start() or match.lastindex is None:
+            return None, None
+        if match.group(1):
+            start = match.start(1)
+            end = _string_end(self.buf, start)
+            self.pos = end
+            return 'string', (start + 1, end - 1)
+        self.pos = match.end()
+        if match.group(2):
+            return 'sep', match.group(2)
+        return 'word', match.group(3)
+    
+    def phrase(self):
+        """Lê os valores até o ';' que encerra a frase"""
+        values = []
+        while True:
+            kind, value = self.next()
+            if kind is None:
+                raise RcsFormatError("frase RCS sem ';'")
+            if kind == 'sep' and value == b';':
+                return values
+            if kind == 'word':
+                values.append(value)
+    
+    def string(self):
+        kind, value = self.next()
+        if kind != 'string':
+            raise RcsFormatError("string RCS esperada")
+        return value
+
+def _delta_line_counts(buf, start, end):
+    """Conta as linhas inseridas (comandos aNN n) e removidas (dNN n) de um texto de delta"""
+    added = removed = 0
+    pos = start
+    while pos < end:
+        line_end = buf.find(b'\n', pos, end)
+        if line_end < 0:
+            line_end = end
+        command = buf[pos:line_end].split()
+        pos = line_end + 1
+        if len(command) != 2 or command[0][:1] not in (b'a', b'd'):
+            raise RcsFormatError("comando de delta inválido")
+        count = int(command[1])
+        if command[0][:1] == b'd':
+            removed += count
+            continue
+        added += count
+        # As linhas inseridas vêm logo após o comando (@@ não altera a contagem de quebras de linha)
+        for _ in range(count):
+            line_end = buf.find(b'\n', pos, end)
+            pos = end if line_end < 0 else line_end + 1
+    return added, removed
+
+def _assign_line_counts(deltas, head, counts):
+    """Atribui as linhas alteradas às revisões como o cvs log
+    
+    No trunk, o texto de cada revisão (exceto a head) é o delta reverso a partir da revisão seguinte: as linhas
+    pertencem à revisão cujo "next" aponta para ela, com inserções e remoções trocadas. Nas branches o delta
+    é direto e pertence à própria revisão.
+    """
+    newer = {delta['next']: number for number, delta in deltas.items() if delta['next']}
+    for number, (added, removed) in counts.items():
+        if number == head:
+            continue
+        if number.count(b'.') == 1:
+            target = newer.get(number)
+            if target is not None:
+                deltas[target]['lines_added'], deltas[target]['lines_removed'] = removed, added
+        else:
+            deltas[number]['lines_added'], deltas[number]['lines_removed'] = added, removed
+
+def _decode(raw):
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return raw.decode('latin-1')
+
+def _format_date(raw):
+    """Converte a data RCS (aaaa.mm.dd.hh.mm.ss, ano com 2 dígitos antes de 2000) para o formato do cvs log"""
+    parts = [int(part) for part in raw.decode('ascii').split('.')]
+    if parts[0] < 100:
+        parts[0] += 1900
+    year, month, day, hour, minute, second = parts
+    return f"{year:04d}/{month:02d}/{day:02d} {hour:02d}:{minute:02d}:{second:02d}"
+
+def _clean_log(text):
+    """Aplica à mensagem as mesmas regras do processamento do cvs log"""
+    lines = [line.strip() for line in text.split('\n')]
+    message = ' '.join(line for line in lines if line and not line.startswith("----------------------------")).strip()
+    if message == "*** empty log message ***":
+        message = ""
+    return message
+
+def read_rcs_file(path):
+    """Lê os metadados de um arquivo ,v e retorna as revisões no formato de parse_file_section"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            tokens = _Tokens(buf)
+            deltas = {}
+            head = None
+            current = None
+            
+            # Seção administrativa e nós de delta, até a palavra-chave "desc"
+            while True:
+                kind, word = tokens.next()
+                if kind != 'word':
+                    raise RcsFormatError("palavra-chave RCS esperada")
+                if word == b'desc':
+                    break
+                if REVISION_NUMBER_PATTERN.match(word):
+                    current = {
+                        'revision': word.decode('ascii'),
+                        'date': None,
+                        'author': None,
+                        'state': None,
+                        'lines_added': None,
+                        'lines_removed': None,
+                        'branch_count': 0,
+                        'message': "",
+                        'next': None
+                    }
+                    deltas[word] = current
+                    continue
+                values = tokens.phrase()
+                if current is None:
+                    if word == b'head' and values:
+                        head = values[0]
+                    continue
+                if word == b'date' and values:
+                    current['date'] = _format_date(values[0])
+                elif word == b'author' and values:
+                    current['author'] = _decode(values[0])
+                elif word == b'state' and values:
+                    current['state'] = _decode(values[0])
+                elif word == b'branches':
+                    current['branch_count'] = len(values)
+                elif word == b'next' and values:
+                    current['next'] = values[0]
+            tokens.string()
+            
+            # Textos de delta: apenas o log é decodificado; do texto da revisão são contadas as linhas alteradas
+            counts = {}
+            number = current = None
+            while True:
+                kind, word = tokens.next()
+                if kind is None:
+                    break
+                if kind != 'word':
+                    raise RcsFormatError("texto de delta inválido")
+                if REVISION_NUMBER_PATTERN.match(word):
+                    number = word
+                    current = deltas.get(word)
+                elif word == b'log':
+                    start, end = tokens.string()
+                    if current is not None:
+                        current['message'] = _clean_log(_decode(buf[start:end].replace(b'@@', b'@')))
+                elif word == b'text':
+                    start, end = tokens.string()
+                    # O texto da head é o conteúdo completo, não um delta
+                    if current is not None and number != head:
+                        counts[number] = _delta_line_counts(buf, start, end)
+                else:
+                    tokens.phrase()
+            _assign_line_counts(deltas, head, counts)
+    
+    for delta in deltas.values():
+        del delta['next']
+    return list(deltas.values())
+
+def _read_entry(entry):
+    path, rcs_file = entry
+    try:
+        return {'rcs_file': rcs_file}, read_rcs_file(path)
+    except RcsFormatError as e:
+        raise RcsFormatError(f"{path}: {e}") from None
+
+def list_rcs_files(root, cvs_root):
+    """Lista os arquivos ,v do espelho com o caminho que o cvs log exibiria em "RCS file:" """
+    entries = []
+    for directory, subdirs, filenames in os.walk(root):
+        subdirs.sort()
+        relative = os.path.relpath(directory, root).replace(os.sep, '/')
+        for filename in sorted(filenames):
+            if filename.endswith(',v'):
+                parts = [cvs_root.rstrip('/')] + ([relative] if relative != '.' else []) + [filename]
+                entries.append((os.path.join(directory, filename), '/'.join(parts)))
+    return entries
+
+def tree_digest(entries):
+    """Digest do espelho calculado a partir de nome, tamanho e data de modificação dos arquivos ,v"""
+    digest = hashlib.blake2b(digest_size=16)
+    for path, rcs_file in entries:
+        stat = os.stat(path)
+        digest.update(f"{rcs_file}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode('utf-8', errors='surrogatepass'))
+    return digest.hexdigest()
+
+def read_rcs_tree(entries, workers=None):
+    """Lê os arquivos ,v em paralelo e retorna (dados do arquivo, revisões) na ordem do espelho"""
+    if workers == 1 or len(entries) < 2:
+        return [_read_entry(entry) for entry in entries]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_read_entry, entries, chunksize=64))
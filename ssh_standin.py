@@ -0,0 +1,362 @@
+import re
+import io
+import time
+import queue
+import random
+import socket
+import hashlib
+import argparse
+import threading
+import paramiko
+
+# Servidor SSH local que imita o CEUS para testar e medir o caminho de busca do log sem acessar a produção.
+# Responde aos comandos usados pelo aplicativo (cvs log > arquivo, sha256sum e cat) e ao subsistema SFTP,
+# com um cvs log gerado do tamanho pedido. Banda, latência e quedas de conexão são simuladas entre o
+# cliente e o servidor, então a leitura em paralelo (readv) e a retomada se comportam como na rede real.
+#
+# Uso: python ssh_standin.py --size-mb 20 --bandwidth-mbps 40 --latency-ms 30 [--drop-after-mb 5] [--serve]
+
+CVS_LOG_COMMAND_PATTERN = re.compile(r'cvs log\b.*>\s*"?\$HOME/([^"\s]+)"?')
+HOME_PATH_PATTERN = re.compile(r'^(sha256sum|cat)\s+"?\$HOME/([^"\s]+)"?\s*$')
+
+def generate_cvs_log(size_bytes, seed=0):
+    """Gera uma saída de cvs log (em latin-1) com aproximadamente size_bytes"""
+    rng = random.Random(seed)
+    centros = ['COSR-NE', 'COSR-SE', 'COSR-S', 'COSR-NCO', 'CNOS']
+    estados = ['BA', 'PE', 'CE', 'SP', 'RJ', 'PR', 'RS', None]
+    authors = ['ana.silva', 'joao.souza', 'maria.lima', 'pedro.alves', 'carla.dias']
+    classifications = ['MANUT', 'NOVA', 'MELHORIA', 'ANOMALIA', 'RECOMP', 'Manutençao']
+    
+    out = io.StringIO()
+    file_number = 0
+    while out.tell() < size_bytes:
+        file_number += 1
+        centro = rng.choice(centros)
+        estado = rng.choice(estados)
+        directory = f"{centro}/{estado}/" if estado else f"{centro}/"
+        name = f"{rng.choice(['Tela', 'Ana', 'Dig', 'Diagrama'])}{file_number}.dsp"
+        total = rng.randint(1, 12)
+        
+        out.write(f"\nRCS file: /export/cvs/telas/Centro/{directory}{name},v\n"
+                  f"Working file: {directory[len(centro) + 1:]}{name}\n"
+                  f"head: 1.{total}\nbranch:\nlocks: strict\naccess list:\nkeyword substitution: kv\n"
+                  f"total revisions: {total};\tselected revisions: {total}\ndescription:\n")
+        for revision in range(total, 0, -1):
+            date = (f"20{rng.randint(18, 25)}/{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d} "
+                    f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}")
+            lines = f"  lines: +{rng.randint(0, 80)} -{rng.randint(0, 80)};" if revision > 1 else ""
+            if rng.random() < 0.75:
+                message = (f"#{rng.choice(classifications)}#{rng.choice(['5', '10', '30', '60', '', 'x'])}"
+                           f"#Ajuste na SE Camaçari OTRS {rng.randint(1000, 99999)}")
+            else:
+                message = "Alteração de layout\nsegunda linha"
+            out.write(f"----------------------------\nrevision 1.{revision}\n"
+                      f"date: {date};  author: {rng.choice(authors)};  state: Exp;{lines}\n{message}\n")
+        out.write("=" * 77 + "\n")
+    
+    return out.getvalue().encode('latin-1')
+
+class _Link:
+    """Repassa os bytes entre o cliente e o servidor com latência, limite de banda e queda opcional"""
+    def __init__(self, standin, client_sock, server_sock):
+        self.standin = standin
+        self.sockets = (client_sock, server_sock)
+        self.closed = threading.Event()
+    
+    def start(self):
+        client_sock, server_sock = self.sockets
+        # Metade da latência (ida e volta) em cada sentido; banda e queda apenas no sentido servidor -> cliente
+        self._direction(client_sock, server_sock, None, None)
+        self._direction(server_sock, client_sock, self.standin.bandwidth, self.standin.drop_after_bytes)
+    
+    def close(self):
+        if not self.closed.is_set():
+            self.closed.set()
+            for sock in self.sockets:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                sock.close()
+    
+    def _direction(self, src, dst, bandwidth, drop_after):
+        pending = queue.Queue()
+        delay = self.standin.latency / 2
+        
+        def read():
+            # Cada bloco recebido leva a hora em que pode ser entregue, sem esperar os anteriores
+            while not self.closed.is_set():
+                try:
+                    data = src.recv(65536)
+                except OSError:
+                    data = b''
+                pending.put((time.monotonic() + delay, data))
+                if not data:
+                    return
+        
+        def write():
+            next_free = time.monotonic()
+            sent = 0
+            while True:
+                due, data = pending.get()
+                if not data or self.closed.is_set():
+                    self.close()
+                    return
+                if drop_after is not None and sent + len(data) > drop_after:
+                    # Entrega o que cabe no limite e derruba a conexão, como uma queda no meio da transferência
+                    data = data[:drop_after - sent]
+                send_at = max(due, next_free)
+                if bandwidth:
+                    next_free = send_at + len(data) / bandwidth
+                    send_at = next_free
+                wait = send_at - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                try:
+                    dst.sendall(data)
+                except OSError:
+                    self.close()
+                    return
+                sent += len(data)
+                if drop_after is not None and sent >= drop_after:
+                    self.close()
+                    return
+        
+        threading.Thread(target=read, daemon=True).start()
+        threading.Thread(target=write, daemon=True).start()
+
+class _Server(paramiko.ServerInterface):
+    def __init__(self, standin):
+        self.standin = standin
+    
+    def check_auth_password(self, username, password):
+        if username == self.standin.username and password == self.standin.password:
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+    
+    def get_allowed_auths(self, username):
+        return 'password'
+    
+    def check_channel_request(self, kind, chanid):
+        if kind == 'session':
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+    
+    def check_channel_pty_request(self, channel, term, width, height, pixelwidth, pixelheight, modes):
+        return True
+    
+    def check_channel_exec_request(self, channel, command):
+        command = command.decode('utf-8', errors='replace')
+        self.standin.commands.append(command)
+        threading.Thread(target=self.standin.run_command, args=(channel, command), daemon=True).start()
+        return True
+
+class _SftpHandle(paramiko.SFTPHandle):
+    def __init__(self, data):
+        super().__init__()
+        self.data = data
+    
+    def read(self, offset, length):
+        return self.data[offset:offset + length]
+    
+    def stat(self):
+        return _file_attributes(self.data)
+
+def _file_attributes(data):
+    attributes = paramiko.SFTPAttributes()
+    attributes.st_size = len(data)
+    attributes.st_mode = 0o100644
+    attributes.st_mtime = int(time.time())
+    return attributes
+
+class _Sftp(paramiko.SFTPServerInterface):
+    """Arquivos gerados pelos comandos, com caminhos relativos ao $HOME"""
+    def __init__(self, server, *args, **kwargs):
+        super().__init__(server, *args, **kwargs)
+        self.standin = server.standin
+    
+    def _data(self, path):
+        data = self.standin.files.get(path.lstrip('/'))
+        if data is None:
+            raise FileNotFoundError(path)
+        return data
+    
+    def stat(self, path):
+        try:
+            return _file_attributes(self._data(path))
+        except FileNotFoundError:
+            return paramiko.SFTP_NO_SUCH_FILE
+    
+    lstat = stat
+    
+    def open(self, path, flags, attr):
+        try:
+            return _SftpHandle(self._data(path))
+        except FileNotFoundError:
+            return paramiko.SFTP_NO_SUCH_FILE
+    
+    def canonicalize(self, path):
+        return path
+
+class CvsStandin:
+    """Servidor SSH local com o comportamento do CEUS usado pelo aplicativo (cvs log, sha256sum, cat e SFTP)
+    
+    bandwidth em bytes/s (None = sem limite), latency em segundos (ida e volta) e drop_after_bytes derruba
+    cada conexão após esse volume enviado ao cliente. command_seconds é a duração simulada do cvs log.
+    """
+    def __init__(self, size_bytes=10 * 1024 * 1024, bandwidth=None, latency=0.0, drop_after_bytes=None,
+                 command_seconds=0.0, username='teste', password='teste', seed=0):
+        self.size_bytes = size_bytes
+        self.bandwidth = bandwidth
+        self.latency = latency
+        self.drop_after_bytes = drop_after_bytes
+        self.command_seconds = command_seconds
+        self.username = username
+        self.password = password
+        self.seed = seed
+        self.files = {}
+        self.commands = []
+        self.connections = 0
+        self._log = None
+        self._host_key = paramiko.RSAKey.generate(2048)
+        self._listener = None
+        self._links = []
+    
+    @property
+    def host(self):
+        """Endereço no formato aceito pelo aplicativo (host:porta)"""
+        return f"127.0.0.1:{self._listener.getsockname()[1]}"
+    
+    def start(self, port=0):
+        self._listener = socket.create_server(('127.0.0.1', port))
+        threading.Thread(target=self._accept, name="ssh-standin", daemon=True).start()
+        return self
+    
+    def stop(self):
+        if self._listener is not None:
+            self._listener.close()
+        for link in self._links:
+            link.close()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+    
+    def log_content(self):
+        """Conteúdo do cvs log simulado (gerado uma vez)"""
+        if self._log is None:
+            self._log = generate_cvs_log(self.size_bytes, self.seed)
+        return self._log
+    
+    def _accept(self):
+        while True:
+            try:
+                client_sock, _ = self._listener.accept()
+            except OSError:
+                return
+            self.connections += 1
+            server_sock, proxy_sock = socket.socketpair()
+            link = _Link(self, client_sock, proxy_sock)
+            self._links.append(link)
+            link.start()
+            # A negociação de cada conexão ocorre em sua própria thread
+            threading.Thread(target=self._serve, args=(server_sock, link), daemon=True).start()
+    
+    def _serve(self, server_sock, link):
+        transport = paramiko.Transport(server_sock)
+        transport.add_server_key(self._host_key)
+        transport.set_subsystem_handler('sftp', paramiko.SFTPServer, _Sftp)
+        try:
+            transport.start_server(server=_Server(self))
+        except (paramiko.SSHException, EOFError):
+            link.close()
+    
+    def run_command(self, channel, command):
+        """Executa um dos comandos conhecidos no canal e encerra com o código de saída"""
+        status = 0
+        try:
+            cvs_log = CVS_LOG_COMMAND_PATTERN.search(command)
+            home_path = HOME_PATH_PATTERN.match(command)
+            if cvs_log:
+                content = self.log_content()
+                # Mensagens de progresso do cvs, distribuídas ao longo da duração simulada
+                directories = ['COSR-NE', 'COSR-SE', 'COSR-S', 'COSR-NCO', 'CNOS']
+                for directory in directories:
+                    channel.sendall(f"cvs log: Logging {directory}\r\n".encode('latin-1'))
+                    time.sleep(self.command_seconds / len(directories))
+                self.files[cvs_log.group(1)] = content
+            elif home_path:
+                name, path = home_path.groups()
+                data = self.files.get(path)
+                if data is None:
+                    channel.sendall_stderr(f"{name}: {path}: No such file or directory\n".encode('latin-1'))
+                    status = 1
+                elif name == 'sha256sum':
+                    channel.sendall(f"{hashlib.sha256(data).hexdigest()}  {path}\n".encode('latin-1'))
+                else:
+                    channel.sendall(data)
+            else:
+                channel.sendall_stderr(f"comando não suportado: {command}\n".encode('utf-8'))
+                status = 127
+            # Apenas EOF: o canal é fechado pelo cliente, então um comando rápido não chega a fechá-lo
+            # antes da confirmação do pedido de execução
+            channel.send_exit_status(status)
+            channel.shutdown_write()
+        except (OSError, EOFError, paramiko.SSHException):
+            channel.close()
+
+def run_benchmark(standin, repetitions=1):
+    """Mede a busca completa do aplicativo (cvs log, checksum e download via SFTP) contra o servidor local"""
+    from check_log_telas import fetch_log_via_ssh
+    from log_parser import parse_log_content
+    
+    for repetition in range(repetitions):
+        started = time.perf_counter()
+        content = fetch_log_via_ssh(standin.host, standin.username, standin.password)
+        elapsed = time.perf_counter() - started
+        size_mb = len(content) / (1024 * 1024)
+        print(f"Busca {repetition + 1}: {size_mb:.1f} MB em {elapsed:.2f} s ({size_mb / elapsed:.1f} MB/s, "
+              f"{standin.connections} conexões até agora)")
+        if content.encode('latin-1') != standin.log_content():
+            raise SystemExit("Conteúdo recebido difere do gerado")
+    
+    started = time.perf_counter()
+    dataset = parse_log_content(content)
+    print(f"Processamento: {len(dataset['revisions'])} revisões em {time.perf_counter() - started:.2f} s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor SSH/CVS local para testar e medir a busca do log")
+    parser.add_argument('--size-mb', type=float, default=10, help="tamanho do cvs log gerado")
+    parser.add_argument('--bandwidth-mbps', type=float, default=None, help="banda em Mbit/s (padrão: sem limite)")
+    parser.add_argument('--latency-ms', type=float, default=0, help="latência de ida e volta")
+    parser.add_argument('--drop-after-mb', type=float, default=None, help="derruba cada conexão após esse volume")
+    parser.add_argument('--command-seconds', type=float, default=0, help="duração simulada do cvs log")
+    parser.add_argument('--repetitions', type=int, default=1, help="buscas medidas no modo benchmark")
+    parser.add_argument('--port', type=int, default=0, help="porta local (padrão: livre)")
+    parser.add_argument('--serve', action='store_true', help="apenas manter o servidor no ar (Ctrl+C encerra)")
+    args = parser.parse_args()
+    
+    standin = CvsStandin(
+        size_bytes=int(args.size_mb * 1024 * 1024),
+        bandwidth=args.bandwidth_mbps * 1e6 / 8 if args.bandwidth_mbps else None,
+        latency=args.latency_ms / 1000,
+        drop_after_bytes=int(args.drop_after_mb * 1024 * 1024) if args.drop_after_mb else None,
+        command_seconds=args.command_seconds
+    ).start(args.port)
+    print(f"Servidor em {standin.host} (usuário {standin.username}, senha {standin.password})")
+    
+    try:
+        if args.serve:
+            while True:
+                time.sleep(3600)
+        else:
+            run_benchmark(standin, args.repetitions)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import os
+import re
+import sys
+
+import pytest
+
+# Os módulos do aplicativo ficam na raiz do repositório
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ssh_standin import CvsStandin, generate_cvs_log
+
+APP_PATH = os.path.join(ROOT, 'check_log_telas.py')
+
+# Log gerado de tamanho fixo (mesmo conteúdo em toda execução), usado pelas medições com linha de base
+GENERATED_LOG_BYTES = 2 * 1024 * 1024
+
+@pytest.fixture(scope='session')
+def generated_log():
+    return generate_cvs_log(GENERATED_LOG_BYTES, seed=0)
+
+@pytest.fixture
+def cvs_standin():
+    """Inicia servidores SSH/CVS locais com as opções de CvsStandin (encerrados ao fim do teste)"""
+    standins = []
+    
+    def start(**options):
+        standin = CvsStandin(**options).start()
+        standins.append(standin)
+        return standin
+    
+    yield start
+    for standin in standins:
+        standin.stop()
+
+# Cargas sucessivas do mesmo repositório, para os testes que comparam snapshots
+SEPARATOR = '=' * 77 + '\n'
+NEW_REVISION = ("description:\n----------------------------\nrevision 1.99\n"
+                "date: 2026/01/05 10:00:00;  author: {author};  state: {state};  lines: +1 -1;\n{message}\n")
+
+def next_log(text):
+    """Próxima carga do mesmo repositório: revisão nova, arquivo movido para o Attic, arquivo sumido e arquivo novo"""
+    sections = text.split(SEPARATOR)
+    sections[0] = sections[0].replace("description:\n", NEW_REVISION.format(
+        author='novo.autor', state='Exp', message='#NOVA#15#Revisão nova'), 1)
+    sections[1] = re.sub(r'(RCS file: \S+/)([^/]+,v)', r'\1Attic/\2', sections[1], count=1)
+    sections[1] = sections[1].replace("description:\n", NEW_REVISION.format(
+        author='ana.silva', state='dead', message='*** empty log message ***'), 1)
+    del sections[2]
+    sections.insert(3, sections[3].replace('/Centro/', '/Centro/NOVO-CENTRO/', 1))
+    return SEPARATOR.join(sections)
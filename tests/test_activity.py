@@ -0,0 +1,61 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from check_log_telas import (ACTIVITY_FREQUENCIES, MessageIndex, apply_filters, build_daily_activity,
+                             filter_daily_activity, resample_activity)
+from log_parser import parse_log_content
+from ssh_standin import generate_cvs_log
+
+def daily(days):
+    return pd.DataFrame({'day': pd.to_datetime(days), 'revisions': 1, 'author': 'ana.silva'})
+
+def test_weeks_run_from_monday_to_sunday():
+    # Segunda, domingo e a segunda seguinte
+    weeks = resample_activity(daily(['2026-10-12', '2026-10-18', '2026-10-19']), 'revisions', ACTIVITY_FREQUENCIES['Semana'])
+    assert weeks['revisions'].to_dict() == {pd.Timestamp('2026-10-12'): 2, pd.Timestamp('2026-10-19'): 1}
+
+def test_periods_are_labeled_by_their_start():
+    frame = daily(['2026-10-31', '2026-11-01'])
+    assert list(resample_activity(frame, 'revisions', ACTIVITY_FREQUENCIES['Mês']).index) == [
+        pd.Timestamp('2026-10-01'), pd.Timestamp('2026-11-01')]
+    weeks = resample_activity(frame, 'revisions', ACTIVITY_FREQUENCIES['Semana'], 'author')
+    assert weeks['ana.silva'].to_dict() == {pd.Timestamp('2026-10-26'): 2}
+
+FILTERS = {
+    'pdr_only': False, 'ignore_ana_dig': True, 'ignore_temp_files': True, 'ignore_excluded': True,
+    'ignore_dead': False, 'branch_mode': 'all', 'centros': [], 'estados': [], 'filenames': [], 'authors': [],
+    'path': '', 'search': '', 'start_date': None, 'end_date': None
+}
+
+@pytest.fixture(scope='module')
+def dataset():
+    return parse_log_content(generate_cvs_log(200_000, seed=5).decode('latin-1'))
+
+@pytest.mark.parametrize('overrides', [
+    {},
+    {'path': '/SP/'},
+    {'centros': ['COSR-NE'], 'pdr_only': True},
+    {'search': 'camacari'},
+    {'search': 'otrs*', 'authors': ['ana.silva'], 'start_date': date(2021, 1, 1), 'end_date': date(2023, 12, 31)}
+])
+def test_activity_matches_the_filtered_table(dataset, overrides):
+    revisions_df, files_df = dataset['revisions'], dataset['files']
+    filters = dict(FILTERS, **overrides)
+    message_index = MessageIndex(revisions_df['message'])
+    expected = apply_filters(revisions_df, files_df, filters, message_index)
+    
+    rows = revisions_df
+    if filters['search']:
+        rows = revisions_df.loc[message_index.search_mask(filters['search'])]
+    daily = filter_daily_activity(build_daily_activity(rows, files_df), files_df, filters)
+    assert daily['revisions'].sum() == len(expected) > 0
+
+def test_filename_filter_is_applied(dataset):
+    files_df = dataset['files']
+    listed = files_df.loc[~(files_df['is_ana_dig'] | files_df['is_temp'] | files_df['is_attic']), 'name']
+    filters = dict(FILTERS, filenames=[listed.iat[0]])
+    daily = filter_daily_activity(build_daily_activity(dataset['revisions'], files_df), files_df, filters)
+    assert not daily.empty
+    assert set(files_df['name'].to_numpy()[daily['file_id'].to_numpy()]) == set(filters['filenames'])
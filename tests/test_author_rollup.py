@@ -0,0 +1,74 @@
+import pandas as pd
+import pytest
+
+from check_log_telas import AuthorRollup
+from conftest import next_log
+from log_parser import diff_snapshots, merge_source_datasets, parse_log_content
+from ssh_standin import generate_cvs_log
+
+FILTERS = {
+    'pdr_only': False, 'ignore_ana_dig': False, 'ignore_temp_files': False, 'ignore_excluded': False,
+    'ignore_dead': False, 'branch_mode': 'all', 'centros': [], 'estados': [], 'filenames': [], 'authors': [],
+    'path': '', 'search': '', 'start_date': None, 'end_date': None
+}
+
+@pytest.fixture(scope='module')
+def lineage():
+    first_text = generate_cvs_log(200_000, seed=3).decode('latin-1')
+    first = parse_log_content(first_text)
+    second = parse_log_content(next_log(first_text), first)
+    return first, second
+
+def advanced_rollup(first, second):
+    rollup = AuthorRollup.build(first['revisions'])
+    new_rows = diff_snapshots(first, second)['revisions']
+    return rollup.advance(first, second, new_rows)
+
+@pytest.mark.parametrize('overrides', [
+    {},
+    {'pdr_only': True},
+    {'ignore_excluded': True, 'ignore_dead': True},
+    {'centros': ['COSR-NE'], 'start_date': pd.Timestamp('2020-01-01').date(), 'end_date': pd.Timestamp('2023-12-31').date()},
+    {'path': '/SP/', 'authors': ['ana.silva', 'novo.autor']}
+])
+def test_advanced_rollup_matches_full_build(lineage, overrides):
+    first, second = lineage
+    filters = dict(FILTERS, **overrides)
+    mapping = {'Manutençao': 'MANUT'}
+    
+    expected = AuthorRollup.build(second['revisions']).summary(
+        second['files'], filters, mapping)
+    advanced = advanced_rollup(first, second).summary(second['files'], filters, mapping)
+    pd.testing.assert_frame_equal(advanced.sort_index(), expected.sort_index(), check_dtype=False)
+
+def test_attic_move_counts_one_file(lineage):
+    first, second = lineage
+    moved = first['files'].loc[first['files']['path'].isin(
+        second['files'].loc[second['files']['is_attic'], 'path'].str.replace('/Attic/', '/', regex=False)), 'name']
+    filters = dict(FILTERS, filenames=list(moved))
+    
+    before = AuthorRollup.build(first['revisions']).summary(first['files'], filters)
+    after = advanced_rollup(first, second).summary(second['files'], filters)
+    
+    # O arquivo movido continua sendo um só; a revisão "dead" da exclusão é somada à ana.silva
+    assert len(moved) == 1
+    assert (after['Arquivos Tocados'] == 1).all()
+    assert after.loc['ana.silva', 'Revisões'] == before['Revisões'].get('ana.silva', 0) + 1
+    assert after['Revisões'].sum() == before['Revisões'].sum() + 1
+    
+    # Com "Ignorar excluídos", o arquivo movido sai da análise
+    assert advanced_rollup(first, second).summary(second['files'], dict(filters, ignore_excluded=True)).empty
+
+def test_sources_are_kept_apart():
+    text = generate_cvs_log(50_000, seed=4).decode('latin-1')
+    single = parse_log_content(text)
+    merged = merge_source_datasets([('a', single), ('b', single)])
+    summary = AuthorRollup.build(merged['revisions']).summary(merged['files'], FILTERS)
+    single_summary = AuthorRollup.build(single['revisions']).summary(
+        single['files'], FILTERS)
+    # Caminhos idênticos em duas origens são arquivos distintos
+    assert (summary['Revisões'] == single_summary['Revisões'] * 2).all()
+    assert (summary['Arquivos Tocados'] == single_summary['Arquivos Tocados'] * 2).all()
+    
+    only_b = AuthorRollup.build(merged['revisions']).summary(merged['files'], dict(FILTERS, sources=['b']))
+    pd.testing.assert_frame_equal(only_b.sort_index(), single_summary.sort_index(), check_dtype=False)
@@ -0,0 +1,25 @@
+import gzip
+import io
+import zipfile
+
+import pytest
+
+from log_parser import COMPRESSED_EXTENSIONS, open_compressed
+
+def compress(name, data):
+    if name.endswith('.gz'):
+        return gzip.compress(data)
+    if name.endswith('.zst'):
+        import zstandard
+        return zstandard.ZstdCompressor().compress(data)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('leiame.txt', b'log do CEUS')
+        archive.writestr('Check_log.csv', data)
+    return buffer.getvalue()
+
+@pytest.mark.parametrize('extension', COMPRESSED_EXTENSIONS)
+def test_compressed_log_round_trips(generated_log, extension):
+    name = f"Check_log.csv{extension}"
+    with open_compressed(io.BytesIO(compress(name, generated_log)), name) as stream:
+        assert stream.read() == generated_log
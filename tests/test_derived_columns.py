@@ -0,0 +1,96 @@
+import re
+from datetime import datetime
+
+import pytest
+
+from log_parser import derive_file_columns, derive_revision_columns, parse_log_content
+
+# Extração por linha usada antes das operações de coluna, mantida aqui como referência de paridade
+
+def extract_centro_estado(rcs_file):
+    centro = None
+    estado = "GERAL"
+    match = re.search(r'/telas/Centro/([^/]+)(?:/([^/]+)(?:/|$))?', rcs_file)
+    if match:
+        centro = match.group(1)
+        # O estado só vale se houver mais diretórios após ele; senão é o nome do arquivo (GERAL)
+        if match.group(2) and len(rcs_file.split(f"/Centro/{centro}/")[-1].split('/')) > 1:
+            estado = match.group(2)
+    return centro, estado
+
+def parse_date_time(date_str):
+    if not date_str:
+        return None, None
+    for fmt in ['%Y/%m/%d %H:%M:%S', '%Y/%m/%d']:
+        try:
+            dt = datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+        return dt.strftime('%d/%m/%Y'), dt.strftime('%H:%M:%S') if fmt == '%Y/%m/%d %H:%M:%S' else "00:00:00"
+    return None, None
+
+def extract_filename_from_path(path):
+    if path.endswith(',v'):
+        path = path[:-2]
+    return path.split('/')[-1]
+
+def extract_pdr_info(message):
+    if not message or not message.startswith('#'):
+        return None, None, None
+    match = re.match(r'^#([^#]+)#([^#]*)#(.+)$', message)
+    if not match:
+        return None, None, None
+    try:
+        time_minutes = float(match.group(2)) if match.group(2) else None
+    except ValueError:
+        time_minutes = None
+    return match.group(1), time_minutes, match.group(3)
+
+def clean_path(path):
+    if path.startswith("/export/cvs"):
+        path = path[len("/export/cvs"):]
+    if path.endswith(',v'):
+        path = path[:-2]
+    return path
+
+EDGE_PATHS = [
+    '/export/cvs/telas/Centro/COSR-NE/BA/Telas/SE-ABC.tela,v',
+    '/export/cvs/telas/Centro/COSR-NE/SE-ABC.tela,v',
+    '/export/cvs/telas/Centro/COSR-SE/Attic/SE-XYZ.tela,v',
+    '/export/cvs/telas/Centro/CNOS/SP/.#SE-TMP.tela,v',
+    '/export/cvs/telas/Outros/Dig-SE.tela,v',
+    '/outro/repositorio/Ana-SE.tela'
+]
+EDGE_DATES = ['2024/02/29 23:59:59', '2024/03/01', None, '', 'data inválida']
+EDGE_MESSAGES = ['#MANUT#30#Ajuste', '#MANUT##Sem tempo', '#MANUT# 15 #Com espaços', '#MANUT#abc#Tempo inválido',
+                 '#MANUT#30', 'Sem formato', '', None, '#A#1#B#C']
+
+def rows(frame, columns):
+    # Valores ausentes como None (as colunas vetorizadas usam NaN)
+    values = frame[columns].astype(object)
+    return list(values.where(values.notna(), None).itertuples(index=False, name=None))
+
+@pytest.fixture(scope='module')
+def log_text(generated_log):
+    return generated_log.decode('latin-1')
+
+def test_file_columns_match_the_row_functions(log_text):
+    raw_paths = re.findall(r'^RCS file: (\S+)', log_text, re.MULTILINE) + EDGE_PATHS
+    files = derive_file_columns(raw_paths)
+    
+    assert files['path'].tolist() == [clean_path(path) for path in raw_paths]
+    assert files['name'].tolist() == [extract_filename_from_path(path) for path in raw_paths]
+    assert list(zip(files['centro'], files['estado'])) == [extract_centro_estado(path) for path in raw_paths]
+
+def test_revision_columns_match_the_row_functions(log_text):
+    dataset = parse_log_content(log_text)
+    dates = re.findall(r'^date: ([^;]+);', log_text, re.MULTILINE) + EDGE_DATES
+    messages = dataset['revisions']['message'].tolist()
+    messages = (messages * (len(dates) // len(messages) + 1))[:len(dates) - len(EDGE_MESSAGES)] + EDGE_MESSAGES
+    raw = [(0, '1.1', date, 'ana.silva', message, 'Exp', 1, 1, 0, -1, 0, 0, 0)
+           for date, message in zip(dates, messages)]
+    revisions = derive_revision_columns(raw)
+    
+    assert rows(revisions, ['date', 'time']) == [parse_date_time(date) for date in dates]
+    assert rows(revisions, ['pdr_classification', 'pdr_time', 'pdr_description']) == [
+        extract_pdr_info(message) for message in messages]
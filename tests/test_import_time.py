@@ -0,0 +1,47 @@
+import re
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+
+# Tempo de importação (cumulativo, medido com python -X importtime) que cada módulo não pode ultrapassar
+IMPORT_BUDGETS_MS = {
+    'log_parser': 1500,
+    'check_log_telas': 3000
+}
+# Dependências pesadas que só devem ser importadas onde são usadas (gráficos, exportação e SSH)
+LAZY_MODULES = ('paramiko', 'plotly', 'openpyxl')
+
+def import_in_subprocess(statement):
+    """Importa em um interpretador novo e retorna (saída do -X importtime, módulos pesados carregados)"""
+    code = (f"{statement}\n"
+            "import sys\n"
+            f"print('\\n'.join(name for name in sys.modules if name.split('.')[0] in {LAZY_MODULES!r}))")
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    return result.stderr, set(result.stdout.split())
+
+def cumulative_ms(importtime_output, module):
+    match = re.search(rf'^import time:\s+\d+ \|\s+(\d+) \| {re.escape(module)}$', importtime_output, re.MULTILINE)
+    assert match is not None, f"{module} não aparece na saída do -X importtime"
+    return int(match.group(1)) / 1000
+
+@pytest.mark.parametrize('module', list(IMPORT_BUDGETS_MS))
+def test_import_time_within_budget(module):
+    output, _ = import_in_subprocess(f"import {module}")
+    elapsed = cumulative_ms(output, module)
+    assert elapsed <= IMPORT_BUDGETS_MS[module], f"import {module}: {elapsed:.0f} ms (limite {IMPORT_BUDGETS_MS[module]} ms)"
+
+def test_log_parser_has_no_heavy_imports():
+    _, loaded = import_in_subprocess("import log_parser")
+    assert not loaded, f"log_parser carregou {sorted(loaded)}"
+
+def test_app_defers_heavy_imports():
+    # O próprio streamlit carrega o pacote plotly (sem o plotly.express); só o que o aplicativo acrescenta conta
+    _, from_streamlit = import_in_subprocess("import streamlit")
+    _, loaded = import_in_subprocess("import check_log_telas")
+    added = loaded - from_streamlit
+    assert not added, f"check_log_telas carregou {sorted(added)}"
+    assert 'plotly.express' not in loaded
@@ -0,0 +1,47 @@
+import pandas as pd
+
+from check_log_telas import DatasetRegistry, ResultCache, dataset_rows, derived_value, estimate_nbytes, result_cache_key
+from log_parser import parse_log_content
+
+def test_result_counts_mapped_columns_and_derived_values(generated_log):
+    registry = DatasetRegistry(1024 ** 3)
+    handle, _ = registry.acquire(generated_log.decode('latin-1'))
+    entry = registry.get(handle)
+    df = dataset_rows(entry['dataset'], range(len(entry['dataset']['revisions'])))
+    
+    cache = ResultCache(1024 ** 3)
+    result = cache.put(result_cache_key(handle.digest, {}, {'a': 'b'}), df, mapped=True)
+    # As colunas alteradas pelo agrupamento são textos: contadas pelo conteúdo, não pelos ponteiros
+    assert result['nbytes'] >= df[['message', 'pdr_classification']].memory_usage(deep=True, index=False).sum()
+    
+    before = result['nbytes']
+    copy = derived_value(result, 'copia', lambda: df.copy())
+    assert result['nbytes'] - before == estimate_nbytes(copy)
+    
+    # Um valor já memorizado não é contado de novo
+    derived_value(result, 'copia', lambda: df.copy())
+    assert result['nbytes'] - before == estimate_nbytes(copy)
+
+def test_dataset_entry_counts_revisions_and_derived_values(generated_log):
+    content = generated_log.decode('latin-1')
+    dataset = parse_log_content(content)
+    registry = DatasetRegistry(1024 ** 3)
+    handle, _ = registry.acquire_built('digest', lambda: (dataset, content))
+    entry = registry.get(handle)
+    
+    assert entry['nbytes'] >= (len(content) + dataset['revisions'].memory_usage(deep=True).sum()
+                               + dataset['files'].memory_usage(deep=True).sum())
+    # A entrada guarda apenas as tabelas do dataset: nenhuma cópia juntada das revisões
+    assert set(entry) == {'log_content', 'log_archive', 'dataset', 'nbytes', 'derived', 'handles'}
+    
+    before = entry['nbytes']
+    derived_value(entry, 'mensagens', lambda: pd.Series(dataset['revisions']['message'].to_numpy()))
+    assert entry['nbytes'] > before
+
+def test_derived_values_count_towards_eviction():
+    cache = ResultCache(10_000)
+    first = cache.put('a', pd.DataFrame(index=range(10)), mapped=False)
+    derived_value(first, 'grande', lambda: pd.Series(['x' * 100] * 100))
+    cache.put('b', pd.DataFrame(index=range(10)), mapped=False)
+    assert cache.get('a') is None
+    assert cache.get('b') is not None
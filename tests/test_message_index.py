@@ -0,0 +1,32 @@
+import numpy as np
+
+from check_log_telas import MessageIndex
+
+MESSAGES = [
+    '#Manutenção#30#Ajuste OTRS-1234 na tela SE-XYZ',
+    '#Manutenção#10#Ajuste do layout',
+    'Correção otrs 1234',
+    'Inclusão da SE-XYW',
+    None
+]
+
+def search(query):
+    return MessageIndex(MESSAGES).search(query).tolist()
+
+def test_term_with_punctuation_matches_its_tokens():
+    assert search('otrs-1234') == [0, 2]
+    assert search('OTRS-1234') == [0, 2]
+
+def test_punctuated_term_keeps_the_and_constraint():
+    assert search('ajuste SE-XYZ') == [0]
+    assert search('ajuste') == [0, 1]
+
+def test_prefix_applies_to_the_last_token():
+    assert search('se-xy*') == [0, 3]
+    assert search('manutencao#3*') == [0]
+
+def test_or_groups_and_empty_terms():
+    assert search('layout OU se-xyw') == [1, 3]
+    assert search('--- OU layout') == [1]
+    assert search('') == []
+    assert MessageIndex(MESSAGES).search_mask('correcao').dtype == np.bool_
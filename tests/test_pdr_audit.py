@@ -0,0 +1,81 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from check_log_telas import compute_pdr_audit, dataset_rows
+from log_parser import PDR_AUDIT_RULES, audit_pdr_messages, parse_log_content, suggest_classification
+
+# Revisões do log grande de referência (40 MB) e o tempo que a auditoria completa não pode ultrapassar
+# (a versão anterior levava cerca de 1 s nesta carga)
+AUDIT_REVISIONS = 196_000
+AUDIT_BUDGET_SECONDS = 0.75
+
+@pytest.mark.parametrize('message, violated', [
+    ('#MANUT#10#Ajuste no display', set()),
+    ('# NOVA # 2.5 # Tela nova', set()),
+    ('Ajuste sem formato', {'sem_cerquilha'}),
+    ('', {'sem_cerquilha'}),
+    (None, {'sem_cerquilha'}),
+    ('#MANUT', {'campos_faltando'}),
+    ('#MANUT#10', {'campos_faltando'}),
+    ('#MANUT#10#   ', {'campos_faltando'}),
+    ('##10#Sem classificação', {'campos_faltando'}),
+    ('#MANUT##Sem tempo', {'tempo_vazio'}),
+    ('#MANUT#  #Tempo em branco', {'tempo_vazio'}),
+    ('#MANUT#', {'campos_faltando', 'tempo_vazio'}),
+    ('#MANUT#1,5#Vírgula decimal', {'tempo_nao_numerico'}),
+    ('#MANUT#dez#Por extenso', {'tempo_nao_numerico'}),
+    ('#Manutençao#10#Classificação por extenso', {'classificacao_desconhecida'}),
+    ('#MANUTT#10#Erro de digitação', {'classificacao_desconhecida'}),
+    ('#manut#10#Minúsculas', {'classificacao_desconhecida'}),
+    ('#XYZ#abc', {'classificacao_desconhecida', 'tempo_nao_numerico', 'campos_faltando'}),
+    ('#MANUT#10#Primeira linha\nsegunda linha', {'campos_faltando'})
+])
+def test_each_rule(message, violated):
+    rules = audit_pdr_messages(pd.Series([message], dtype=object))
+    assert list(rules.columns) == list(PDR_AUDIT_RULES)
+    assert {rule for rule in PDR_AUDIT_RULES if rules[rule].iat[0]} == violated
+
+def test_rules_follow_the_message_index():
+    messages = pd.Series(['#MANUT#10#x', 'sem formato', '#MANUT#10#x'], index=[7, 3, 5])
+    rules = audit_pdr_messages(messages)
+    assert list(rules.index) == [7, 3, 5]
+    assert rules['sem_cerquilha'].tolist() == [False, True, False]
+
+@pytest.mark.parametrize('value, expected', [
+    ('Manutençao', 'MANUT'),
+    ('manut', 'MANUT'),
+    (' nova ', 'NOVA'),
+    ('MELHORIAS', 'MELHORIA'),
+    ('Recompilação', 'RECOMP'),
+    ('ANOMALAI', 'ANOMALIA'),
+    ('NOV', 'NOVA'),
+    ('xyz', None),
+    ('', None),
+    (None, None)
+])
+def test_suggest_classification(value, expected):
+    assert suggest_classification(value) == expected
+
+@pytest.fixture(scope='module')
+def large_revisions(generated_log):
+    """Revisões do log gerado repetidas até o tamanho de referência, com mensagens distintas a cada cópia"""
+    dataset = parse_log_content(generated_log.decode('latin-1'))
+    copies = -(-AUDIT_REVISIONS // len(dataset['revisions']))
+    rows = np.tile(np.arange(len(dataset['revisions'])), copies)[:AUDIT_REVISIONS]
+    filtered_df = dataset_rows(dataset, rows).reset_index(drop=True)
+    copy = pd.Series(np.arange(len(rows)) // len(dataset['revisions']))
+    filtered_df['message'] = filtered_df['message'].astype(object) + (' ' + copy.astype(str)).where(copy > 0, '')
+    return filtered_df
+
+def test_audit_within_budget(large_revisions):
+    def audit():
+        started = time.perf_counter()
+        result = compute_pdr_audit(large_revisions, audit_pdr_messages(large_revisions['message']))
+        return time.perf_counter() - started, result
+    
+    elapsed, result = min((audit() for _ in range(5)), key=lambda run: run[0])
+    assert result['violations'] > 0
+    assert elapsed <= AUDIT_BUDGET_SECONDS, f"auditoria de {len(large_revisions)} revisões: {elapsed:.2f} s (limite {AUDIT_BUDGET_SECONDS} s)"
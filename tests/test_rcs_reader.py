@@ -0,0 +1,215 @@
+import pandas as pd
+import pytest
+
+import rcs_reader
+from log_parser import join_revisions, load_rcs_mirror, parse_log_content
+
+CVS_ROOT = '/export/cvs/telas/Centro'
+
+# Espelho com trunk, branch, @@ no log e no texto, revisão "dead" e salto do trunk 2.1 -> 1.1
+RCS_FILES = {
+    'COSR-NE/BA/Tela1.dsp,v': """head\t1.3;
+access;
+symbols
+\tBR:1.2.0.2;
+locks; strict;
+comment\t@# @;
+
+
+1.3
+date\t2024.03.01.10.00.00;\tauthor ana.silva;\tstate dead;
+branches;
+next\t1.2;
+
+1.2
+date\t2024.02.01.10.00.00;\tauthor joao.souza;\tstate Exp;
+branches
+\t1.2.2.1;
+next\t1.1;
+
+1.1
+date\t99.01.01.10.00.00;\tauthor maria.lima;\tstate Exp;
+branches;
+next\t;
+
+1.2.2.1
+date\t2024.02.15.10.00.00;\tauthor pedro.alves;\tstate Exp;
+branches;
+next\t;
+
+
+desc
+@@
+
+
+1.3
+log
+@#REMOVIDO#5#arquivo removido
+@
+text
+@a
+b com @@
+c
+@
+
+
+1.2
+log
+@#MANUT#10#Ajuste com @@ no e-mail
+@
+text
+@@
+
+
+1.2.2.1
+log
+@Na branch
+segunda linha
+@
+text
+@d2 1
+a1 3
+x
+y @@ z
+w
+@
+
+
+1.1
+log
+@Inicial
+@
+text
+@d3 1
+@
+""",
+    'COSR-SE/Tela2.dsp,v': """head\t2.1;
+access;
+symbols;
+locks; strict;
+
+
+2.1
+date\t2025.01.10.08.30.00;\tauthor carla.dias;\tstate Exp;
+branches;
+next\t1.1;
+
+1.1
+date\t2024.12.01.08.30.00;\tauthor carla.dias;\tstate Exp;
+branches;
+next\t;
+
+
+desc
+@Descrição do arquivo
+@
+
+
+2.1
+log
+@#NOVA#30#Nova versão
+@
+text
+@b
+c
+@
+
+
+1.1
+log
+@*** empty log message ***
+@
+text
+@d1 2
+a2 1
+a
+@
+""",
+}
+
+CVS_LOG = """
+RCS file: /export/cvs/telas/Centro/COSR-NE/BA/Tela1.dsp,v
+Working file: BA/Tela1.dsp
+head: 1.3
+branch:
+locks: strict
+access list:
+symbolic names:
+\tBR: 1.2.0.2
+keyword substitution: kv
+total revisions: 4;\tselected revisions: 4
+description:
+----------------------------
+revision 1.3
+date: 2024/03/01 10:00:00;  author: ana.silva;  state: dead;  lines: +0 -0;
+#REMOVIDO#5#arquivo removido
+----------------------------
+revision 1.2
+date: 2024/02/01 10:00:00;  author: joao.souza;  state: Exp;  lines: +1 -0;
+branches:  1.2.2;
+#MANUT#10#Ajuste com @ no e-mail
+----------------------------
+revision 1.1
+date: 1999/01/01 10:00:00;  author: maria.lima;  state: Exp;
+Inicial
+----------------------------
+revision 1.2.2.1
+date: 2024/02/15 10:00:00;  author: pedro.alves;  state: Exp;  lines: +3 -1;
+Na branch
+segunda linha
+=============================================================================
+
+RCS file: /export/cvs/telas/Centro/COSR-SE/Tela2.dsp,v
+Working file: Tela2.dsp
+head: 2.1
+branch:
+locks: strict
+access list:
+symbolic names:
+keyword substitution: kv
+total revisions: 2;\tselected revisions: 2
+description:
+Descrição do arquivo
+----------------------------
+revision 2.1
+date: 2025/01/10 08:30:00;  author: carla.dias;  state: Exp;  lines: +2 -1;
+#NOVA#30#Nova versão
+----------------------------
+revision 1.1
+date: 2024/12/01 08:30:00;  author: carla.dias;  state: Exp;
+*** empty log message ***
+=============================================================================
+"""
+
+@pytest.fixture
+def rcs_tree(tmp_path):
+    for relative, content in RCS_FILES.items():
+        path = tmp_path.joinpath(*relative.split('/'))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content.encode('latin-1'))
+    return rcs_reader.list_rcs_files(str(tmp_path), CVS_ROOT)
+
+def comparable(dataset):
+    """Revisões juntadas aos arquivos, com o pai como número de revisão (as linhas globais dependem da ordem)"""
+    df = join_revisions(dataset['files'], dataset['revisions'])
+    df['parent'] = [df['revision'].iat[parent] if parent >= 0 else None for parent in df['parent']]
+    df = df.drop(columns=['file_id'], errors='ignore').astype({'state': object})
+    return df.sort_values(['rcs_file', 'revision']).reset_index(drop=True)
+
+def test_mirror_matches_cvs_log(rcs_tree):
+    mirror = comparable(load_rcs_mirror(rcs_tree, workers=1))
+    expected = comparable(parse_log_content(CVS_LOG))
+    
+    assert list(mirror['revision']) == ['1.1', '1.2', '1.2.2.1', '1.3', '1.1', '2.1']
+    pd.testing.assert_frame_equal(mirror, expected, check_dtype=False)
+
+def test_line_counts_follow_cvs_log(rcs_tree):
+    revisions = comparable(load_rcs_mirror(rcs_tree, workers=1)).set_index(['rcs_file', 'revision'])
+    lines = revisions[['lines_added', 'lines_removed']].apply(tuple, axis=1).droplevel('rcs_file')
+    assert lines.tolist() == [(0, 0), (1, 0), (3, 1), (0, 0), (0, 0), (2, 1)]
+
+def test_invalid_delta_command_is_reported(tmp_path):
+    path = tmp_path / 'Tela.dsp,v'
+    path.write_bytes(RCS_FILES['COSR-SE/Tela2.dsp,v'].replace('d1 2\n', 'x1 2\n').encode('latin-1'))
+    with pytest.raises(rcs_reader.RcsFormatError):
+        rcs_reader.read_rcs_file(str(path))
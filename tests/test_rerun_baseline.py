@@ -0,0 +1,146 @@
+import json
+import os
+import time
+import tracemalloc
+from datetime import date
+
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from conftest import APP_PATH, GENERATED_LOG_BYTES
+
+# Reexecuções de main() em interações comuns, medidas contra a linha de base gravada no repositório.
+# Margem: campo "margin" do arquivo ou a variável CHECK_LOG_BASELINE_MARGIN (ex: 0.5 = 50% acima).
+# Para regravar a linha de base (após uma mudança intencional): CHECK_LOG_UPDATE_BASELINE=1 pytest tests/
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rerun_baseline.json')
+LATENCY_RUNS = 2
+
+def _widget(elements, label):
+    return next(element for element in elements if element.label == label)
+
+def _apply_filters(at):
+    _widget(at.sidebar.button, "Aplicar filtros").click()
+
+def _load(at, log):
+    at.file_uploader[0].upload('Check_log.csv', log, 'text/plain')
+
+def _toggle_pdr(at, log):
+    _widget(at.sidebar.checkbox, "Análise PDR").check()
+    _apply_filters(at)
+
+def _pick_centro(at, log):
+    centro = _widget(at.sidebar.multiselect, "Centro")
+    centro.select(centro.options[0])
+    _apply_filters(at)
+
+def _type_path(at, log):
+    _widget(at.sidebar.text_input, "Caminho da Tela").input("/BA/")
+    _apply_filters(at)
+
+def _change_dates(at, log):
+    _widget(at.sidebar.date_input, "Data Início").set_value(date(2020, 1, 1))
+    _widget(at.sidebar.date_input, "Data Fim").set_value(date(2023, 12, 31))
+    _apply_filters(at)
+
+def _open_grouping(at, log):
+    _widget(at.button, "Agrupar Classificações").click()
+
+def _confirm_grouping(at, log):
+    sources = at.multiselect(key="source_classifications")
+    sources.select(sources.options[0])
+    _widget(at.button, "Confirmar Agrupamento").click()
+
+# Interações na ordem em que são aplicadas (cada uma parte do estado deixado pela anterior)
+INTERACTIONS = [
+    ('carregar_log', _load),
+    ('analise_pdr', _toggle_pdr),
+    ('centro', _pick_centro),
+    ('caminho', _type_path),
+    ('datas', _change_dates),
+    ('abrir_agrupamento', _open_grouping),
+    ('agrupar_classificacoes', _confirm_grouping)
+]
+
+def run_interactions(log, measure):
+    """Executa as interações em uma sessão nova (sem caches do processo) e retorna a medida de cada uma"""
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    at = AppTest.from_file(APP_PATH, default_timeout=300)
+    at.run()
+    at.radio[0].set_value("Carregar arquivo de log manualmente").run()
+    
+    results = {}
+    for name, action in INTERACTIONS:
+        action(at, log)
+        results[name] = measure(at.run)
+        assert not at.exception, f"{name}: {[exception.value for exception in at.exception]}"
+    
+    assert at.session_state['classification_mapping'], "o agrupamento de classificações não foi aplicado"
+    return results
+
+def measure_latency(run):
+    started = time.perf_counter()
+    run()
+    return (time.perf_counter() - started) * 1000
+
+def measure_peak(run):
+    tracemalloc.reset_peak()
+    run()
+    return tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+
+def collect_measurements(log):
+    """Latência (a menor de LATENCY_RUNS sessões, sem rastreamento) e pico de memória de cada interação"""
+    latencies = [run_interactions(log, measure_latency) for _ in range(LATENCY_RUNS)]
+    
+    tracemalloc.start()
+    try:
+        peaks = run_interactions(log, measure_peak)
+    finally:
+        tracemalloc.stop()
+    
+    return {
+        name: {
+            'latency_ms': round(min(run[name] for run in latencies), 1),
+            'peak_mb': round(peaks[name], 1)
+        }
+        for name, _ in INTERACTIONS
+    }
+
+def test_reruns_within_baseline(generated_log):
+    measured = collect_measurements(generated_log)
+    
+    if os.environ.get('CHECK_LOG_UPDATE_BASELINE'):
+        baseline = {'margin': 0.5, 'min_slack_ms': 100, 'min_slack_mb': 5}
+        if os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH, encoding='utf-8') as f:
+                baseline = json.load(f)
+        baseline.update({'log_bytes': GENERATED_LOG_BYTES, 'interactions': measured})
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        return
+    
+    with open(BASELINE_PATH, encoding='utf-8') as f:
+        baseline = json.load(f)
+    assert baseline['log_bytes'] == GENERATED_LOG_BYTES, "linha de base gravada com outro tamanho de log"
+    
+    margin = float(os.environ.get('CHECK_LOG_BASELINE_MARGIN', baseline['margin']))
+    # Folga absoluta para que oscilações pequenas em interações rápidas não reprovem o teste
+    slack = {'latency_ms': baseline.get('min_slack_ms', 0), 'peak_mb': baseline.get('min_slack_mb', 0)}
+    
+    failures = []
+    for name, values in measured.items():
+        expected = baseline['interactions'].get(name)
+        if expected is None:
+            failures.append(f"{name}: sem linha de base")
+            continue
+        for metric, value in values.items():
+            limit = max(expected[metric] * (1 + margin), expected[metric] + slack[metric])
+            if value > limit:
+                failures.append(f"{name}: {metric} = {value} acima de {limit:.1f} "
+                                f"(linha de base {expected[metric]}, margem {margin:.0%})")
+    
+    if failures:
+        pytest.fail("Reexecuções acima da linha de base:\n" + "\n".join(failures))
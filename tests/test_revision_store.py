@@ -0,0 +1,123 @@
+import sqlite3
+
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+import check_log_telas
+from check_log_telas import RevisionStore
+from conftest import APP_PATH, next_log
+from log_parser import join_revisions, merge_source_datasets, parse_log_content
+from ssh_standin import generate_cvs_log
+
+FILTERS = {'pdr_only': False, 'ignore_ana_dig': False, 'ignore_temp_files': False, 'ignore_excluded': False}
+
+@pytest.fixture(scope='module')
+def dataset(generated_log):
+    return parse_log_content(generated_log.decode('latin-1'))
+
+def test_same_paths_on_two_sources_are_kept(tmp_path, dataset):
+    store = RevisionStore(str(tmp_path / 'revisoes.db'))
+    merged = merge_source_datasets([('a', dataset), ('b', dataset)])
+    store.ingest('fontes', merged)
+    
+    assert store.count() == len(merged['revisions']) == 2 * len(dataset['revisions'])
+    assert len(store.query('fontes', dict(FILTERS, sources=['b']))) == len(dataset['revisions'])
+    assert store.filter_options('fontes', False, False)['sources'] == ['a', 'b']
+
+def test_single_source_load_has_no_source_option(tmp_path, dataset):
+    store = RevisionStore(str(tmp_path / 'revisoes.db'))
+    store.ingest('log', dataset)
+    assert store.count() == len(dataset['revisions'])
+    assert store.filter_options('log', False, False)['sources'] == []
+
+def test_legacy_table_is_migrated(tmp_path, dataset):
+    path = str(tmp_path / 'revisoes.db')
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("""
+            CREATE TABLE revisions (
+                rcs_file TEXT NOT NULL,
+                revision TEXT NOT NULL,
+                working_file TEXT, author TEXT, date TEXT, time TEXT, message TEXT,
+                is_pdr INTEGER, pdr_classification TEXT, pdr_time REAL, pdr_description TEXT,
+                centro TEXT, estado TEXT, is_attic INTEGER, is_temp INTEGER, is_ana_dig INTEGER,
+                PRIMARY KEY (rcs_file, revision)
+            )""")
+        conn.execute("INSERT INTO revisions (rcs_file, revision, author, date) VALUES ('/x/A.tela,v', '1.1', 'ana', '2024-01-02')")
+    conn.close()
+    
+    store = RevisionStore(path)
+    assert store._conn.execute("SELECT id, source, author FROM revisions").fetchall() == [(1, '', 'ana')]
+    
+    # A base migrada aceita o mesmo caminho em duas origens; a linha antiga não pertence a nenhuma carga
+    store.ingest('fontes', merge_source_datasets([('a', dataset), ('b', dataset)]))
+    assert store.count() == 2 * len(dataset['revisions'])
+    
+    # Reabrir a base migrada não a reconstrói de novo
+    assert RevisionStore(path).count() == store.count()
+
+def query_keys(store, digest, filters=FILTERS):
+    result = store.query(digest, filters)
+    return set(zip(result['rcs_file'], result['revision']))
+
+def dataset_keys(dataset):
+    df = join_revisions(dataset['files'], dataset['revisions'])
+    return set(zip(df['rcs_file'], df['revision']))
+
+@pytest.fixture(scope='module')
+def lineage():
+    first_text = generate_cvs_log(200_000, seed=3).decode('latin-1')
+    first = parse_log_content(first_text)
+    return first, parse_log_content(next_log(first_text), first)
+
+def test_queries_are_limited_to_the_session_load(tmp_path, lineage):
+    first, second = lineage
+    store = RevisionStore(str(tmp_path / 'revisoes.db'))
+    
+    # Duas sessões com logs diferentes, gravados e consultados alternadamente
+    store.ingest('fontes', merge_source_datasets([('a', first), ('b', first)]))
+    store.ingest('segunda', second)
+    for _ in range(2):
+        assert query_keys(store, 'segunda') == dataset_keys(second)
+        assert len(store.query('segunda', FILTERS)) == len(second['revisions'])
+        assert store.filter_options('segunda', False, False)['sources'] == []
+        assert len(store.query('fontes', FILTERS)) == 2 * len(first['revisions'])
+        assert store.filter_options('fontes', False, False)['sources'] == ['a', 'b']
+        assert store.date_bounds('segunda')[1] > store.date_bounds('fontes')[1]
+        
+        # Cargas já gravadas não são regravadas nos reruns
+        assert not store.ingest('fontes', merge_source_datasets([('a', first), ('b', first)]))
+        assert not store.ingest('segunda', second)
+
+def test_least_recently_used_loads_are_pruned(tmp_path, lineage, monkeypatch):
+    monkeypatch.setattr(check_log_telas, 'STORE_MAX_LOADS', 2)
+    first, second = lineage
+    store = RevisionStore(str(tmp_path / 'revisoes.db'))
+    
+    store.ingest('primeira', first)
+    store.ingest('segunda', second)
+    store.ingest('primeira', first)
+    store.ingest('fontes', merge_source_datasets([('a', first)]))
+    
+    # "segunda" foi a usada há mais tempo: sai com as revisões que só ela tinha
+    assert store.query('segunda', FILTERS).empty
+    assert query_keys(store, 'primeira') == dataset_keys(first)
+    assert store.count() == 2 * len(first['revisions'])
+    
+    # A sessão que ainda usa a carga removida a grava de novo no próximo rerun
+    store.ingest('segunda', second)
+    assert query_keys(store, 'segunda') == dataset_keys(second)
+
+def test_app_runs_on_the_store(tmp_path, generated_log):
+    st.cache_resource.clear()
+    at = AppTest.from_file(APP_PATH, default_timeout=300)
+    at.secrets['sqlite_store'] = {'path': str(tmp_path / 'revisoes.db')}
+    at.run()
+    at.radio[0].set_value("Carregar arquivo de log manualmente").run()
+    at.file_uploader[0].upload('Check_log.csv', generated_log, 'text/plain').run()
+    next(checkbox for checkbox in at.sidebar.checkbox if checkbox.label == "Análise PDR").check()
+    next(button for button in at.sidebar.button if button.label == "Aplicar filtros").click().run()
+    
+    assert not at.exception, [exception.value for exception in at.exception]
+    st.cache_resource.clear()
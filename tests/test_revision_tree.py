@@ -0,0 +1,80 @@
+import pandas as pd
+import pytest
+
+from check_log_telas import apply_filters, result_file_ids, walk_revision_tree
+from log_parser import merge_source_datasets, parse_log_content
+
+FILTERS = {
+    'pdr_only': False, 'ignore_ana_dig': False, 'ignore_temp_files': False, 'ignore_excluded': False,
+    'ignore_dead': False, 'branch_mode': 'all', 'centros': [], 'estados': [], 'filenames': [], 'authors': [],
+    'path': '', 'search': '', 'start_date': None, 'end_date': None
+}
+
+# Ordem do cvs log: trunk do mais novo ao mais antigo e depois os branches. Faltam 1.2 (ponto de
+# ramificação de 1.2.4.1) e 1.4 a 1.8; 2.1 continua a partir de 1.10, e não de 1.9
+REVISIONS = ['2.1', '1.10', '1.9', '1.3', '1.1', '1.3.2.1', '1.3.2.2', '1.3.2.2.2.1', '1.2.4.1']
+
+def cvs_log(revisions):
+    blocks = [f"revision {revision}\ndate: 2024/01/{day:02d} 10:00:00;  author: ana.silva;  state: Exp;\nRevisão {revision}"
+              for day, revision in enumerate(revisions, 1)]
+    return (
+        "RCS file: /export/cvs/telas/Centro/COSR-NE/BA/Tela.dsp,v\n"
+        "Working file: BA/Tela.dsp\n"
+        f"head: {revisions[0]}\n"
+        "description:\n"
+        "----------------------------\n"
+        + "\n----------------------------\n".join(blocks)
+        + "\n=============================================================================\n"
+    )
+
+@pytest.fixture(scope='module')
+def dataset():
+    return parse_log_content(cvs_log(REVISIONS))
+
+def by_revision(dataset):
+    revisions_df = dataset['revisions']
+    parents = [revisions_df['revision'].iat[parent] if parent >= 0 else '' for parent in revisions_df['parent']]
+    return revisions_df.assign(parent=parents).set_index('revision')
+
+def test_parents_and_depth(dataset):
+    tree = by_revision(dataset)
+    assert tree.loc['1.3.2.1', ['parent', 'depth', 'branch']].tolist() == ['1.3', 1, 2]
+    assert tree.loc['1.3.2.2.2.1', ['parent', 'depth', 'branch']].tolist() == ['1.3.2.2', 2, 2]
+    assert tree.loc['1.1', 'parent'] == ''
+    
+    # Revisões ausentes: o pai é o ancestral mais próximo presente no log
+    assert tree.loc['1.3', 'parent'] == '1.1'
+    assert tree.loc['1.2.4.1', ['parent', 'depth', 'branch']].tolist() == ['1.1', 1, 4]
+    
+    # Novo número principal: 2.1 sai da última revisão 1.x em ordem numérica
+    assert tree.loc['2.1', 'parent'] == '1.10'
+    assert tree.loc['1.10', 'parent'] == '1.9'
+
+def test_revision_order_is_numeric(dataset):
+    revisions_df = dataset['revisions']
+    assert revisions_df['revision_order'].dtype == 'int32'
+    ordered = revisions_df.sort_values('revision_order')['revision'].tolist()
+    assert ordered.index('1.9') < ordered.index('1.10') < ordered.index('2.1')
+    assert ordered.index('1.3') < ordered.index('1.3.2.1') < ordered.index('1.3.2.2.2.1') < ordered.index('1.9')
+
+def test_walk_puts_each_branch_after_its_branch_point(dataset):
+    revisions_df = dataset['revisions']
+    ordered = revisions_df['revision'].take(walk_revision_tree(revisions_df)).tolist()
+    assert ordered == ['1.1', '1.2.4.1', '1.3', '1.3.2.1', '1.3.2.2', '1.3.2.2.2.1', '1.9', '1.10', '2.1']
+
+@pytest.mark.parametrize('branch_mode, expected', [
+    ('trunk', {'2.1', '1.10', '1.9', '1.3', '1.1'}),
+    ('branch', {'1.3.2.1', '1.3.2.2', '1.3.2.2.2.1', '1.2.4.1'})
+])
+def test_trunk_and_branch_filter(dataset, branch_mode, expected):
+    filtered = apply_filters(dataset['revisions'], dataset['files'], dict(FILTERS, branch_mode=branch_mode))
+    assert set(filtered['revision']) == expected
+
+def test_same_path_on_two_sources_are_distinct_files(dataset):
+    merged = merge_source_datasets([('a', dataset), ('b', parse_log_content(cvs_log(['1.2', '1.1'])))])
+    filtered = apply_filters(merged['revisions'], merged['files'], dict(FILTERS, sources=['b']))
+    assert list(result_file_ids(merged['files'], filtered)) == [1]
+    
+    # Resultados da base local (sem file_id): localizados pelo caminho e pela origem
+    stored = pd.DataFrame({'rcs_file': [merged['files']['path'].iat[1]] * 2, 'source': ['b', 'b']})
+    assert list(result_file_ids(merged['files'], stored)) == [1]
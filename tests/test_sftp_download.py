@@ -0,0 +1,56 @@
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import check_log_telas
+from check_log_telas import fetch_log_via_ssh
+
+LOG_BYTES = 1024 * 1024
+
+@pytest.fixture
+def temp_dir(tmp_path, monkeypatch):
+    # Arquivos parciais do download isolados por teste
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+    return tmp_path
+
+def fetch(standin, **kwargs):
+    return fetch_log_via_ssh(standin.host, standin.username, standin.password, **kwargs)
+
+def test_content_round_trips(cvs_standin, temp_dir):
+    standin = cvs_standin(size_bytes=LOG_BYTES)
+    progress = []
+    content = fetch(standin, on_progress=lambda done, total: progress.append((done, total)))
+    
+    assert content.encode('latin-1') == standin.log_content()
+    assert progress[-1] == (len(standin.log_content()), len(standin.log_content()))
+    assert any('cvs log' in command for command in standin.commands)
+    assert list(temp_dir.iterdir()) == []
+
+def test_dropped_connections_resume(cvs_standin, temp_dir, monkeypatch):
+    monkeypatch.setattr(check_log_telas, 'SFTP_RETRY_BASE_SECONDS', 0.01)
+    standin = cvs_standin(size_bytes=LOG_BYTES, drop_after_bytes=300_000)
+    
+    content = fetch(standin)
+    
+    assert content.encode('latin-1') == standin.log_content()
+    # Uma conexão para o cvs log, uma para o download e uma a cada queda
+    assert standin.connections >= 2 + LOG_BYTES // 300_000
+    assert list(temp_dir.iterdir()) == []
+
+def test_checksum_mismatch_raises(cvs_standin, temp_dir, monkeypatch):
+    monkeypatch.setattr(check_log_telas, 'remote_checksum', lambda client, remote_path: '0' * 64)
+    standin = cvs_standin(size_bytes=LOG_BYTES)
+    
+    with pytest.raises(IOError, match='checksum'):
+        fetch(standin)
+    # O parcial corrompido não fica para ser retomado
+    assert list(temp_dir.iterdir()) == []
+
+def test_concurrent_downloads_of_the_same_log(cvs_standin, temp_dir):
+    standin = cvs_standin(size_bytes=LOG_BYTES, bandwidth=2 * 1024 * 1024)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        contents = list(executor.map(lambda _: fetch(standin), range(3)))
+    
+    assert all(content.encode('latin-1') == standin.log_content() for content in contents)
+    assert list(temp_dir.iterdir()) == []